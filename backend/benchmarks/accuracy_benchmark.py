@@ -0,0 +1,167 @@
+"""
+Accuracy Benchmark - Compare the alignment engine with the old SequenceMatcher scoring
+Reports WER drift between the two and timing for single-pair and batch scoring
+on lesson sentences with synthetic reading errors, then times one pair at a time
+against the legacy matcher for short sentences up to long passages, for both the
+bit-parallel and the NumPy alignment.
+
+Usage (from backend/):
+    python -m benchmarks.accuracy_benchmark
+    python -m benchmarks.accuracy_benchmark --pairs 5000 --seed 7
+"""
+import argparse
+import json
+import logging
+import random
+import time
+import timeit
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import List, Tuple
+
+from services import word_alignment
+from services.accuracy_service import (
+    calculate_word_accuracy,
+    calculate_word_accuracy_batch,
+    normalize_text,
+    remove_filler_words
+)
+
+SINGLE_PAIR_WORDS = (10, 40, 400, 1500)
+
+DEFAULT_LESSONS_PATH = (
+    Path(__file__).resolve().parents[2] / "frontend" / "src" / "sampleData" / "lessons_seed.json"
+)
+
+
+def lesson_sentences(lessons: List[dict]) -> List[str]:
+    """Reading texts from the lesson corpus (step and dialogue lines), deduplicated"""
+    texts = []
+    for lesson in lessons:
+        for step in lesson.get("steps", []):
+            texts.append(step.get("text"))
+            texts.extend(line.get("text") for line in step.get("lines", []))
+    return list(dict.fromkeys(t.strip() for t in texts if isinstance(t, str) and t.strip()))
+
+
+def legacy_wer(expected_text: str, spoken_text: str) -> float:
+    """WER as computed by the previous SequenceMatcher-based implementation"""
+    expected_words = remove_filler_words(normalize_text(expected_text).split())
+    spoken_words = remove_filler_words(normalize_text(spoken_text).split())
+    if not expected_words or not spoken_words:
+        return 1.0
+
+    errors = 0
+    matcher = SequenceMatcher(None, expected_words, spoken_words)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'replace':
+            errors += max(i2 - i1, j2 - j1)
+        elif tag == 'delete':
+            errors += i2 - i1
+        elif tag == 'insert':
+            errors += j2 - j1
+    return errors / len(expected_words)
+
+
+def make_pairs(sentences: List[str], count: int, rng: random.Random) -> List[Tuple[str, str]]:
+    """Build (expected, spoken) pairs by randomly dropping, swapping and adding words"""
+    vocabulary = sorted({word for s in sentences for word in s.split()})
+    pairs = []
+    for _ in range(count):
+        # Join a few sentences so some passages are paragraph-length
+        expected = " ".join(rng.sample(sentences, rng.randint(1, 4)))
+        pairs.append((expected, misread(expected, vocabulary, rng)))
+    return pairs
+
+
+def misread(expected: str, vocabulary: List[str], rng: random.Random) -> str:
+    """A spoken version of expected with words dropped, swapped and added"""
+    spoken = []
+    for word in expected.split():
+        roll = rng.random()
+        if roll < 0.08:
+            continue
+        if roll < 0.16:
+            spoken.append(rng.choice(vocabulary))
+        else:
+            spoken.append(word)
+        if rng.random() < 0.05:
+            spoken.append(rng.choice(vocabulary))
+    return " ".join(spoken)
+
+
+def per_call_ms(fn) -> float:
+    """Best-of-five mean time of one fn() call, in ms"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(5, number)) / number * 1000
+
+
+def legacy_alignment(expected_words: List[str], spoken_words: List[str]) -> None:
+    """The per-pair work of the previous implementation: opcodes plus ratio()"""
+    matcher = SequenceMatcher(None, expected_words, spoken_words)
+    matcher.get_opcodes()
+    matcher.ratio()
+
+
+def single_pair_timings(sentences: List[str], rng: random.Random) -> None:
+    """Per-pair alignment latency of legacy, bit-parallel and NumPy by passage length"""
+    vocabulary = sorted({word for s in sentences for word in s.split()})
+    print(f"\nSingle pair, per call:  {'words':>6} {'legacy':>9} {'bit-par.':>9} {'numpy':>9}")
+    for words in SINGLE_PAIR_WORDS:
+        text = ""
+        while len(text.split()) < words:
+            text += " " + rng.choice(sentences)
+        expected = " ".join(text.split()[:words])
+        spoken = misread(expected, vocabulary, rng)
+        expected_words = remove_filler_words(normalize_text(expected).split())
+        spoken_words = remove_filler_words(normalize_text(spoken).split())
+
+        legacy_ms = per_call_ms(lambda: legacy_alignment(expected_words, spoken_words))
+        bits_ms = per_call_ms(lambda: word_alignment.align(expected_words, spoken_words))
+        numpy_ms = per_call_ms(lambda: word_alignment._align_numpy([(expected_words, spoken_words)]))
+        print(f"{'':23} {words:6d} {legacy_ms:8.3f}ms {bits_ms:8.3f}ms {numpy_ms:8.3f}ms")
+
+
+def main(args: argparse.Namespace) -> None:
+    lessons = json.loads(Path(args.lessons).read_text(encoding="utf-8"))["lessons"]
+    sentences = lesson_sentences(lessons)
+    pairs = make_pairs(sentences, args.pairs, random.Random(args.seed))
+
+    start = time.perf_counter()
+    legacy = [legacy_wer(e, s) for e, s in pairs]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [calculate_word_accuracy(e, s)[1]["wer"] for e, s in pairs]
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = [details["wer"] for _, details in calculate_word_accuracy_batch(pairs)]
+    batch_s = time.perf_counter() - start
+
+    assert single == batch, "Batch and single-pair scoring disagree"
+    drift = [old - new for old, new in zip(legacy, batch)]
+    differing = sum(1 for d in drift if abs(d) > 1e-3)
+
+    print(f"Pairs: {len(pairs)} from {len(sentences)} lesson sentences")
+    print(f"Legacy SequenceMatcher: {legacy_s * 1000:8.1f} ms")
+    print(f"Alignment (single):     {single_s * 1000:8.1f} ms")
+    print(f"Alignment (batch):      {batch_s * 1000:8.1f} ms")
+    print(f"WER differs on {differing} pairs ({differing / len(pairs):.1%}); "
+          f"legacy over-reports by {max(drift):.3f} at most, {sum(drift) / len(drift):.4f} on average")
+    # Levenshtein is the minimum edit count, so the legacy WER can never be lower
+    print(f"Legacy WER below minimum edit WER: {sum(1 for d in drift if d < -1e-3)} pairs")
+
+    single_pair_timings(sentences, random.Random(args.seed))
+
+
+if __name__ == "__main__":
+    # Per-pair accuracy logging would dominate the timings
+    logging.disable(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Benchmark word accuracy scoring")
+    parser.add_argument("--lessons", default=str(DEFAULT_LESSONS_PATH), help="Path to lessons_seed.json")
+    parser.add_argument("--pairs", type=int, default=2000, help="Number of (expected, spoken) pairs")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    main(parser.parse_args())
@@ -0,0 +1,244 @@
+"""
+Fake OpenAI - Offline stand-in for the OpenAI endpoints the backend uses
+Serves chat completions (plain, JSON and streamed), speech and
+transcriptions with lognormal latency, token streaming and error
+injection, so the backend can be benchmarked without spending API money.
+
+Usage (from backend/):
+    python -m benchmarks.fake_openai --port 9100
+    python -m benchmarks.fake_openai --chat-latency-ms 800 --error-rate 0.05 --hang-rate 0.01
+
+Then point the backend at it:
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=fake uvicorn main:app
+
+Latency and fault settings can be changed while running:
+    curl -X POST localhost:9100/_control -d '{"error_rate": 0.5}'
+    curl -X POST localhost:9100/_control -d '{"error_next": 2}'
+    curl localhost:9100/_stats
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+
+CHAT_REPLY = (
+    "Great job! That sounds like a lovely day. "
+    "A more natural way to say it is 'I went to the market yesterday.' "
+    "What did you buy there?"
+)
+
+# Covers every JSON shape the backend asks for (bilingual feedback, session summary)
+JSON_REPLY = {
+    "feedback_en": "Nice reading! Slow down a little on the longer words.",
+    "feedback_vi": "Đọc tốt lắm! Hãy đọc chậm hơn một chút ở những từ dài.",
+    "strengths": "You kept the conversation going and asked good questions.",
+    "weaknesses": "Watch the past tense of irregular verbs.",
+    "good_sentences": ["I went to the market yesterday."],
+    "practice_suggestion": "Practice 'I went to ... and bought ...'."
+}
+
+TRANSCRIPT = "I would like to order the grilled salmon please"
+
+# Injected failures: (status, error type) picked at random
+INJECTED_ERRORS = [
+    (429, "rate_limit_exceeded"),
+    (500, "server_error"),
+    (503, "service_unavailable")
+]
+
+# Size of one fake MP3 second at 48 kbps
+MP3_BYTES_PER_SECOND = 6000
+
+
+@dataclass
+class FakeConfig:
+    """Latency and fault-injection knobs (all latencies are lognormal medians)"""
+    chat_latency_ms: float = 400.0  # Time to first token / full response
+    tts_latency_ms: float = 300.0
+    stt_latency_ms: float = 500.0
+    latency_sigma: float = 0.5  # Lognormal shape: 0 = constant, 0.5 ~ p99 at 3.2x the median
+    token_ms: float = 20.0  # Gap between streamed tokens
+    error_rate: float = 0.0  # Share of requests answered with a 429/500/503
+    hang_rate: float = 0.0  # Share of requests that stall for hang_seconds (client timeouts)
+    hang_seconds: float = 120.0
+    error_next: int = 0  # Fail exactly the next N requests (deterministic, for tests)
+    hang_next: int = 0  # Stall exactly the next N requests
+
+
+config = FakeConfig()
+stats: Counter = Counter()
+_seen_prefixes: set = set()
+
+app = FastAPI(title="Fake OpenAI", docs_url=None, redoc_url=None)
+
+
+def _latency(median_ms: float) -> float:
+    """One lognormal latency sample in seconds"""
+    if config.latency_sigma <= 0:
+        return median_ms / 1000
+    return random.lognormvariate(math.log(max(median_ms, 0.001)), config.latency_sigma) / 1000
+
+
+async def _faults(endpoint: str):
+    """Apply error/hang injection; return an error response or None"""
+    stats[f"{endpoint}_requests"] += 1
+    if config.hang_next > 0 or random.random() < config.hang_rate:
+        config.hang_next = max(config.hang_next - 1, 0)
+        stats[f"{endpoint}_hangs"] += 1
+        await asyncio.sleep(config.hang_seconds)
+    if config.error_next > 0 or random.random() < config.error_rate:
+        config.error_next = max(config.error_next - 1, 0)
+        status, code = random.choice(INJECTED_ERRORS)
+        stats[f"{endpoint}_errors"] += 1
+        return JSONResponse(
+            status_code=status,
+            content={"error": {"message": f"Injected {code}", "type": code, "code": code}}
+        )
+    return None
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _usage(messages: list, completion: str) -> dict:
+    """
+    Usage block with simulated prefix caching
+
+    The first message counts as cached once the same text has been seen
+    (OpenAI only caches prompts of 1024+ tokens; the fake ignores that).
+    """
+    prompt_tokens = sum(_estimate_tokens(str(m.get("content", ""))) for m in messages)
+    prefix = str(messages[0].get("content", "")) if messages else ""
+    cached_tokens = _estimate_tokens(prefix) if prefix in _seen_prefixes else 0
+    _seen_prefixes.add(prefix)
+    completion_tokens = _estimate_tokens(completion)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": cached_tokens}
+    }
+
+
+def _wants_json(body: dict) -> bool:
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return True
+    return any("JSON" in str(m.get("content", "")) for m in body.get("messages", []))
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    if error := await _faults("chat"):
+        return error
+
+    messages = body.get("messages", [])
+    text = json.dumps(JSON_REPLY, ensure_ascii=False) if _wants_json(body) else CHAT_REPLY
+    usage = _usage(messages, text)
+    model = body.get("model", "gpt-4o-mini")
+    created = int(time.time())
+    await asyncio.sleep(_latency(config.chat_latency_ms))
+
+    if not body.get("stream"):
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        }
+
+    include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+    def chunk(delta: dict, finish_reason=None, choices=True, chunk_usage=None) -> str:
+        data = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if choices else [],
+            "usage": chunk_usage
+        }
+        return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    async def events():
+        words = text.split(" ")
+        for index, word in enumerate(words):
+            token = word if index == len(words) - 1 else f"{word} "
+            yield chunk({"content": token})
+            await asyncio.sleep(config.token_ms / 1000)
+        yield chunk({}, finish_reason="stop")
+        if include_usage:
+            yield chunk({}, choices=False, chunk_usage=usage)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/v1/audio/speech")
+async def speech(request: Request):
+    body = await request.json()
+    if error := await _faults("tts"):
+        return error
+
+    await asyncio.sleep(_latency(config.tts_latency_ms))
+    # ~15 characters of text per second of audio
+    seconds = max(len(body.get("input", "")) / 15, 0.5)
+    audio = b"ID3\x04\x00\x00\x00\x00\x00\x00" + b"\xff\xfb\x90\x00" * int(seconds * MP3_BYTES_PER_SECOND / 4)
+    return Response(audio, media_type="audio/mpeg")
+
+
+@app.post("/v1/audio/transcriptions")
+async def transcriptions(request: Request):
+    form = await request.form()
+    if error := await _faults("stt"):
+        return error
+
+    await asyncio.sleep(_latency(config.stt_latency_ms))
+    if form.get("response_format") == "text":
+        return PlainTextResponse(TRANSCRIPT)
+    return {"text": TRANSCRIPT}
+
+
+@app.post("/_control")
+async def control(request: Request):
+    """Update FakeConfig fields at runtime"""
+    updates = await request.json()
+    for key, value in updates.items():
+        if hasattr(config, key):
+            setattr(config, key, type(getattr(config, key))(value))
+    return asdict(config)
+
+
+@app.get("/_stats")
+async def get_stats():
+    """Request, error and hang counts per endpoint"""
+    return {"config": asdict(config), "counts": dict(stats)}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    for name, value in asdict(config).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    for name in asdict(config):
+        setattr(config, name, getattr(args, name))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,158 @@
+"""
+Hot Paths Benchmark - Microbenchmarks for the pure-Python request hot paths
+Times text normalization, filler removal, word accuracy scoring, emotion
+tagging and JSON reply extraction on lesson sentences and synthetic long
+passages, and fails when a case is slower than its regression threshold.
+
+Usage (from backend/):
+    python -m benchmarks.hot_paths_benchmark
+    python -m benchmarks.hot_paths_benchmark --check --threshold-scale 2
+    python -m benchmarks.hot_paths_benchmark --only accuracy --json results.json
+
+Thresholds are per-call budgets in microseconds, set at several times the
+timings on a typical dev laptop; scale them for slower CI machines.
+tests/test_hot_paths.py runs the same check under pytest
+(HOT_PATHS_THRESHOLD_SCALE scales the budgets there).
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.accuracy_benchmark import DEFAULT_LESSONS_PATH, lesson_sentences, make_pairs
+from services.accuracy_service import (
+    calculate_word_accuracy,
+    calculate_word_accuracy_batch,
+    normalize_text,
+    remove_filler_words
+)
+from services.reply_parsing import analyze_emotion, extract_json_object
+
+# Per-call regression budgets (microseconds)
+THRESHOLDS_US = {
+    "normalize_text/sentence": 20,
+    "normalize_text/passage": 600,
+    "remove_filler_words/sentence": 10,
+    "remove_filler_words/passage": 300,
+    "accuracy/sentence": 2000,
+    "accuracy/passage": 40000,
+    "accuracy_batch/100_pairs": 50000,
+    "analyze_emotion/reply": 25,
+    "extract_json/bare": 25,
+    "extract_json/fenced": 50
+}
+
+# Words in a synthetic long passage (a few minutes of reading aloud)
+PASSAGE_WORDS = 400
+
+COACH_REPLIES = [
+    "Great job! That sounds lovely. What else did you order?",
+    "Almost! We usually say 'I went to the market', not 'I go to the market'.",
+    "Keep practicing the 'th' sound, you're getting closer every time.",
+    "Interesting! Tell me more about your weekend plans."
+]
+
+JSON_REPLY = json.dumps({
+    "feedback_en": "Nice reading! Slow down a little on the longer words.",
+    "feedback_vi": "Đọc tốt lắm! Hãy đọc chậm hơn một chút ở những từ dài."
+}, ensure_ascii=False)
+
+
+@dataclass
+class Case:
+    """One benchmark: a zero-argument callable cycling through its inputs"""
+    name: str
+    fn: Callable[[], object]
+
+
+def cycle(fn: Callable, inputs: List) -> Callable[[], object]:
+    """Call fn on each input in turn, one per benchmark iteration"""
+    state = {"i": 0}
+
+    def run():
+        value = inputs[state["i"] % len(inputs)]
+        state["i"] += 1
+        return fn(*value) if isinstance(value, tuple) else fn(value)
+
+    return run
+
+
+def build_cases(sentences: List[str], seed: int) -> List[Case]:
+    """Benchmark cases over lesson sentences and synthetic long passages"""
+    rng = random.Random(seed)
+    sentence_pairs = make_pairs(sentences, 200, rng)
+    vocabulary = [w for s in sentences for w in s.split()]
+    passages = [" ".join(rng.choices(vocabulary, k=PASSAGE_WORDS)) for _ in range(5)]
+    passage_pairs = [
+        (passage, " ".join(w for w in passage.split() if rng.random() > 0.1))
+        for passage in passages
+    ]
+    sentence_words = [normalize_text(s).split() for s in sentences]
+    passage_words = [normalize_text(p).split() for p in passages]
+    batch = sentence_pairs[:100]
+
+    return [
+        Case("normalize_text/sentence", cycle(normalize_text, sentences)),
+        Case("normalize_text/passage", cycle(normalize_text, passages)),
+        Case("remove_filler_words/sentence", cycle(remove_filler_words, sentence_words)),
+        Case("remove_filler_words/passage", cycle(remove_filler_words, passage_words)),
+        Case("accuracy/sentence", cycle(calculate_word_accuracy, sentence_pairs)),
+        Case("accuracy/passage", cycle(calculate_word_accuracy, passage_pairs)),
+        Case("accuracy_batch/100_pairs", lambda: calculate_word_accuracy_batch(batch)),
+        Case("analyze_emotion/reply", cycle(analyze_emotion, COACH_REPLIES)),
+        Case("extract_json/bare", cycle(extract_json_object, [JSON_REPLY])),
+        Case("extract_json/fenced", cycle(extract_json_object, [f"Here you go:\n```json\n{JSON_REPLY}\n```"]))
+    ]
+
+
+def time_case(case: Case, repeat: int) -> float:
+    """Best per-call time in microseconds over `repeat` auto-sized runs"""
+    timer = timeit.Timer(case.fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main(args: argparse.Namespace) -> int:
+    lessons = json.loads(Path(args.lessons).read_text(encoding="utf-8"))["lessons"]
+    cases = [c for c in build_cases(lesson_sentences(lessons), args.seed) if args.only in c.name]
+
+    results: Dict[str, dict] = {}
+    regressions = []
+    print(f"{'case':<32}{'per call':>14}{'threshold':>14}")
+    for case in cases:
+        per_call_us = time_case(case, args.repeat)
+        threshold_us = THRESHOLDS_US[case.name] * args.threshold_scale
+        over = per_call_us > threshold_us
+        if over:
+            regressions.append(case.name)
+        results[case.name] = {"per_call_us": round(per_call_us, 2), "threshold_us": threshold_us, "regressed": over}
+        print(f"{case.name:<32}{per_call_us:>11.2f} us{threshold_us:>11.0f} us{'  REGRESSED' if over else ''}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+    if regressions:
+        print(f"\n{len(regressions)} case(s) over threshold: {', '.join(regressions)}")
+        return 1 if args.check else 0
+    print("\nAll cases within thresholds")
+    return 0
+
+
+if __name__ == "__main__":
+    # Per-call accuracy logging would dominate the timings
+    logging.disable(logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Microbenchmark the pure-Python hot paths")
+    parser.add_argument("--lessons", default=str(DEFAULT_LESSONS_PATH), help="Path to lessons_seed.json")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for synthetic inputs")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per case (best is reported)")
+    parser.add_argument("--only", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--threshold-scale", type=float, default=1.0, help="Multiply every threshold (slower machines)")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any case exceeds its threshold")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,217 @@
+"""
+Load Test - Drive the speaking, Live Talk and TTS endpoints at a target rate
+Open-loop: requests start on schedule whether or not earlier ones have
+finished, so queueing shows up in the latencies instead of lowering the
+offered load. Latency is measured from each request's scheduled send time,
+so time spent waiting for a --max-in-flight slot is included (no coordinated
+omission); that wait is also reported on its own. Reports p50/p95/p99 per
+scenario.
+
+Usage (from backend/, with the backend running against benchmarks.fake_openai):
+    python -m benchmarks.load_test --rps 20 --duration 30
+    python -m benchmarks.load_test --scenarios tts --rps 100 --unique-tts
+"""
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import random
+import time
+import uuid
+import wave
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import httpx
+
+from benchmarks.accuracy_benchmark import DEFAULT_LESSONS_PATH, lesson_sentences
+
+SCENARIOS = ["read_aloud", "live_talk", "tts"]
+
+
+def silent_wav(seconds: float = 1.0, rate: int = 16000) -> bytes:
+    """A short silent WAV clip (the fake server transcribes anything)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class LoadTest:
+    """Fires scenario requests at a target rate and records latency per scenario"""
+
+    def __init__(self, args: argparse.Namespace, sentences: List[str]):
+        self.args = args
+        self.sentences = sentences
+        self.audio = silent_wav()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.queue_waits: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.live_sessions: Dict[str, str] = {}
+
+    def _requests(self) -> Dict[str, Callable]:
+        return {
+            "read_aloud": self.read_aloud,
+            "live_talk": self.live_talk,
+            "tts": self.tts
+        }
+
+    async def read_aloud(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post(
+            "/api/speaking/read-aloud",
+            files={"audio": ("speech.wav", self.audio, "audio/wav")},
+            data={"expected_text": random.choice(self.sentences)}
+        )
+
+    async def live_talk(self, client: httpx.AsyncClient) -> httpx.Response:
+        # A pool of simulated learners, each continuing their own session
+        user_id = f"load-{random.randrange(self.args.learners)}"
+        data = {"user_id": user_id, "topic": "daily_life"}
+        if user_id in self.live_sessions:
+            data["session_id"] = self.live_sessions[user_id]
+        response = await client.post(
+            "/api/live-talk/turn",
+            files={"audio": ("speech.wav", self.audio, "audio/wav")},
+            data=data
+        )
+        if response.status_code == 200:
+            self.live_sessions[user_id] = response.json()["session_id"]
+        return response
+
+    async def tts(self, client: httpx.AsyncClient) -> httpx.Response:
+        text = random.choice(self.sentences)
+        if self.args.unique_tts:
+            text = f"{text} ({uuid.uuid4().hex[:8]})"  # Defeat the TTS cache
+        return await client.post("/api/tts", json={"text": text})
+
+    async def _one(
+        self,
+        client: httpx.AsyncClient,
+        scenario: str,
+        request: Callable,
+        in_flight: asyncio.Semaphore,
+        scheduled_at: float
+    ):
+        """Send one request; latency counts from scheduled_at, not from when a slot frees up"""
+        async with in_flight:
+            self.queue_waits[scenario].append((time.perf_counter() - scheduled_at) * 1000)
+            try:
+                response = await request(client)
+                outcome = str(response.status_code)
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            self.latencies[scenario].append((time.perf_counter() - scheduled_at) * 1000)
+            self.statuses[scenario][outcome] += 1
+
+    async def run(self) -> float:
+        """Offer load for the configured duration; return the wall time"""
+        args = self.args
+        requests = self._requests()
+        rotation = itertools.cycle(args.scenarios)
+        in_flight = asyncio.Semaphore(args.max_in_flight)
+        interval = 1 / args.rps
+        tasks = []
+
+        limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+            started = time.perf_counter()
+            next_at = started
+            for _ in range(int(args.rps * args.duration)):
+                # Poisson arrivals by default; --steady sends at exact intervals
+                next_at += interval if args.steady else random.expovariate(args.rps)
+                await asyncio.sleep(max(next_at - time.perf_counter(), 0))
+                scenario = next(rotation)
+                tasks.append(asyncio.create_task(
+                    self._one(client, scenario, requests[scenario], in_flight, scheduled_at=next_at)
+                ))
+            await asyncio.gather(*tasks)
+            return time.perf_counter() - started
+
+    def report(self, elapsed: float) -> dict:
+        """Latency percentiles and status counts per scenario"""
+        results = {}
+        for scenario in self.args.scenarios:
+            values = sorted(self.latencies[scenario])
+            waits = sorted(self.queue_waits[scenario])
+            statuses = dict(self.statuses[scenario])
+            results[scenario] = {
+                "requests": len(values),
+                "ok": statuses.get("200", 0),
+                "statuses": statuses,
+                "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "mean_ms": round(sum(values) / len(values), 1) if values else 0.0,
+                "p50_ms": round(percentile(values, 50), 1),
+                "p95_ms": round(percentile(values, 95), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+                "max_ms": round(values[-1], 1) if values else 0.0,
+                # Included in the latencies above: scheduling lag plus waiting for a free slot
+                "queue_p50_ms": round(percentile(waits, 50), 1),
+                "queue_p99_ms": round(percentile(waits, 99), 1),
+                "queue_max_ms": round(waits[-1], 1) if waits else 0.0
+            }
+        return results
+
+
+def print_report(results: dict, elapsed: float) -> None:
+    print(f"\nElapsed: {elapsed:.1f}s")
+    print(f"{'scenario':<12}{'reqs':>7}{'ok':>7}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for scenario, r in results.items():
+        print(
+            f"{scenario:<12}{r['requests']:>7}{r['ok']:>7}{r['throughput_rps']:>8}"
+            f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}"
+        )
+        if r["queue_max_ms"] >= 1:
+            print(
+                f"{'':<12}queued before sending: p50 {r['queue_p50_ms']} ms, "
+                f"p99 {r['queue_p99_ms']} ms, max {r['queue_max_ms']} ms"
+            )
+        errors = {status: count for status, count in r["statuses"].items() if status != "200"}
+        if errors:
+            print(f"{'':<12}non-200: {errors}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    lessons = json.loads(Path(args.lessons).read_text(encoding="utf-8"))["lessons"]
+    test = LoadTest(args, lesson_sentences(lessons))
+
+    print(f"Offering {args.rps} req/s for {args.duration}s across {', '.join(args.scenarios)} -> {args.base_url}")
+    elapsed = await test.run()
+    results = test.report(elapsed)
+    print_report(results, elapsed)
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the backend's upstream-heavy endpoints")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Backend base URL")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated subset of {SCENARIOS}")
+    parser.add_argument("--rps", type=float, default=10.0, help="Offered requests per second (all scenarios together)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of offered load")
+    parser.add_argument("--steady", action="store_true", help="Fixed inter-arrival times instead of Poisson arrivals")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Client-side cap on concurrent requests")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--learners", type=int, default=50, help="Simulated Live Talk learners (one session each)")
+    parser.add_argument("--unique-tts", action="store_true", help="Make every TTS text unique to measure cache misses")
+    parser.add_argument("--lessons", default=str(DEFAULT_LESSONS_PATH), help="Path to lessons_seed.json")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    asyncio.run(main(args))
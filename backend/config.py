@@ -13,11 +13,73 @@ class Settings(BaseSettings):
     openai_model_name: str = "gpt-4o-mini"
     openai_tts_model: str = "tts-1"
     openai_tts_voice: str = "nova"  # Options: alloy, echo, fable, onyx, nova, shimmer
+    openai_base_url: Optional[str] = None  # Override to target an OpenAI-compatible server
+
+    # OpenAI Client Pooling & Limits
+    openai_timeout_seconds: float = 30.0
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_max_concurrency: int = 32  # Max in-flight upstream calls per worker
+
+    # Upstream Resilience (per-attempt deadlines, retries, circuit breaker)
+    upstream_chat_timeout_seconds: float = 20.0
+    upstream_tts_timeout_seconds: float = 15.0
+    upstream_stt_timeout_seconds: float = 30.0
+    upstream_max_retries: int = 2  # TTS/STT extra attempts after timeouts, 429s, 5xx and connection errors (chat is never retried)
+    upstream_retry_base_seconds: float = 0.25  # Full-jitter exponential backoff: base * 2^n, capped
+    upstream_retry_max_seconds: float = 2.0
+    upstream_breaker_failure_threshold: int = 5  # Consecutive failed calls before failing fast
+    upstream_breaker_reset_seconds: float = 30.0  # Time open before one trial call is let through
+    tts_hedge_after_seconds: float = 0.0  # Send a second TTS request if the first is this slow (0 = off)
+
+    # TTS Cache
+    tts_cache_dir: str = "media/tts"
+    tts_cache_max_bytes: int = 500 * 1024 * 1024  # 500 MB
+    tts_cache_max_entries: int = 20000
+
+    # Exercise Feedback Cache
+    feedback_cache_ttl_seconds: int = 7 * 24 * 3600  # 7 days
+    feedback_cache_max_entries: int = 5000  # In-memory tier
+    feedback_cache_db_path: str = "feedback_cache.db"  # On-disk SQLite tier (empty = memory only)
+    feedback_cache_disk_max_entries: int = 100000
+
+    # Audio Uploads
+    max_audio_upload_bytes: int = 10 * 1024 * 1024  # 10 MB (Whisper accepts up to 25 MB)
+
+    # Read-Aloud Pipeline Deadlines (seconds)
+    read_aloud_stt_timeout_seconds: float = 20.0
+    read_aloud_feedback_timeout_seconds: float = 8.0
+    read_aloud_tts_timeout_seconds: float = 10.0
+
+    # Live Talk Sessions
+    live_talk_session_ttl_seconds: int = 1800  # Idle sessions expire after 30 minutes
+    live_talk_max_sessions: int = 10000
+    live_talk_context_tokens: int = 1200  # Token budget for recent messages sent verbatim to the model
+    live_talk_context_messages: int = 12  # Hard cap on recent messages, whatever their size
+    live_talk_summary_batch_messages: int = 8  # Older messages folded into the summary at once
+
+    # Chat-Teacher Conversations
+    chat_conversation_ttl_seconds: int = 3600  # Idle conversations expire after an hour
+    chat_max_conversations: int = 10000
+    chat_context_tokens: int = 1500  # Token budget for recent turns sent verbatim to the model
+    chat_context_messages: int = 20  # Hard cap on recent turns, whatever their size
+    chat_summary_batch_messages: int = 6  # Older messages folded into the summary at once
+
+    # Cross-Worker Shared State (sessions, job results)
+    shared_state_db_path: str = "shared_state.db"  # SQLite file shared by gunicorn workers; only used with more than one (empty = always in-memory)
+
+    # Database (user progress)
+    database_url: str = "sqlite:///./teacherai.db"
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    progress_timezone: str = "Asia/Ho_Chi_Minh"  # Day boundaries for daily/weekly progress rollups
 
     # Server Configuration
     backend_host: str = "0.0.0.0"
     backend_port: int = 8000
     frontend_url: str = "http://localhost:5173"
+    web_concurrency: int = 0  # Production worker processes (0 = one per CPU core)
+    graceful_timeout_seconds: int = 30  # Time workers get to finish in-flight requests on shutdown
 
     # Environment
     env: str = "development"
@@ -0,0 +1,72 @@
+"""
+Database - SQLAlchemy engine, session factory and declarative base
+SQLite by default (WAL mode); any SQLAlchemy URL works via DATABASE_URL
+"""
+import logging
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_is_sqlite = settings.database_url.startswith("sqlite")
+
+# Pooled engine shared by all requests (sync endpoints run in FastAPI's threadpool)
+engine = create_engine(
+    settings.database_url,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    pool_pre_ping=True,
+    connect_args={"check_same_thread": False} if _is_sqlite else {}
+)
+
+
+if _is_sqlite:
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        """WAL lets readers proceed while a write is in progress"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+
+class Base(DeclarativeBase):
+    """Declarative base for all ORM models"""
+
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE / DO NOTHING
+_UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert
+}
+
+
+def upsert_insert(db: Session) -> Optional[Callable]:
+    """The dialect's insert() supporting on_conflict_do_update/do_nothing, or None"""
+    return _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+
+
+def get_db() -> Iterator[Session]:
+    """FastAPI dependency: one session per request, always closed"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def init_db() -> None:
+    """Create tables that don't exist yet"""
+    from models import db_models  # noqa: F401  (registers models on Base.metadata)
+
+    Base.metadata.create_all(bind=engine)
+    logger.info(f"Database ready: {engine.url.render_as_string(hide_password=True)}")
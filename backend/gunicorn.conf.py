@@ -0,0 +1,65 @@
+"""
+Gunicorn Config - Production multi-worker server
+Runs WEB_CONCURRENCY uvicorn workers (default one per CPU core) from a
+preloaded app, with graceful shutdown. Sessions, job results (with more
+than one worker), the TTS index and the feedback cache live in SQLite
+files shared by all workers; metrics from every worker are aggregated
+at /metrics.
+
+Usage (from backend/):
+    gunicorn -c gunicorn.conf.py main:app
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from config import settings
+
+# Must be set, and start empty, before the app (and its metrics) is imported
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "teacherai-metrics"))
+shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+bind = f"{settings.backend_host}:{settings.backend_port}"
+workers = settings.web_concurrency or multiprocessing.cpu_count()
+
+# Sessions and job results only need the shared SQLite store when a request
+# can land on another worker (read by services.shared_store at app import)
+if workers > 1:
+    os.environ["TEACHERAI_MULTI_WORKER"] = "1"
+
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app once in the master so workers fork with it loaded
+preload_app = True
+
+# SIGTERM: stop accepting, let in-flight requests (incl. streams) finish
+graceful_timeout = settings.graceful_timeout_seconds
+timeout = 120
+keepalive = 5
+
+accesslog = "-"
+loglevel = "info"
+
+
+def when_ready(server):
+    """Create tables once, before any worker starts, then drop the master's connections"""
+    from database import engine, init_db
+
+    init_db()
+    engine.dispose()
+
+
+def post_fork(server, worker):
+    """Workers must not reuse database connections inherited from the master"""
+    from database import engine
+
+    engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the aggregated metrics"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -2,11 +2,16 @@
 FastAPI backend for English Learning App
 Main application entry point
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from config import settings
+from services.audio_ingest import UploadLimitMiddleware
+from services.metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT, render_metrics
+from services.upstream import upstream
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(
@@ -24,6 +29,9 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Cap audio uploads before their body is read (inside CORS, so 413s carry CORS headers)
+app.add_middleware(UploadLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +42,29 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    """
+    Record request latency per route template and the in-flight count
+
+    Latency runs until the response starts, so for streamed responses
+    (SSE, audio) it is time to first byte.
+    """
+    start = time.perf_counter()
+    status = "500"
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        # Label by template (/api/lesson/feedback/{job_id}), not raw path, to bound cardinality
+        matched = request.scope.get("route")
+        template = getattr(matched, "path", None) or "unmatched"
+        REQUEST_LATENCY.labels(request.method, template, status).observe(time.perf_counter() - start)
+
+
 # ===== HEALTH CHECK =====
 
 @app.get("/")
@@ -58,16 +89,32 @@ async def ping():
 
 @app.get("/health")
 async def health_check():
-    """Detailed health check"""
+    """Detailed health check (degraded while any upstream circuit is open)"""
+    upstream_stats = upstream.stats()
+    degraded = any(b["state"] != "closed" for b in upstream_stats["breakers"].values())
     return {
-        "status": "healthy",
+        "status": "degraded" if degraded else "healthy",
         "environment": settings.env,
-        "openai_configured": bool(settings.openai_api_key and settings.openai_api_key != "your_openai_api_key_here")
+        "openai_configured": bool(settings.openai_api_key and settings.openai_api_key != "your_openai_api_key_here"),
+        "upstream": upstream_stats
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics (aggregated over all workers in multi-worker mode)"""
+    # The TTS cache collector queries SQLite
+    body, content_type = await run_in_threadpool(render_metrics)
+    return Response(body, media_type=content_type)
+
+
 # ===== IMPORT ROUTERS =====
 from routers import chat, lesson, tts, media, speaking, live_talk, user_progress
+from services import openai_service
+from services.tts_cache import tts_cache
+from services.feedback_cache import exercise_feedback_cache
+from services.shared_store import shared_store
+from database import engine, init_db
 
 # Include routers
 app.include_router(chat.router)
@@ -84,14 +131,23 @@ async def startup_event():
     logger.info(f"Environment: {settings.env}")
     logger.info(f"Frontend URL: {settings.frontend_url}")
     logger.info(f"OpenAI configured: {bool(settings.openai_api_key and settings.openai_api_key != 'your_openai_api_key_here')}")
+    tts_cache.load()
+    init_db()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("👋 English Studio API shutting down...")
+    tts_cache.close()
+    exercise_feedback_cache.close()
+    if shared_store:
+        shared_store.close()
+    await openai_service.close_client()
+    engine.dispose()
 
 
 if __name__ == "__main__":
+    # Development server; in production run `gunicorn -c gunicorn.conf.py main:app`
     import uvicorn
     uvicorn.run(
         "main:app",
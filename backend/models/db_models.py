@@ -0,0 +1,92 @@
+"""
+Database models - SQLAlchemy tables for persisted user progress
+"""
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Date, DateTime, Float, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import Base
+
+
+class SRSMixin:
+    """Spaced-repetition state (see services/srs_scheduler.py)"""
+    srs_ease: Mapped[float] = mapped_column(Float, default=2.5)
+    srs_interval_days: Mapped[float] = mapped_column(Float, default=0.0)
+    srs_repetitions: Mapped[int] = mapped_column(Integer, default=0)
+    # Indexed with user_id on each table: the review queue is a range scan ordered by due_at
+    due_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class WeakWordRecord(SRSMixin, Base):
+    """A word the user struggles with; one row per (user, word)"""
+    __tablename__ = "weak_words"
+    __table_args__ = (
+        # Upsert target and per-word lookups
+        UniqueConstraint("user_id", "word", name="uq_weak_words_user_word"),
+        # Top-N weak words per user without a scan
+        Index("ix_weak_words_user_error_count", "user_id", "error_count"),
+        Index("ix_weak_words_user_due", "user_id", "due_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(64))
+    word: Mapped[str] = mapped_column(String(128))  # Lowercased
+    error_type: Mapped[str] = mapped_column(String(32))
+    error_count: Mapped[int] = mapped_column(Integer, default=1)
+    last_practiced: Mapped[datetime] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class SavedPhraseRecord(SRSMixin, Base):
+    """A phrase in the user's personal bank"""
+    __tablename__ = "saved_phrases"
+    __table_args__ = (
+        # Duplicate check is case-insensitive, like the frontend's
+        UniqueConstraint("user_id", "phrase_key", name="uq_saved_phrases_user_phrase"),
+        Index("ix_saved_phrases_user_topic", "user_id", "topic"),
+        Index("ix_saved_phrases_user_due", "user_id", "due_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(64))
+    phrase: Mapped[str] = mapped_column(Text)
+    phrase_key: Mapped[str] = mapped_column(Text)  # Lowercased phrase
+    source: Mapped[str] = mapped_column(String(64))
+    topic: Mapped[str] = mapped_column(String(64))
+    saved_at: Mapped[datetime] = mapped_column(DateTime)
+
+    # Practice stats (mirror updatePhraseStats in the frontend)
+    practice_count: Mapped[int] = mapped_column(Integer, default=0)
+    success_streak: Mapped[int] = mapped_column(Integer, default=0)
+    avg_score: Mapped[float] = mapped_column(Float, default=0.0)
+    status: Mapped[str] = mapped_column(String(16), default="weak")  # weak | learning | mastered
+    last_practiced_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+class ProcessedEvent(Base):
+    """Idempotency keys of ingested user events; a key is applied at most once"""
+    __tablename__ = "processed_events"
+
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    idempotency_key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    processed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class DailyRollup(Base):
+    """Per-user activity totals for one local calendar day, updated as events arrive"""
+    __tablename__ = "daily_rollups"
+
+    # Primary key doubles as the (user_id, day) range index for week queries
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    speaking_minutes: Mapped[float] = mapped_column(Float, default=0.0)
+    sessions: Mapped[int] = mapped_column(Integer, default=0)
+    practice_count: Mapped[int] = mapped_column(Integer, default=0)
+    score_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    score_count: Mapped[int] = mapped_column(Integer, default=0)
+    words_mastered: Mapped[int] = mapped_column(Integer, default=0)
+    phrases_saved: Mapped[int] = mapped_column(Integer, default=0)
+    errors_recorded: Mapped[int] = mapped_column(Integer, default=0)
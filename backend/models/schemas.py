@@ -2,7 +2,7 @@
 Pydantic models for request/response validation
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Union, Annotated
 
 
 # ===== CHAT MODELS =====
@@ -18,6 +18,10 @@ class ChatRequest(BaseModel):
         default=None,
         description="Additional context (lesson_id, level, etc.)"
     )
+    conversation_id: Optional[str] = Field(
+        default=None,
+        description="Conversation ID from a previous reply (omit to start a new conversation)"
+    )
 
 
 class ChatResponse(BaseModel):
@@ -31,6 +35,10 @@ class ChatResponse(BaseModel):
         default=None,
         description="URL to TTS audio (if generated)"
     )
+    conversation_id: Optional[str] = Field(
+        default=None,
+        description="Server-side conversation ID to send with the next message"
+    )
 
 
 # ===== EXERCISE MODELS =====
@@ -48,13 +56,25 @@ class ExerciseCheckRequest(BaseModel):
         default=None,
         description="The original question"
     )
+    feedback_mode: Literal["sync", "async", "none"] = Field(
+        default="sync",
+        description="sync: wait for AI feedback; async: return the grade now and a feedback job id; none: grade only"
+    )
 
 
 class ExerciseCheckResponse(BaseModel):
     """Response model for exercise check"""
     is_correct: bool = Field(..., description="Whether answer is correct")
-    score: float = Field(..., description="Score percentage (0-100)")
-    feedback: str = Field(..., description="Feedback from teacher")
+    score: float = Field(..., description="Score percentage (0-100, partial credit for fill_blank/reorder)")
+    feedback: str = Field(default="", description="Feedback from teacher (empty while pending)")
+    feedback_status: Literal["ready", "pending", "skipped"] = Field(
+        default="ready",
+        description="Whether feedback is included, still being generated, or not requested"
+    )
+    feedback_job_id: Optional[str] = Field(
+        default=None,
+        description="Fetch pending feedback from /api/lesson/feedback/{feedback_job_id}"
+    )
     emotion_tag: Literal["neutral", "praise", "corrective", "encouraging"] = Field(
         default="neutral",
         description="Emotion tag for avatar"
@@ -65,6 +85,13 @@ class ExerciseCheckResponse(BaseModel):
     )
 
 
+class ExerciseFeedbackResult(BaseModel):
+    """Response model for a feedback job"""
+    job_id: str
+    status: Literal["pending", "ready", "failed"]
+    feedback: Optional[str] = None
+
+
 # ===== TTS MODELS =====
 
 class TTSRequest(BaseModel):
@@ -113,6 +140,13 @@ class SpeakingEvaluationResponse(BaseModel):
 
 # ===== READ-ALOUD CHECK MODELS =====
 
+class WordAlignment(BaseModel):
+    """One aligned word pair (for highlighting the transcript)"""
+    op: str = Field(..., description="equal | substitute | delete | insert")
+    expected: Optional[str] = Field(default=None, description="Expected word (None for insertions)")
+    spoken: Optional[str] = Field(default=None, description="Spoken word (None for deletions)")
+
+
 class AccuracyDetails(BaseModel):
     """Detailed accuracy breakdown"""
     word_accuracy: float = Field(..., description="Word-level accuracy (0-100)")
@@ -123,6 +157,10 @@ class AccuracyDetails(BaseModel):
     deletions: int = Field(..., description="Number of missing words")
     expected_words: List[str] = Field(..., description="Expected word list")
     spoken_words: List[str] = Field(..., description="Spoken word list")
+    alignment: Optional[List[WordAlignment]] = Field(
+        default=None,
+        description="Word-by-word alignment of spoken against expected text"
+    )
 
 
 class ReadAloudResponse(BaseModel):
@@ -130,7 +168,7 @@ class ReadAloudResponse(BaseModel):
     transcript: str = Field(..., description="What the user said (transcribed)")
     expected_text: str = Field(..., description="What they should have said")
     word_accuracy: float = Field(..., description="Word-level accuracy (0-100)")
-    ai_feedback: str = Field(..., description="AI-generated feedback (legacy, combined)")
+    ai_feedback: str = Field(default="", description="AI-generated feedback (legacy, combined; empty while pending)")
     overall_score: float = Field(..., description="Final hybrid score (0-100)")
     emotion_tag: Literal["neutral", "praise", "corrective", "encouraging"] = Field(
         default="neutral",
@@ -140,9 +178,9 @@ class ReadAloudResponse(BaseModel):
         default=None,
         description="Detailed accuracy breakdown"
     )
-    # Bilingual feedback
-    feedback_en: str = Field(..., description="Short feedback in English (1-2 sentences)")
-    feedback_vi: str = Field(..., description="Short feedback in Vietnamese (1-2 sentences)")
+    # Bilingual feedback (empty while pending with feedback_mode=async)
+    feedback_en: str = Field(default="", description="Short feedback in English (1-2 sentences)")
+    feedback_vi: str = Field(default="", description="Short feedback in Vietnamese (1-2 sentences)")
     tts_en_url: Optional[str] = Field(
         default=None,
         description="URL to English feedback audio"
@@ -151,6 +189,14 @@ class ReadAloudResponse(BaseModel):
         default=None,
         description="URL to Vietnamese feedback audio"
     )
+    feedback_status: Literal["ready", "pending"] = Field(
+        default="ready",
+        description="Whether feedback is included or still being generated"
+    )
+    feedback_job_id: Optional[str] = Field(
+        default=None,
+        description="Fetch pending feedback from /api/speaking/feedback/{feedback_job_id}"
+    )
     # Tricky words
     tricky_words: Optional[List[str]] = Field(
         default=None,
@@ -162,6 +208,16 @@ class ReadAloudResponse(BaseModel):
     )
 
 
+class ReadAloudFeedbackResult(BaseModel):
+    """Response model for a read-aloud feedback job"""
+    job_id: str
+    status: Literal["pending", "ready", "failed"]
+    feedback_en: Optional[str] = None
+    feedback_vi: Optional[str] = None
+    tts_en_url: Optional[str] = None
+    tts_vi_url: Optional[str] = None
+
+
 # ===== LIVE TALK MODELS =====
 
 class LiveTalkMessage(BaseModel):
@@ -170,6 +226,18 @@ class LiveTalkMessage(BaseModel):
     content: str = Field(..., description="Message content")
 
 
+class LiveTalkStreamConfig(BaseModel):
+    """First message of a /turn/stream WebSocket session"""
+    user_id: str = Field(default="anonymous", description="User ID")
+    coach_id: str = Field(default="ivy", description="Coach ID (ivy or leo)")
+    topic: Optional[str] = Field(default=None, description="Conversation topic context")
+    session_id: Optional[str] = Field(default=None, description="Server-side session ID from a previous turn")
+    history: Optional[List[dict]] = Field(
+        default=None,
+        description="Legacy conversation history, only used to seed a new session"
+    )
+
+
 class LiveTalkSessionStats(BaseModel):
     """Session statistics for live talk"""
     turn_count: int = Field(..., description="Number of conversation turns")
@@ -190,6 +258,10 @@ class LiveTalkResponse(BaseModel):
         ...,
         description="Current session statistics"
     )
+    session_id: Optional[str] = Field(
+        default=None,
+        description="Server-side session ID to send with the next turn"
+    )
 
 
 class LiveTalkMission(BaseModel):
@@ -220,7 +292,7 @@ class WeakWord(BaseModel):
         ...,
         description="Type of error made"
     )
-    error_count: int = Field(..., description="Number of times mispronounced")
+    error_count: int = Field(..., ge=1, description="Number of times mispronounced")
     last_practiced: str = Field(..., description="ISO timestamp of last practice")
 
 
@@ -238,3 +310,136 @@ class UserProgress(BaseModel):
     weak_words: List[WeakWord] = Field(default_factory=list, description="Words to practice")
     saved_phrases: List[SavedPhrase] = Field(default_factory=list, description="User's phrase bank")
     session_count: int = Field(default=0, description="Total sessions completed")
+
+
+# ===== SPACED REPETITION MODELS =====
+
+class DueItem(BaseModel):
+    """A weak word or saved phrase scheduled for review"""
+    kind: Literal["weak_word", "phrase"] = Field(..., description="Item type")
+    text: str = Field(..., description="The word or phrase")
+    due_at: str = Field(..., description="ISO timestamp when the review is due")
+    status: Literal["weak", "learning", "mastered"] = Field(..., description="Learning status")
+    interval_days: float = Field(..., description="Current review interval")
+    repetitions: int = Field(..., description="Successful reviews in a row")
+    error_count: Optional[int] = Field(default=None, description="Times mispronounced (weak words)")
+    topic: Optional[str] = Field(default=None, description="Topic (phrases)")
+
+
+class ReviewRequest(BaseModel):
+    """Result of reviewing one due item"""
+    user_id: str = Field(..., description="User identifier")
+    kind: Literal["weak_word", "phrase"] = Field(..., description="Item type")
+    text: str = Field(..., description="The word or phrase reviewed")
+    score: float = Field(..., ge=0, le=100, description="Practice score (0-100)")
+    reviewed_at: Optional[str] = Field(default=None, description="ISO timestamp (defaults to now)")
+
+
+# ===== USER EVENT INGESTION MODELS =====
+
+class WeakWordEvent(BaseModel):
+    """A mistaken word (adds error_count to the stored word)"""
+    type: Literal["weak_word"] = "weak_word"
+    idempotency_key: str = Field(..., min_length=1, max_length=128, description="Client-generated unique event ID")
+    weak_word: WeakWord
+
+
+class PhraseSavedEvent(BaseModel):
+    """A phrase added to the user's bank"""
+    type: Literal["phrase_saved"] = "phrase_saved"
+    idempotency_key: str = Field(..., min_length=1, max_length=128, description="Client-generated unique event ID")
+    phrase: SavedPhrase
+
+
+class PhrasePracticeEvent(BaseModel):
+    """A practice attempt on a saved phrase"""
+    type: Literal["phrase_practice"] = "phrase_practice"
+    idempotency_key: str = Field(..., min_length=1, max_length=128, description="Client-generated unique event ID")
+    phrase: str = Field(..., description="Text of the saved phrase")
+    score: float = Field(..., ge=0, le=100, description="Practice score (0-100)")
+    practiced_at: str = Field(..., description="ISO timestamp of the attempt")
+
+
+class SessionEvent(BaseModel):
+    """A finished practice session (lesson, live talk, speaking lab...)"""
+    type: Literal["session"] = "session"
+    idempotency_key: str = Field(..., min_length=1, max_length=128, description="Client-generated unique event ID")
+    activity: str = Field(..., max_length=64, description="Session type (e.g. 'lesson', 'live_talk', 'speaking_lab')")
+    minutes: float = Field(..., ge=0, le=600, description="Active speaking/practice minutes")
+    score: Optional[float] = Field(default=None, ge=0, le=100, description="Session score (0-100), if any")
+    ended_at: str = Field(..., description="ISO timestamp when the session ended")
+
+
+UserEvent = Annotated[
+    Union[WeakWordEvent, PhraseSavedEvent, PhrasePracticeEvent, SessionEvent],
+    Field(discriminator="type")
+]
+
+
+class UserEventBatch(BaseModel):
+    """Batch of progress events, applied in one transaction"""
+    user_id: str = Field(..., min_length=1, max_length=64, description="User identifier")
+    events: List[UserEvent] = Field(..., max_length=500, description="Events in the order they happened")
+
+
+class UserEventBatchResponse(BaseModel):
+    """Outcome of an event batch"""
+    user_id: str
+    received: int = Field(..., description="Events in the request")
+    applied: int = Field(..., description="Events written")
+    duplicates: int = Field(..., description="Events skipped because their idempotency key was already seen")
+    skipped: int = Field(default=0, description="Events with nothing to apply (e.g. practice on an unknown phrase)")
+
+
+# ===== WEEKLY PROGRESS MODELS =====
+
+class DailyActivity(BaseModel):
+    """One day of a weekly progress report"""
+    date: str = Field(..., description="Local calendar day (YYYY-MM-DD)")
+    day_name: str = Field(..., description="Mon, Tue, ...")
+    speaking_minutes: float = Field(..., description="Practice minutes (capped at 60 for display)")
+    sessions: int = Field(..., description="Sessions finished")
+    words_count: int = Field(..., description="Weak words mastered")
+    phrases_count: int = Field(..., description="Phrases saved")
+    practice_count: int = Field(..., description="Scored practice attempts")
+    avg_score: float = Field(..., description="Average practice score (0 if none)")
+
+
+class WeeklyStats(BaseModel):
+    """Totals for one Monday-Sunday week"""
+    week_offset: int = Field(..., description="0 = this week, -1 = last week, ...")
+    start_date: str = Field(..., description="Monday (YYYY-MM-DD)")
+    end_date: str = Field(..., description="Sunday (YYYY-MM-DD)")
+    speaking_minutes: float
+    sessions: int
+    words_mastered: int
+    phrases_saved: int
+    practice_count: int
+    avg_score: float = Field(..., description="Average of all scored attempts in the week")
+    active_days: int
+    streak: int = Field(..., description="Consecutive active days ending today (week_offset 0 only)")
+    daily_activity: List[DailyActivity]
+
+
+class ProgressInsight(BaseModel):
+    """A short observation comparing the week with the previous one"""
+    type: str
+    icon: str
+    message: str
+    value: str
+
+
+class GoalProgress(BaseModel):
+    """Speaking minutes against the weekly goal"""
+    current: float
+    target: float
+    percentage: int
+
+
+class WeeklyProgressResponse(BaseModel):
+    """Response model for /api/user/progress"""
+    user_id: str
+    this_week: WeeklyStats
+    last_week: WeeklyStats
+    insights: List[ProgressInsight]
+    goal_progress: GoalProgress
@@ -1,10 +1,17 @@
 """
 Chat Router - Endpoints for chatting with Coach Ivy
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from models.schemas import ChatRequest, ChatResponse
 from services import openai_service
+from services.prompts import prompt_cache_stats
+from services.session_store import ConversationSession, chat_conversations
+from services.upstream import CircuitOpenError
+import json
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
@@ -14,29 +21,58 @@ router = APIRouter(
 )
 
 
+async def _resume_conversation(request: ChatRequest) -> ConversationSession:
+    """Return the request's live conversation, or start a new one"""
+    conversation = await chat_conversations.get(request.conversation_id)
+    if conversation:
+        return conversation
+
+    if request.conversation_id:
+        logger.warning(f"Unknown or expired conversation {request.conversation_id}, starting a new one")
+    user_id = (request.context or {}).get("user_id") or "anonymous"
+    return await chat_conversations.create(user_id=str(user_id))
+
+
+async def _record_exchange(conversation: ConversationSession, message: str, reply: str) -> None:
+    """Append a completed user/coach exchange and keep the conversation alive"""
+    conversation.add_message("user", message)
+    conversation.add_message("assistant", reply)
+    await chat_conversations.touch(conversation)
+
+
 @router.post("/chat-teacher", response_model=ChatResponse)
-async def chat_with_teacher(request: ChatRequest):
+async def chat_with_teacher(request: ChatRequest, background_tasks: BackgroundTasks):
     """
     Chat with Coach Ivy - Your personal English teacher
 
     This endpoint allows free-form conversation with the AI teacher.
     Use different modes for different types of interactions.
 
+    Conversations are kept server-side: send back the returned
+    conversation_id and Ivy sees a rolling summary plus the most recent
+    turns that fit the context token budget.
+
     Modes:
     - free_chat: General conversation practice
     - explain: Ask for explanations of concepts
     - speaking_feedback: Get feedback on your speaking
     """
     try:
-        logger.info(f"Chat request - mode: {request.mode}, message: {request.message[:50]}...")
+        logger.info(f"Chat request - mode: {request.mode}, conversation: {request.conversation_id}, message: {request.message[:50]}...")
+        conversation = await _resume_conversation(request)
 
         # Call OpenAI service
         reply, emotion_tag = await openai_service.chat_with_coach(
             message=request.message,
             mode=request.mode,
-            context=request.context
+            context=request.context,
+            history=chat_conversations.context_messages(conversation)
         )
 
+        # Record the exchange; fold turns that left the window into the summary off the request path
+        await _record_exchange(conversation, request.message, reply)
+        background_tasks.add_task(chat_conversations.compact, conversation)
+
         # Optionally generate TTS (for now, we'll leave it None)
         # In the future, we can add TTS generation here if needed
         tts_url = None
@@ -44,12 +80,96 @@ async def chat_with_teacher(request: ChatRequest):
         return ChatResponse(
             reply=reply,
             emotion_tag=emotion_tag,
-            tts_url=tts_url
+            tts_url=tts_url,
+            conversation_id=conversation.session_id
         )
 
+    except CircuitOpenError as e:
+        logger.warning(f"Chat unavailable: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Coach Ivy is unavailable right now, please try again shortly",
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
     except Exception as e:
         logger.error(f"Error in chat_with_teacher: {e}")
         raise HTTPException(
             status_code=500,
             detail="Failed to process chat request"
         )
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat-teacher/stream")
+async def stream_chat_with_teacher(request: ChatRequest):
+    """
+    Chat with Coach Ivy, streaming the reply as server-sent events
+
+    Same request body as /api/chat-teacher. Events:
+    - token: {"text": "..."} for each chunk as the model produces it
+    - done: {"reply": "...", "emotion_tag": "...", "conversation_id": "..."} once the reply is complete
+    - error: {"detail": "..."} if the model call fails mid-stream
+      (plus "retry_after" seconds when the model is temporarily unavailable)
+
+    The exchange is only added to the conversation once the reply is complete.
+    """
+    logger.info(f"Chat stream request - mode: {request.mode}, conversation: {request.conversation_id}, message: {request.message[:50]}...")
+    conversation = await _resume_conversation(request)
+    history = chat_conversations.context_messages(conversation)
+
+    async def events():
+        parts = []
+        try:
+            async for delta in openai_service.stream_chat_with_coach(
+                message=request.message,
+                mode=request.mode,
+                context=request.context,
+                history=history
+            ):
+                parts.append(delta)
+                yield _sse("token", {"text": delta})
+
+            reply = "".join(parts).strip()
+            emotion_tag = openai_service.analyze_emotion(reply)
+            logger.info(f"Coach Ivy streamed reply (mode={request.mode}, emotion={emotion_tag})")
+            await _record_exchange(conversation, request.message, reply)
+            yield _sse("done", {
+                "reply": reply,
+                "emotion_tag": emotion_tag,
+                "conversation_id": conversation.session_id
+            })
+
+        except CircuitOpenError as e:
+            logger.warning(f"Chat stream unavailable: {e}")
+            yield _sse("error", {
+                "detail": "Coach Ivy is unavailable right now, please try again shortly",
+                "retry_after": math.ceil(e.retry_after)
+            })
+        except Exception as e:
+            logger.error(f"Error in stream_chat_with_teacher: {e}")
+            yield _sse("error", {"detail": "Failed to process chat request"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Don't let a reverse proxy buffer the stream
+        },
+        background=BackgroundTask(chat_conversations.compact, conversation)
+    )
+
+
+@router.get("/prompt-cache-stats")
+async def get_prompt_cache_stats():
+    """
+    Provider prompt-cache hit rates per prompt template
+
+    Counts requests whose usage reported cached prompt tokens, and the
+    share of prompt tokens served from the provider's prefix cache.
+    """
+    return prompt_cache_stats.stats()
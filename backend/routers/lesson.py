@@ -1,9 +1,12 @@
 """
 Lesson Router - Endpoints for lesson management and exercise checking
 """
-from fastapi import APIRouter, HTTPException
-from models.schemas import ExerciseCheckRequest, ExerciseCheckResponse
-from services import openai_service
+from fastapi import APIRouter, HTTPException, Query
+from models.schemas import ExerciseCheckRequest, ExerciseCheckResponse, ExerciseFeedbackResult
+from services import openai_service, grading_service
+from services.feedback_cache import exercise_feedback_cache
+from services.job_store import JobStore
+from services.shared_store import shared_store
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,37 +16,55 @@ router = APIRouter(
     tags=["lesson"]
 )
 
+# AI feedback generated after the grade was returned (feedback_mode=async)
+feedback_jobs = JobStore("exercise_feedback", ttl_seconds=600, shared=shared_store)
+
 
 @router.post("/check-exercise", response_model=ExerciseCheckResponse)
 async def check_exercise(request: ExerciseCheckRequest):
     """
     Check exercise answers and get AI-generated feedback
 
-    This endpoint evaluates the user's answers against correct answers
-    and uses ChatGPT to generate personalized feedback.
+    The grade (with partial credit for fill_blank and reorder) is computed
+    locally. AI feedback depends on feedback_mode:
+    - sync: generated before responding (cached feedback returns instantly)
+    - async: the grade returns immediately; cached feedback is included,
+      otherwise poll /api/lesson/feedback/{feedback_job_id}
+    - none: grade only
     """
     try:
-        logger.info(f"Exercise check - lesson: {request.lesson_id}, type: {request.exercise_type}")
-
-        # Use AI to generate feedback
-        is_correct, score, feedback, emotion_tag = await openai_service.check_exercise_with_feedback(
-            question=request.question or "Exercise question",
-            user_answers=request.user_answers,
-            correct_answers=request.correct_answers,
-            exercise_type=request.exercise_type
+        logger.info(f"Exercise check - lesson: {request.lesson_id}, type: {request.exercise_type}, feedback: {request.feedback_mode}")
+
+        question = request.question or "Exercise question"
+        grade = grading_service.grade(request.exercise_type, request.user_answers, request.correct_answers)
+        response = ExerciseCheckResponse(
+            is_correct=grade.is_correct,
+            score=grade.score,
+            emotion_tag=grade.emotion_tag,
+            tts_url=None  # TTS for the correct answer is not generated yet
         )
 
-        # Optionally generate TTS for correct answer
-        # For now, we'll leave it None
-        tts_url = None
+        if request.feedback_mode == "none":
+            response.feedback_status = "skipped"
+        elif request.feedback_mode == "sync":
+            response.feedback = await openai_service.get_exercise_feedback(
+                question, request.user_answers, request.correct_answers, request.exercise_type, grade.score
+            )
+        else:
+            cached = await openai_service.lookup_exercise_feedback(
+                question, request.user_answers, request.correct_answers, request.exercise_type
+            )
+            if cached is not None:
+                response.feedback = cached
+            else:
+                response.feedback_status = "pending"
+                response.feedback_job_id = await feedback_jobs.submit(openai_service.get_exercise_feedback(
+                    question, request.user_answers, request.correct_answers, request.exercise_type, grade.score,
+                    check_cache=False
+                ))
 
-        return ExerciseCheckResponse(
-            is_correct=is_correct,
-            score=score,
-            feedback=feedback,
-            emotion_tag=emotion_tag,
-            tts_url=tts_url
-        )
+        logger.info(f"Exercise checked: correct={grade.is_correct}, score={grade.score}")
+        return response
 
     except Exception as e:
         logger.error(f"Error in check_exercise: {e}")
@@ -51,3 +72,32 @@ async def check_exercise(request: ExerciseCheckRequest):
             status_code=500,
             detail="Failed to check exercise"
         )
+
+
+@router.get("/feedback/{job_id}", response_model=ExerciseFeedbackResult)
+async def get_exercise_feedback(
+    job_id: str,
+    wait: float = Query(default=0, ge=0, le=10, description="Seconds to wait for pending feedback")
+):
+    """
+    Fetch AI feedback requested with feedback_mode=async
+
+    With wait > 0 the request long-polls until the feedback is ready
+    (or the wait expires), so one request usually suffices.
+    """
+    job = await feedback_jobs.result(job_id, wait=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Feedback job not found or expired")
+
+    return ExerciseFeedbackResult(job_id=job_id, status=job["status"], feedback=job["result"])
+
+
+@router.get("/feedback-cache-stats")
+async def feedback_cache_stats():
+    """
+    Exercise feedback cache statistics
+
+    Returns memory/disk tier sizes, hit/miss counters and hit rate
+    since startup.
+    """
+    return await exercise_feedback_cache.astats()
@@ -2,18 +2,27 @@
 Live Talk Router - Free conversation with AI Coach (Ivy/Leo)
 Real-time voice conversation with gentle corrections and natural flow
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, HTTPException, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from models.schemas import (
     LiveTalkResponse,
     LiveTalkMessage,
     LiveTalkSessionStats,
     LiveTalkMission,
+    LiveTalkStreamConfig,
     SessionSummary
 )
+from pydantic import ValidationError
 from services import openai_service
+from services.prompts import persona_chat_messages
+from services.audio_ingest import AudioIngestError
+from services.session_store import ConversationSession, live_talk_sessions
+from services.upstream import CircuitOpenError
 from pathlib import Path
+import asyncio
 import logging
 import json
+import math
+import re
 from typing import Optional, List
 
 logger = logging.getLogger(__name__)
@@ -138,37 +147,133 @@ TOPIC_MISSIONS = {
 }
 
 
+# ===== CHAT HELPERS =====
+
+# Keeps references to fire-and-forget tasks (e.g. session summaries) alive
+_background_tasks: set = set()
+
+LIVE_TALK_COMPLETION_PARAMS = {
+    "model": "gpt-4",
+    "max_tokens": 150,  # Keep responses short
+    "temperature": 0.7  # Natural but not too random
+}
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+
+async def _start_session(
+    session_id: Optional[str],
+    user_id: str,
+    coach_id: str,
+    topic: Optional[str],
+    history: Optional[List[dict]] = None
+) -> ConversationSession:
+    """
+    Start a server-side session, seeded from legacy client history
+
+    Used when the client sent no session_id or the session expired;
+    older clients that post the full history keep working.
+    """
+    if session_id:
+        logger.warning(f"Unknown or expired session {session_id}, starting a new one")
+    return await live_talk_sessions.create(
+        user_id=user_id,
+        coach_id=coach_id,
+        topic=topic,
+        history=history
+    )
+
+
+def _build_chat_messages(session: ConversationSession, user_text: str) -> List[dict]:
+    """Build the ChatGPT message array for one turn with the coach persona"""
+    coach = COACH_PERSONAS.get(session.coach_id, COACH_PERSONAS["ivy"])
+    return persona_chat_messages(
+        coach["system_prompt"],
+        user_text,
+        topic_context=TOPIC_CONTEXTS.get(session.topic),
+        history=live_talk_sessions.context_messages(session)
+    )
+
+
+def _session_stats(session: ConversationSession) -> LiveTalkSessionStats:
+    """Session statistics from the session's running counters"""
+    return LiveTalkSessionStats(
+        turn_count=session.turn_count,
+        word_count=session.word_count,
+        duration_minutes=0  # Frontend will calculate duration
+    )
+
+
+async def _record_turn(session: ConversationSession, user_text: str, assistant_text: str) -> None:
+    """Append a completed user/coach exchange and keep the session alive"""
+    session.add_message("user", user_text)
+    session.add_message("assistant", assistant_text)
+    await live_talk_sessions.touch(session)
+
+
+def _parse_history(history: Optional[str]) -> List[dict]:
+    """Parse a legacy JSON history form field, tolerating bad input"""
+    if not history:
+        return []
+    try:
+        return json.loads(history)
+    except json.JSONDecodeError:
+        logger.warning("Invalid history JSON, starting fresh")
+        return []
+
+
+def _split_sentences(buffer: str) -> tuple[List[str], str]:
+    """
+    Split complete sentences off the front of a streaming text buffer
+
+    Returns:
+        tuple: (complete_sentences, remaining_partial_text)
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(buffer):
+        sentence = buffer[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    return sentences, buffer[start:]
+
+
 @router.post("/turn", response_model=LiveTalkResponse)
 async def live_talk_turn(
+    background_tasks: BackgroundTasks,
     audio: UploadFile = File(..., description="User's voice audio"),
     user_id: str = Form(..., description="User ID"),
     coach_id: str = Form(default="ivy", description="Coach ID (ivy or leo)"),
     topic: Optional[str] = Form(default=None, description="Conversation topic context"),
-    history: str = Form(default="[]", description="JSON array of conversation history")
+    session_id: Optional[str] = Form(default=None, description="Server-side session ID from a previous turn"),
+    history: str = Form(default="[]", description="JSON array of conversation history (only used to seed a new session)")
 ):
     """
     Handle one turn of live conversation
 
     Process flow:
     1. Transcribe user's audio (STT)
-    2. Build conversation context with coach persona
-    3. Get AI response from ChatGPT
+    2. Resume (or start) the server-side session
+    3. Get AI response from ChatGPT using the session's bounded context
     4. Generate TTS audio for response
-    5. Calculate session stats
-    6. Return response with audio URL
+    5. Record the turn and update running session stats
+    6. Return response with audio URL and session ID
 
     Args:
         audio: Audio file from user (webm, mp3, wav)
         user_id: User identifier
         coach_id: Coach to talk with (ivy or leo)
         topic: Optional topic context (daily_life, travel, work, hobbies)
-        history: JSON string of previous messages [{"role": "user", "content": "..."}]
+        session_id: Session ID returned by the previous turn
+        history: Legacy JSON history, used only when no live session exists
 
     Returns:
-        LiveTalkResponse with transcription, AI response, audio URL, and stats
+        LiveTalkResponse with transcription, AI response, audio URL, stats and session ID
     """
     try:
-        logger.info(f"Live Talk turn - user: {user_id}, coach: {coach_id}, topic: {topic}")
+        logger.info(f"Live Talk turn - user: {user_id}, coach: {coach_id}, topic: {topic}, session: {session_id}")
 
         # Step 1: Transcribe user audio using Whisper STT
         user_text = await openai_service.transcribe_audio(
@@ -184,73 +289,56 @@ async def live_talk_turn(
 
         logger.info(f"User said: '{user_text}'")
 
-        # Step 2: Parse conversation history
-        try:
-            messages = json.loads(history)
-        except json.JSONDecodeError:
-            logger.warning("Invalid history JSON, starting fresh")
-            messages = []
-
-        # Step 3: Build ChatGPT prompt with coach persona
-        coach = COACH_PERSONAS.get(coach_id, COACH_PERSONAS["ivy"])
-
-        system_prompt = coach["system_prompt"]
-
-        # Add topic context if provided
-        if topic and topic in TOPIC_CONTEXTS:
-            system_prompt += f"\n\n**Current topic context:** {TOPIC_CONTEXTS[topic]}"
+        # Step 2: Resume server-side session (history is only parsed for new sessions)
+        session = await live_talk_sessions.get(session_id)
+        if not session:
+            session = await _start_session(session_id, user_id, coach_id, topic, _parse_history(history))
 
-        # Build message array for ChatGPT
-        chat_messages = [{"role": "system", "content": system_prompt}]
-        chat_messages.extend(messages)
-        chat_messages.append({"role": "user", "content": user_text})
-
-        # Step 4: Call ChatGPT for coach response
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=chat_messages,
-            max_tokens=150,  # Keep responses short
-            temperature=0.7  # Natural but not too random
+        # Step 3: Call ChatGPT for coach response
+        response = await openai_service.create_chat_completion(
+            prompt="live_talk",
+            messages=_build_chat_messages(session, user_text),
+            **LIVE_TALK_COMPLETION_PARAMS
         )
 
         assistant_text = response.choices[0].message.content.strip()
-        logger.info(f"Coach {coach_id} replied: '{assistant_text[:100]}...'")
+        logger.info(f"Coach {session.coach_id} replied: '{assistant_text[:100]}...'")
 
-        # Step 5: Generate TTS for coach's response
-        tts_voice = coach["voice"]
+        # Step 4: Generate TTS for coach's response
+        coach = COACH_PERSONAS.get(session.coach_id, COACH_PERSONAS["ivy"])
         tts_path = await openai_service.generate_speech(
             text=assistant_text,
-            voice=tts_voice
+            voice=coach["voice"]
         )
         audio_url = f"/media/{Path(tts_path).name}"
 
-        # Step 6: Calculate session statistics
-        turn_count = len([m for m in messages if m["role"] == "user"]) + 1
-        word_count = sum(
-            len(m["content"].split())
-            for m in messages
-            if m["role"] == "user"
-        )
-        word_count += len(user_text.split())
+        # Step 5: Record turn, then summarize older turns after responding
+        await _record_turn(session, user_text, assistant_text)
+        background_tasks.add_task(live_talk_sessions.compact, session)
 
-        session_stats = LiveTalkSessionStats(
-            turn_count=turn_count,
-            word_count=word_count,
-            duration_minutes=0  # Frontend will calculate duration
-        )
-
-        logger.info(f"Session stats - turns: {turn_count}, words: {word_count}")
+        session_stats = _session_stats(session)
+        logger.info(f"Session stats - turns: {session_stats.turn_count}, words: {session_stats.word_count}")
 
         return LiveTalkResponse(
             user_text=user_text,
             assistant_text=assistant_text,
             audio_url=audio_url,
             correction=None,  # Corrections are embedded in assistant_text
-            session_stats=session_stats
+            session_stats=session_stats,
+            session_id=session.session_id
         )
 
     except HTTPException:
         raise
+    except AudioIngestError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except CircuitOpenError as e:
+        logger.warning(f"Live Talk turn unavailable: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="The coach is unavailable right now, please try again shortly",
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
     except Exception as e:
         logger.error(f"Error in live_talk_turn: {e}")
         raise HTTPException(
@@ -259,6 +347,192 @@ async def live_talk_turn(
         )
 
 
+@router.websocket("/turn/stream")
+async def live_talk_turn_stream(websocket: WebSocket):
+    """
+    Streaming variant of /turn over WebSocket
+
+    Instead of waiting for the full reply and its TTS, the coach reply is
+    streamed token by token, split at sentence boundaries, and each
+    sentence's audio is pushed as soon as it is synthesized. Sentences are
+    synthesized concurrently but delivered in order.
+
+    Protocol:
+    1. Client sends a JSON config message:
+       {"user_id": "...", "coach_id": "ivy", "topic": "travel", "session_id": "..."}
+       (a legacy "history" array may be sent instead of session_id)
+    2. Client sends each turn's recorded audio as one binary message
+    3. Server replies per turn with JSON events:
+       {"type": "transcript", "text": "..."}
+       {"type": "token", "text": "..."}               (repeated)
+       {"type": "audio", "index": 0, "text": "...", "audio_url": "/media/..."}
+       {"type": "done", "assistant_text": "...", "session_stats": {...}, "session_id": "..."}
+       {"type": "error", "detail": "..."}              (turn failed, socket stays open)
+
+    An invalid config message gets an error event and the socket is closed
+    (1008); a text message where turn audio was expected only fails that turn.
+
+    Turns are recorded in the server-side session, so later turns only send
+    audio and the same session_id can be used with /turn and /end-session.
+    """
+    await websocket.accept()
+    send_lock = asyncio.Lock()
+
+    async def send(payload: dict):
+        # Token and audio events are sent from different tasks
+        async with send_lock:
+            await websocket.send_json(payload)
+
+    try:
+        config = _parse_stream_config(await _receive_frame(websocket))
+        if config is None:
+            await send({"type": "error", "detail": "The first message must be a JSON session config object"})
+            await websocket.close(code=1008)
+            return
+
+        session = await live_talk_sessions.get(config.session_id)
+        if not session:
+            session = await _start_session(
+                config.session_id,
+                user_id=config.user_id,
+                coach_id=config.coach_id,
+                topic=config.topic,
+                history=config.history
+            )
+        coach = COACH_PERSONAS.get(session.coach_id, COACH_PERSONAS["ivy"])
+
+        logger.info(f"Live Talk stream opened - user: {session.user_id}, coach: {session.coach_id}, session: {session.session_id}")
+
+        while True:
+            audio_bytes = (await _receive_frame(websocket)).get("bytes")
+            if audio_bytes is None:
+                await send({"type": "error", "detail": "Send each turn's audio as a binary message"})
+                continue
+            try:
+                user_text = await openai_service.transcribe_audio_bytes(audio_bytes, language="en")
+                if not user_text.strip():
+                    await send({"type": "error", "detail": "Could not transcribe audio. Please try speaking again."})
+                    continue
+
+                await send({"type": "transcript", "text": user_text})
+
+                chat_messages = _build_chat_messages(session, user_text)
+                assistant_text = await _stream_reply(send, chat_messages, coach["voice"])
+                logger.info(f"Coach {session.coach_id} streamed: '{assistant_text[:100]}...'")
+
+                await _record_turn(session, user_text, assistant_text)
+
+                await send({
+                    "type": "done",
+                    "user_text": user_text,
+                    "assistant_text": assistant_text,
+                    "session_stats": _session_stats(session).model_dump(),
+                    "session_id": session.session_id
+                })
+
+                # Summarize older turns while the learner listens
+                compaction = asyncio.create_task(live_talk_sessions.compact(session))
+                _background_tasks.add(compaction)
+                compaction.add_done_callback(_background_tasks.discard)
+
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.error(f"Error in live_talk_turn_stream: {e}")
+                await send({"type": "error", "detail": f"Failed to process conversation turn: {str(e)}"})
+
+    except WebSocketDisconnect:
+        logger.info("Live Talk stream closed by client")
+    except Exception as e:
+        logger.error(f"Error in live_talk_turn_stream: {e}")
+        try:
+            await send({"type": "error", "detail": "Live Talk stream failed, please reconnect"})
+            await websocket.close(code=1011)
+        except Exception:
+            pass  # Already closed
+
+
+async def _receive_frame(websocket: WebSocket) -> dict:
+    """Next WebSocket message ({"text": ...} or {"bytes": ...}); raises on disconnect"""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    return message
+
+
+def _parse_stream_config(message: dict) -> Optional[LiveTalkStreamConfig]:
+    """Validated stream config from a text message, or None if it is not a valid config object"""
+    if message.get("text") is None:
+        return None
+    try:
+        return LiveTalkStreamConfig.model_validate_json(message["text"])
+    except ValidationError as e:
+        logger.warning(f"Invalid Live Talk stream config: {e.errors()[:1]}")
+        return None
+
+
+async def _stream_reply(send, chat_messages: List[dict], voice: str) -> str:
+    """
+    Stream one coach reply, pushing token events and per-sentence audio
+
+    Returns:
+        str: The full assistant reply
+    """
+    pending: asyncio.Queue = asyncio.Queue()
+
+    async def deliver_audio():
+        # Await TTS tasks in sentence order so audio plays back in sequence
+        index = 0
+        while (item := await pending.get()) is not None:
+            sentence, tts_task = item
+            try:
+                tts_path = await tts_task
+                await send({
+                    "type": "audio",
+                    "index": index,
+                    "text": sentence,
+                    "audio_url": f"/media/{Path(tts_path).name}"
+                })
+            except Exception as e:
+                logger.error(f"Error generating TTS for sentence {index}: {e}")
+            index += 1
+
+    def enqueue(sentence: str):
+        tts_task = asyncio.create_task(openai_service.generate_speech(text=sentence, voice=voice))
+        pending.put_nowait((sentence, tts_task))
+
+    deliverer = asyncio.create_task(deliver_audio())
+    parts = []
+    buffer = ""
+    try:
+        async for delta in openai_service.stream_chat_completion(
+            prompt="live_talk",
+            messages=chat_messages,
+            **LIVE_TALK_COMPLETION_PARAMS
+        ):
+            parts.append(delta)
+            await send({"type": "token", "text": delta})
+
+            sentences, buffer = _split_sentences(buffer + delta)
+            for sentence in sentences:
+                enqueue(sentence)
+
+        if buffer.strip():
+            enqueue(buffer.strip())
+        pending.put_nowait(None)
+        await deliverer
+
+    finally:
+        if not deliverer.done():
+            deliverer.cancel()
+            while not pending.empty():
+                item = pending.get_nowait()
+                if item is not None:
+                    item[1].cancel()
+
+    return "".join(parts).strip()
+
+
 @router.get("/mission", response_model=LiveTalkMission)
 async def get_mission(topic: str = "daily_life"):
     """
@@ -289,9 +563,10 @@ async def get_mission(topic: str = "daily_life"):
 
 @router.post("/end-session", response_model=SessionSummary)
 async def end_live_talk_session(
-    history: str = Form(..., description="JSON array of conversation messages"),
     topic: str = Form(..., description="Conversation topic"),
-    user_id: str = Form(..., description="User ID")
+    user_id: str = Form(..., description="User ID"),
+    session_id: Optional[str] = Form(default=None, description="Server-side session ID"),
+    history: Optional[str] = Form(default=None, description="JSON array of conversation messages (legacy clients)")
 ):
     """
     Generate AI summary for completed Live Talk session
@@ -303,9 +578,10 @@ async def end_live_talk_session(
     - Practice suggestion for improvement
 
     Args:
-        history: JSON string of conversation messages
         topic: Topic that was discussed
         user_id: User identifier
+        session_id: Server-side session ID (preferred; the session is closed afterwards)
+        history: JSON string of conversation messages, if no session is available
 
     Returns:
         SessionSummary with AI-generated feedback
@@ -313,14 +589,23 @@ async def end_live_talk_session(
     try:
         logger.info(f"Generating session summary - user: {user_id}, topic: {topic}")
 
-        # Parse conversation history
-        try:
-            messages = json.loads(history)
-        except json.JSONDecodeError:
+        # Use server-side session turns, falling back to posted history
+        session = await live_talk_sessions.get(session_id)
+        if session:
+            messages = session.transcript()
+        elif history is None:
             raise HTTPException(
-                status_code=400,
-                detail="Invalid history JSON format"
+                status_code=404,
+                detail="Session not found or expired"
             )
+        else:
+            try:
+                messages = json.loads(history)
+            except json.JSONDecodeError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Invalid history JSON format"
+                )
 
         if not messages:
             raise HTTPException(
@@ -359,7 +644,8 @@ Please provide a supportive and encouraging analysis in JSON format:
 Be very encouraging and supportive. Focus on progress, not perfection."""
 
         # Call GPT for analysis
-        response = client.chat.completions.create(
+        response = await openai_service.create_chat_completion(
+            prompt="live_talk_summary",
             model="gpt-4o-mini",
             messages=[
                 {
@@ -376,11 +662,16 @@ Be very encouraging and supportive. Focus on progress, not perfection."""
         logger.info(f"Summary generated: {summary_data}")
 
         # Calculate session stats
-        user_turns = [m for m in messages if m["role"] == "user"]
-        total_words = sum(len(turn["content"].split()) for turn in user_turns)
+        if session:
+            turns, total_words = session.turn_count, session.word_count
+            await live_talk_sessions.delete(session.session_id)
+        else:
+            user_turns = [m for m in messages if m["role"] == "user"]
+            turns = len(user_turns)
+            total_words = sum(len(turn["content"].split()) for turn in user_turns)
 
         return SessionSummary(
-            turns=len(user_turns),
+            turns=turns,
             total_words=total_words,
             duration_minutes=0,  # Frontend calculates this
             strengths=summary_data.get("strengths", "Great effort in practicing!"),
@@ -397,10 +688,3 @@ Be very encouraging and supportive. Focus on progress, not perfection."""
             status_code=500,
             detail=f"Failed to generate session summary: {str(e)}"
         )
-
-
-# Import OpenAI client at module level (after openai_service is imported)
-from openai import OpenAI
-from config import settings
-
-client = OpenAI(api_key=settings.openai_api_key)
@@ -1,9 +1,11 @@
 """
 Media Router - Serve static media files (audio, images, etc.)
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import FileResponse
+from config import settings
 import logging
+import re
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -13,25 +15,67 @@ router = APIRouter(
     tags=["media"]
 )
 
+# Media filenames are cache keys: a plain token plus the audio extension.
+# Anything else (slashes, "..", hidden files like the cache index) is rejected.
+MEDIA_FILENAME = re.compile(r"^[A-Za-z0-9_-]{1,128}\.mp3$")
 
-@router.get("/media/{filename}")
-async def get_media_file(filename: str):
+# Files are never rewritten under the same name, so clients may cache forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ImmutableFileResponse(FileResponse):
+    """
+    FileResponse whose If-Range check uses our content-key ETag
+
+    Starlette compares If-Range against its own mtime/size ETag; since we
+    replace that ETag, resumed downloads would otherwise restart from 0.
+    """
+
+    def _should_use_range(self, http_if_range: str, stat_result) -> bool:
+        return http_if_range == self.headers.get("etag")
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+@router.api_route("/media/{filename}", methods=["GET", "HEAD"])
+async def get_media_file(filename: str, request: Request):
     """
     Serve media files (audio files)
 
-    This endpoint serves the generated audio files
+    This endpoint serves the generated audio files. Filenames are content
+    keys, so responses carry a strong ETag and immutable Cache-Control,
+    conditional requests (If-None-Match) return 304, and Range / If-Range
+    requests are honored so clients can seek and resume.
     """
     try:
-        media_path = Path("media/tts") / filename
+        if not MEDIA_FILENAME.match(filename):
+            logger.warning(f"Rejected media filename: {filename!r}")
+            raise HTTPException(status_code=404, detail="Audio file not found")
 
-        if not media_path.exists():
+        media_path = Path(settings.tts_cache_dir) / filename
+
+        if not media_path.is_file():
             logger.error(f"Media file not found: {media_path}")
             raise HTTPException(status_code=404, detail="Audio file not found")
 
-        return FileResponse(
+        etag = f'"{media_path.stem}"'
+        cache_headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=cache_headers)
+
+        return ImmutableFileResponse(
             path=media_path,
             media_type="audio/mpeg",
-            filename=filename
+            filename=filename,
+            headers=cache_headers
         )
 
     except HTTPException:
@@ -1,11 +1,21 @@
 """
 Speaking Router - Speaking practice and pronunciation evaluation
 """
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from models.schemas import ReadAloudResponse, AccuracyDetails
-from services import openai_service, accuracy_service
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, Response
+from starlette.concurrency import run_in_threadpool
+from models.schemas import ReadAloudResponse, ReadAloudFeedbackResult, AccuracyDetails
+from services import openai_service, accuracy_service, progress_store
+from database import SessionLocal
+from services.audio_ingest import AudioIngestError
+from services.job_store import JobStore
+from services.metrics import stage_timer
+from services.pipeline import StageTimings
+from services.shared_store import shared_store
+from config import settings
+from pathlib import Path
+import asyncio
 import logging
-from typing import Optional
+from typing import Literal, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -14,75 +24,160 @@ router = APIRouter(
     tags=["speaking"]
 )
 
+# Feedback + feedback audio generated after the score was returned (feedback_mode=async)
+read_aloud_feedback_jobs = JobStore("read_aloud_feedback", ttl_seconds=600, shared=shared_store)
+
+
+def _record_read_aloud(user_id: str, weak_words: list[dict], score: float) -> None:
+    """Store the read-aloud's misread/skipped words and score (runs in the threadpool)"""
+    with SessionLocal() as db:
+        progress_store.record_read_aloud(db, user_id, weak_words, score)
+        db.commit()
+    logger.info(f"Recorded read-aloud for user {user_id}: {len(weak_words)} weak words")
+
+
+async def _feedback_with_audio(
+    timings: StageTimings,
+    expected_text: str,
+    transcript: str,
+    word_accuracy: float,
+    details: dict
+) -> dict:
+    """
+    Bilingual feedback and its EN + VI audio
+
+    Each stage has a deadline: slow feedback degrades to canned
+    feedback, slow TTS to no audio.
+    """
+    feedback_en, feedback_vi = await timings.run(
+        "feedback",
+        openai_service.generate_bilingual_feedback(
+            expected_text=expected_text,
+            spoken_text=transcript,
+            word_accuracy=word_accuracy,
+            accuracy_details=details
+        ),
+        timeout=settings.read_aloud_feedback_timeout_seconds,
+        fallback=openai_service.fallback_bilingual_feedback(word_accuracy)
+    )
+    logger.info(f"Bilingual feedback - EN: '{feedback_en[:50]}...', VI: '{feedback_vi[:50]}...'")
+
+    tts_en_path, tts_vi_path = await asyncio.gather(
+        timings.run(
+            "tts_en",
+            openai_service.generate_speech(text=feedback_en, voice="nova"),  # English voice
+            timeout=settings.read_aloud_tts_timeout_seconds,
+            fallback=None
+        ),
+        timings.run(
+            "tts_vi",
+            # Vietnamese TTS (OpenAI TTS supports Vietnamese with 'alloy' voice)
+            openai_service.generate_speech(text=feedback_vi, voice="alloy"),
+            timeout=settings.read_aloud_tts_timeout_seconds,
+            fallback=None
+        )
+    )
+    tts_en_url = f"/media/{Path(tts_en_path).name}" if tts_en_path else None
+    tts_vi_url = f"/media/{Path(tts_vi_path).name}" if tts_vi_path else None
+    logger.info(f"TTS generated - EN: {tts_en_url}, VI: {tts_vi_url}")
+
+    return {
+        "feedback_en": feedback_en,
+        "feedback_vi": feedback_vi,
+        "tts_en_url": tts_en_url,
+        "tts_vi_url": tts_vi_url
+    }
+
+
+async def _background_feedback(expected_text: str, transcript: str, word_accuracy: float, details: dict) -> dict:
+    """_feedback_with_audio for a feedback job (timings only go to the log)"""
+    timings = StageTimings()
+    feedback = await _feedback_with_audio(timings, expected_text, transcript, word_accuracy, details)
+    logger.info(f"Read-aloud feedback job stages: {timings.summary()}")
+    return feedback
+
 
 @router.post("/speaking/read-aloud", response_model=ReadAloudResponse)
 async def check_read_aloud(
+    response: Response,
     audio: UploadFile = File(..., description="Audio file (webm, mp3, wav)"),
     expected_text: str = Form(..., description="The text the user should read"),
-    language: str = Form(default="en", description="Language code")
+    language: str = Form(default="en", description="Language code"),
+    user_id: Optional[str] = Form(default=None, description="Record misread words and the score for this user"),
+    feedback_mode: Literal["sync", "async"] = Form(
+        default="sync",
+        description="sync: wait for feedback + audio; async: return the score now and a feedback job id"
+    )
 ):
     """
     Evaluate read-aloud pronunciation
 
     This endpoint:
     1. Transcribes user's audio using Whisper
-    2. Calculates word-level accuracy
-    3. Gets AI feedback on pronunciation
-    4. Returns hybrid score combining both metrics
+    2. Calculates word-level accuracy and the misread/skipped words
+    3. Gets AI feedback on pronunciation (and stores weak words, concurrently)
+    4. Generates EN + VI feedback audio concurrently
+    5. Returns hybrid score combining both metrics
+
+    With feedback_mode=async, steps 3-4 run after responding: the score,
+    alignment and tricky words return as soon as they are computed, and
+    the feedback + audio are fetched from /api/speaking/feedback/{feedback_job_id}.
+
+    tricky_words comes straight from the word alignment (no model tokens).
+    If user_id is given, those words are upserted into the weak-word store
+    (and the attempt counted in the daily progress rollup), so the client
+    no longer needs to save them one request at a time.
+
+    Every stage has a deadline; slow feedback or TTS degrades to
+    canned feedback / no audio instead of failing the request.
+    Per-stage timings are returned in the Server-Timing header.
 
     Supported audio formats: webm, mp3, wav, m4a
     """
+    timings = StageTimings()
     try:
         logger.info(f"Read-aloud check - Expected: '{expected_text[:50]}...', Audio: {audio.filename}")
 
         # Step 1: Transcribe audio using Whisper
-        transcript = await openai_service.transcribe_audio(
-            file=audio,
-            language=language
+        transcript = await timings.run(
+            "stt",
+            openai_service.transcribe_audio(file=audio, language=language),
+            timeout=settings.read_aloud_stt_timeout_seconds
         )
         logger.info(f"Transcript: '{transcript}'")
 
-        # Step 2: Calculate word accuracy
-        word_accuracy, details = accuracy_service.calculate_word_accuracy(
-            expected_text=expected_text,
-            spoken_text=transcript,
-            ignore_fillers=True
-        )
+        # Step 2: Calculate word accuracy (deterministic, no upstream call)
+        with timings.measure("accuracy"), stage_timer("accuracy"):
+            word_accuracy, details = accuracy_service.calculate_word_accuracy(
+                expected_text=expected_text,
+                spoken_text=transcript,
+                ignore_fillers=True
+            )
         logger.info(f"Word accuracy: {word_accuracy}%")
 
-        # Step 3: Generate bilingual AI feedback (EN + VI)
-        feedback_en, feedback_vi, tricky_words = await openai_service.generate_bilingual_feedback(
-            expected_text=expected_text,
-            spoken_text=transcript,
-            word_accuracy=word_accuracy,
-            accuracy_details=details
-        )
-        logger.info(f"Bilingual feedback - EN: '{feedback_en[:50]}...', VI: '{feedback_vi[:50]}...'")
-
-        # Step 4: Generate TTS for both feedbacks
-        try:
-            # English TTS
-            tts_en_path = await openai_service.generate_speech(
-                text=feedback_en,
-                voice="nova"  # English voice
-            )
-            tts_en_url = f"/media/{Path(tts_en_path).name}"
-            logger.info(f"EN TTS generated: {tts_en_url}")
-        except Exception as e:
-            logger.error(f"Error generating EN TTS: {e}")
-            tts_en_url = None
+        weak_words = details.get("weak_words", [])
+        tricky_words = [w["word"] for w in weak_words[:accuracy_service.MAX_TRICKY_WORDS]]
 
-        try:
-            # Vietnamese TTS (OpenAI TTS supports Vietnamese with 'alloy' voice)
-            tts_vi_path = await openai_service.generate_speech(
-                text=feedback_vi,
-                voice="alloy"  # Works for Vietnamese
+        # Step 3: Bilingual AI feedback (EN + VI) and its audio; store the attempt meanwhile
+        if feedback_mode == "async":
+            feedback_job_id = await read_aloud_feedback_jobs.submit(
+                _background_feedback(expected_text, transcript, word_accuracy, details)
             )
-            tts_vi_url = f"/media/{Path(tts_vi_path).name}"
-            logger.info(f"VI TTS generated: {tts_vi_url}")
-        except Exception as e:
-            logger.error(f"Error generating VI TTS: {e}")
-            tts_vi_url = None
+            feedback_stage = None
+        else:
+            feedback_job_id = None
+            feedback_stage = _feedback_with_audio(timings, expected_text, transcript, word_accuracy, details)
+
+        stages = [feedback_stage] if feedback_stage else []
+        if user_id:
+            # Best effort: a storage failure must not fail the evaluation
+            stages.append(timings.run(
+                "record",
+                run_in_threadpool(_record_read_aloud, user_id, weak_words, word_accuracy),
+                fallback=None
+            ))
+        results = await asyncio.gather(*stages)
+        feedback = results[0] if feedback_stage else {}
 
         # Step 5: Calculate hybrid score
         ai_score_estimate = word_accuracy
@@ -110,11 +205,15 @@ async def check_read_aloud(
             insertions=details.get("insertions", 0),
             deletions=details.get("deletions", 0),
             expected_words=details.get("expected_words", []),
-            spoken_words=details.get("spoken_words", [])
+            spoken_words=details.get("spoken_words", []),
+            alignment=details.get("alignment")
         )
 
         # Legacy combined feedback
-        ai_feedback_combined = f"{feedback_en} {feedback_vi}"
+        ai_feedback_combined = f"{feedback['feedback_en']} {feedback['feedback_vi']}" if feedback else ""
+
+        response.headers["Server-Timing"] = timings.server_timing()
+        logger.info(f"Read-aloud stages: {timings.summary()}")
 
         return ReadAloudResponse(
             transcript=transcript,
@@ -124,22 +223,41 @@ async def check_read_aloud(
             overall_score=overall_score,
             emotion_tag=emotion_tag,
             accuracy_details=accuracy_details_obj,
-            feedback_en=feedback_en,
-            feedback_vi=feedback_vi,
-            tts_en_url=tts_en_url,
-            tts_vi_url=tts_vi_url,
+            **feedback,
+            feedback_status="pending" if feedback_job_id else "ready",
+            feedback_job_id=feedback_job_id,
             tricky_words=tricky_words,
             tts_url=None
         )
 
+    except AudioIngestError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
-        logger.error(f"Error in check_read_aloud: {e}")
+        logger.error(f"Error in check_read_aloud: {e} ({timings.summary()})")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to evaluate pronunciation: {str(e)}"
         )
 
 
+@router.get("/speaking/feedback/{job_id}", response_model=ReadAloudFeedbackResult)
+async def get_read_aloud_feedback(
+    job_id: str,
+    wait: float = Query(default=0, ge=0, le=10, description="Seconds to wait for pending feedback")
+):
+    """
+    Fetch read-aloud feedback requested with feedback_mode=async
+
+    With wait > 0 the request long-polls until the feedback is ready
+    (or the wait expires), so one request usually suffices.
+    """
+    job = await read_aloud_feedback_jobs.result(job_id, wait=wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Feedback job not found or expired")
+
+    return ReadAloudFeedbackResult(job_id=job_id, status=job["status"], **(job["result"] or {}))
+
+
 @router.post("/speaking/free-speak")
 async def check_free_speaking(
     audio: UploadFile = File(..., description="Audio file"),
@@ -173,6 +291,8 @@ async def check_free_speaking(
             "tts_url": None
         }
 
+    except AudioIngestError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         logger.error(f"Error in check_free_speaking: {e}")
         raise HTTPException(
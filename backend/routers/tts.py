@@ -3,8 +3,10 @@ TTS Router - Text-to-Speech endpoints using OpenAI TTS
 """
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 from models.schemas import TTSRequest, TTSResponse
 from services import openai_service
+from services.tts_cache import tts_cache
 import logging
 from pathlib import Path
 
@@ -52,4 +54,15 @@ async def text_to_speech(request: TTSRequest):
         )
 
 
+@router.get("/tts/cache-stats")
+async def tts_cache_stats():
+    """
+    TTS cache statistics
+
+    Returns entry/byte usage against the configured budgets
+    and hit/miss/eviction counters since startup.
+    """
+    return await run_in_threadpool(tts_cache.stats)
+
+
 # Media serving moved to routers/media.py
@@ -1,12 +1,21 @@
 """
 User Progress Router - Track weak words, saved phrases, and learning progress
-For localStorage-based user data (ready for database migration)
+Backed by the progress store (SQLAlchemy); endpoints are sync and run in the threadpool
 """
-from fastapi import APIRouter, HTTPException, Form
-from models.schemas import WeakWord, SavedPhrase, UserProgress
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Form, Depends, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import get_db
+from models.schemas import (
+    UserEventBatch,
+    UserEventBatchResponse,
+    DueItem,
+    ReviewRequest,
+    WeeklyProgressResponse
+)
+from services import progress_store, progress_rollups
+from typing import Optional, Literal
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 
@@ -17,18 +26,18 @@ router = APIRouter(
 
 
 @router.post("/save-weak-word")
-async def save_weak_word(
+def save_weak_word(
     user_id: str = Form(...),
     word: str = Form(...),
     error_type: str = Form(...),
-    error_count: int = Form(default=1),
-    last_practiced: str = Form(...)
+    error_count: int = Form(default=1, ge=1),
+    last_practiced: str = Form(...),
+    db: Session = Depends(get_db)
 ):
     """
     Save a word that user struggles with
 
-    Currently returns success (frontend handles localStorage).
-    Ready for database integration.
+    Upserts on (user_id, word): a known word has error_count added to it.
 
     Args:
         user_id: User identifier
@@ -50,8 +59,17 @@ async def save_weak_word(
             detail=f"Invalid error_type. Must be one of: {valid_types}"
         )
 
-    # In localStorage approach, frontend handles actual storage
-    # This endpoint is here for API consistency and future database integration
+    if not word.strip():
+        raise HTTPException(status_code=400, detail="Word cannot be empty")
+
+    try:
+        practiced_at = progress_store.parse_timestamp(last_practiced)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="last_practiced must be an ISO timestamp")
+
+    progress_store.upsert_weak_word(db, user_id, word, error_type, error_count, practiced_at)
+    db.commit()
+
     return {
         "saved": True,
         "word": word,
@@ -60,43 +78,75 @@ async def save_weak_word(
     }
 
 
+@router.post("/events", response_model=UserEventBatchResponse)
+def ingest_events(batch: UserEventBatch, db: Session = Depends(get_db)):
+    """
+    Ingest a batch of progress events in one request and one transaction
+
+    Replaces one save-weak-word / save-phrase call per item. Each event
+    carries a client-generated idempotency_key; events already ingested
+    are skipped, so a batch can safely be retried.
+
+    Event types: weak_word, phrase_saved, phrase_practice, session
+    Each event also updates the user's daily progress rollup.
+
+    Returns:
+        Counts of applied, duplicate and skipped events
+    """
+    logger.info(f"Ingesting {len(batch.events)} events for user {batch.user_id}")
+
+    # A concurrent retry of the same batch can race us to the idempotency keys;
+    # on conflict, re-run once so its keys are seen as duplicates
+    for attempt in range(2):
+        try:
+            counts = progress_store.ingest_events(db, batch)
+            db.commit()
+            break
+        except ValueError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Invalid event timestamp: {e}")
+        except IntegrityError:
+            db.rollback()
+            if attempt == 1:
+                raise HTTPException(status_code=409, detail="Conflicting concurrent event batch, please retry")
+
+    return UserEventBatchResponse(user_id=batch.user_id, received=len(batch.events), **counts)
+
+
 @router.get("/weak-words")
-async def get_weak_words(
+def get_weak_words(
     user_id: str,
-    limit: int = 5
+    limit: int = Query(default=5, ge=1, le=100),
+    db: Session = Depends(get_db)
 ):
     """
     Get user's weak words for focused practice
 
-    Currently instructs frontend to use localStorage aggregation.
-    Ready for database implementation.
-
     Args:
         user_id: User identifier
         limit: Maximum number of weak words to return
 
     Returns:
-        Message to use frontend localStorage (for now)
+        Top weak words by error count
     """
     logger.info(f"Fetching weak words for user {user_id}")
 
-    # With localStorage approach, frontend aggregates the data
-    # This endpoint is prepared for future database implementation
+    weak_words = progress_store.get_weak_words(db, user_id, limit=limit)
     return {
-        "message": "Use frontend localStorage aggregation",
         "user_id": user_id,
-        "limit": limit,
-        "note": "This endpoint will return actual data when database is integrated"
+        "weak_words": weak_words,
+        "count": len(weak_words)
     }
 
 
 @router.post("/save-phrase")
-async def save_phrase(
+def save_phrase(
     user_id: str = Form(...),
     phrase: str = Form(...),
     source: str = Form(...),
     topic: str = Form(...),
-    saved_at: str = Form(...)
+    saved_at: str = Form(...),
+    db: Session = Depends(get_db)
 ):
     """
     Save a phrase to user's personal bank
@@ -109,7 +159,7 @@ async def save_phrase(
         saved_at: ISO timestamp when saved
 
     Returns:
-        Success confirmation
+        Success confirmation (saved=False if the phrase is already in the bank)
     """
     logger.info(f"Saving phrase for user {user_id}: '{phrase[:50]}...' (topic: {topic})")
 
@@ -119,22 +169,29 @@ async def save_phrase(
             detail="Phrase cannot be empty"
         )
 
-    # Frontend handles localStorage for now
-    # This endpoint ensures API consistency for future database
+    try:
+        saved_at_time = progress_store.parse_timestamp(saved_at)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="saved_at must be an ISO timestamp")
+
+    saved = progress_store.save_phrase(db, user_id, phrase, source, topic, saved_at_time)
+    db.commit()
+
     return {
-        "saved": True,
+        "saved": saved,
         "phrase": phrase,
         "topic": topic,
         "source": source,
         "user_id": user_id,
-        "message": "Phrase saved to bank successfully"
+        "message": "Phrase saved to bank successfully" if saved else "Phrase already saved"
     }
 
 
 @router.get("/phrases")
-async def get_phrases(
+def get_phrases(
     user_id: str,
-    topic: Optional[str] = None
+    topic: Optional[str] = None,
+    db: Session = Depends(get_db)
 ):
     """
     Get user's saved phrases, optionally filtered by topic
@@ -144,36 +201,115 @@ async def get_phrases(
         topic: Optional topic filter (food, travel, work, etc.)
 
     Returns:
-        Message to use frontend localStorage (for now)
+        Saved phrases, newest first
     """
     logger.info(f"Fetching phrases for user {user_id}, topic: {topic}")
 
+    phrases = progress_store.get_phrases(db, user_id, topic=topic)
     return {
-        "message": "Use frontend localStorage",
         "user_id": user_id,
         "topic_filter": topic,
-        "note": "This endpoint will return actual phrases when database is integrated"
+        "phrases": phrases,
+        "count": len(phrases)
     }
 
 
-@router.get("/progress")
-async def get_user_progress(user_id: str):
+@router.get("/due")
+def get_due_items(
+    user_id: str,
+    limit: int = Query(default=20, ge=1, le=200),
+    kind: Optional[Literal["weak_word", "phrase"]] = None,
+    db: Session = Depends(get_db)
+):
     """
-    Get aggregate user progress data
+    Get today's review set (spaced repetition)
 
-    Returns all weak words, saved phrases, and session count.
-    Currently instructs frontend to aggregate from localStorage.
+    Weak words and saved phrases whose next review is due, most overdue
+    first. Replaces client-side getTodayPhrases / getTopWeakWords scans.
 
     Args:
         user_id: User identifier
+        limit: Maximum number of items
+        kind: Only weak words or only phrases
 
     Returns:
-        Message to use frontend aggregation
+        Due items with their schedule
     """
-    logger.info(f"Fetching progress for user {user_id}")
+    logger.info(f"Fetching due items for user {user_id} (kind: {kind})")
 
+    items = progress_store.get_due_items(db, user_id, limit=limit, kind=kind)
     return {
-        "message": "Use frontend localStorage aggregation",
         "user_id": user_id,
-        "note": "This endpoint will return full UserProgress when database is integrated"
+        "items": items,
+        "count": len(items)
     }
+
+
+@router.post("/review", response_model=DueItem)
+def review_item(request: ReviewRequest, db: Session = Depends(get_db)):
+    """
+    Record a review of a due item and schedule the next one (SM-2)
+
+    Scores of 70+ count as a successful recall and push the item further
+    out; lower scores bring it back tomorrow.
+
+    Returns:
+        The item with its next due date
+    """
+    logger.info(f"Review for user {request.user_id}: {request.kind} '{request.text[:50]}' ({request.score})")
+
+    try:
+        reviewed_at = progress_store.parse_timestamp(request.reviewed_at)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="reviewed_at must be an ISO timestamp")
+
+    item = progress_store.review_item(
+        db, request.user_id, request.kind, request.text, request.score, reviewed_at
+    )
+    if item is None:
+        raise HTTPException(status_code=404, detail=f"No such {request.kind} for this user")
+    db.commit()
+
+    return item
+
+
+@router.get("/progress", response_model=WeeklyProgressResponse)
+def get_user_progress(
+    user_id: str,
+    week_offset: int = Query(default=0, le=0, ge=-104, description="0 = this week, -1 = last week, ..."),
+    daily_goal_minutes: int = Query(default=15, ge=1, le=240, description="User's daily speaking goal"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get weekly progress: stats for the week and the one before, insights, goal progress
+
+    Served from the daily rollups that event ingestion maintains, so this
+    is a read of at most 14 (+ streak) rows, not a recomputation.
+
+    Args:
+        user_id: User identifier
+        week_offset: Which week to report
+        daily_goal_minutes: Speaking goal used for goal progress
+
+    Returns:
+        WeeklyProgressResponse
+    """
+    logger.info(f"Fetching progress for user {user_id} (week {week_offset})")
+
+    return progress_rollups.get_weekly_progress(db, user_id, week_offset, daily_goal_minutes)
+
+
+@router.get("/export")
+def export_user_data(user_id: str, db: Session = Depends(get_db)):
+    """
+    Get the user's full data: all weak words, saved phrases, session count and summary stats
+
+    Args:
+        user_id: User identifier
+
+    Returns:
+        UserProgress fields plus stats
+    """
+    logger.info(f"Exporting data for user {user_id}")
+
+    return progress_store.get_progress(db, user_id)
@@ -1,11 +1,11 @@
 """
 Accuracy Service - Speech evaluation and word accuracy calculation
-Uses difflib for text comparison and WER (Word Error Rate) calculation
+Uses minimum-edit word alignment for WER (Word Error Rate) calculation
 """
 import re
 import logging
-from difflib import SequenceMatcher
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional
+from services.word_alignment import AlignmentResult, align_batch
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +41,103 @@ def remove_filler_words(words: List[str]) -> List[str]:
     return [word for word in words if word.lower() not in FILLER_WORDS]
 
 
+# Error types recorded for weak words, by alignment op
+WEAK_WORD_ERROR_TYPES = {
+    "substitute": "substitution",
+    "delete": "deletion"
+}
+
+# Max words reported back as tricky_words
+MAX_TRICKY_WORDS = 5
+
+
+def extract_weak_words(alignment: List[Dict[str, Optional[str]]]) -> List[Dict[str, str]]:
+    """
+    Expected words the speaker substituted or skipped, in reading order
+
+    Args:
+        alignment: details["alignment"] ops
+
+    Returns:
+        List of {"word", "error_type"} (each word once; first error type wins)
+    """
+    weak_words = {}
+    for op in alignment:
+        error_type = WEAK_WORD_ERROR_TYPES.get(op["op"])
+        if error_type and op["expected"] not in weak_words:
+            weak_words[op["expected"]] = error_type
+    return [{"word": word, "error_type": error_type} for word, error_type in weak_words.items()]
+
+
+def _prepare_words(text: str, ignore_fillers: bool) -> List[str]:
+    """Normalize text and split it into comparable words"""
+    words = normalize_text(text).split()
+    if ignore_fillers:
+        words = remove_filler_words(words)
+    return words
+
+
+def _empty_spoken_details(expected_words: List[str]) -> Dict[str, any]:
+    """Details for a recording in which nothing was recognised"""
+    alignment = [
+        {"op": "delete", "expected": word, "spoken": None}
+        for word in expected_words
+    ]
+    return {
+        "expected_words": expected_words,
+        "spoken_words": [],
+        "matches": 0,
+        "substitutions": 0,
+        "insertions": 0,
+        "deletions": len(expected_words),
+        "wer": 1.0,
+        "similarity_ratio": 0.0,
+        "alignment": alignment,
+        "weak_words": extract_weak_words(alignment)
+    }
+
+
+def _score_alignment(
+    expected_words: List[str],
+    spoken_words: List[str],
+    result: AlignmentResult
+) -> Tuple[float, Dict[str, any]]:
+    """Turn a word alignment into (accuracy_percentage, details_dict)"""
+    # Calculate Word Error Rate (WER)
+    # WER = (S + D + I) / N
+    # where S=substitutions, D=deletions, I=insertions, N=number of words in reference
+    num_expected_words = len(expected_words)
+    wer = result.errors / num_expected_words
+
+    # Overall similarity ratio: 2 * matches / total words (same definition as difflib's ratio)
+    similarity_ratio = 2.0 * result.matches / (num_expected_words + len(spoken_words))
+
+    # Calculate accuracy percentage
+    # Accuracy = 1 - WER (capped at 0-100%)
+    accuracy = max(0.0, min(100.0, (1.0 - wer) * 100))
+
+    alignment = [
+        {"op": op.op, "expected": op.expected, "spoken": op.spoken}
+        for op in result.ops
+    ]
+    details = {
+        "expected_words": expected_words,
+        "spoken_words": spoken_words,
+        "matches": result.matches,
+        "substitutions": result.substitutions,
+        "insertions": result.insertions,
+        "deletions": result.deletions,
+        "wer": round(wer, 3),
+        "similarity_ratio": round(similarity_ratio, 3),
+        "num_expected_words": num_expected_words,
+        "num_spoken_words": len(spoken_words),
+        "alignment": alignment,
+        "weak_words": extract_weak_words(alignment)
+    }
+
+    return round(accuracy, 1), details
+
+
 def calculate_word_accuracy(
     expected_text: str,
     spoken_text: str,
@@ -49,6 +146,9 @@ def calculate_word_accuracy(
     """
     Calculate word-level accuracy between expected and spoken text
 
+    Uses a minimum-edit (Levenshtein) word alignment, so WER matches
+    the standard definition.
+
     Args:
         expected_text: The correct text (reference)
         spoken_text: What the user actually said (hypothesis)
@@ -66,91 +166,55 @@ def calculate_word_accuracy(
         - deletions: Number of missing words
         - wer: Word Error Rate (0-1, lower is better)
         - similarity_ratio: Overall similarity (0-1, higher is better)
+        - alignment: Per-word ops [{"op", "expected", "spoken"}] for UI highlighting
+        - weak_words: Substituted/deleted expected words [{"word", "error_type"}]
     """
     try:
-        # Normalize texts
-        expected_normalized = normalize_text(expected_text)
-        spoken_normalized = normalize_text(spoken_text)
+        return calculate_word_accuracy_batch([(expected_text, spoken_text)], ignore_fillers)[0]
 
-        # Split into words
-        expected_words = expected_normalized.split()
-        spoken_words = spoken_normalized.split()
+    except Exception as e:
+        logger.error(f"Error calculating word accuracy: {e}")
+        raise
 
-        # Remove filler words if requested
-        if ignore_fillers:
-            expected_words = remove_filler_words(expected_words)
-            spoken_words = remove_filler_words(spoken_words)
 
-        # Handle empty cases
+def calculate_word_accuracy_batch(
+    pairs: List[Tuple[str, str]],
+    ignore_fillers: bool = True
+) -> List[Tuple[float, Dict[str, any]]]:
+    """
+    Calculate word accuracy for many (expected_text, spoken_text) pairs at once
+
+    All alignable pairs go through one align_batch call, which picks the
+    bit-parallel or the NumPy alignment by batch size
+    (see services.word_alignment.align_batch).
+
+    Returns:
+        List of (accuracy_percentage, details_dict), in input order
+    """
+    prepared = [
+        (_prepare_words(expected, ignore_fillers), _prepare_words(spoken, ignore_fillers))
+        for expected, spoken in pairs
+    ]
+
+    # Handle empty cases
+    results: List[Optional[Tuple[float, Dict[str, any]]]] = [None] * len(prepared)
+    to_align = []
+    for k, (expected_words, spoken_words) in enumerate(prepared):
         if not expected_words:
             logger.warning("Expected text is empty after normalization")
-            return 0.0, {"error": "Expected text is empty"}
-
-        if not spoken_words:
+            results[k] = (0.0, {"error": "Expected text is empty"})
+        elif not spoken_words:
             logger.warning("Spoken text is empty after normalization")
-            return 0.0, {
-                "expected_words": expected_words,
-                "spoken_words": [],
-                "matches": 0,
-                "substitutions": 0,
-                "insertions": 0,
-                "deletions": len(expected_words),
-                "wer": 1.0,
-                "similarity_ratio": 0.0
-            }
-
-        # Use SequenceMatcher for detailed comparison
-        matcher = SequenceMatcher(None, expected_words, spoken_words)
-
-        # Calculate operations
-        matches = 0
-        substitutions = 0
-        insertions = 0
-        deletions = 0
-
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-            if tag == 'equal':
-                matches += (i2 - i1)
-            elif tag == 'replace':
-                substitutions += max(i2 - i1, j2 - j1)
-            elif tag == 'insert':
-                insertions += (j2 - j1)
-            elif tag == 'delete':
-                deletions += (i2 - i1)
-
-        # Calculate Word Error Rate (WER)
-        # WER = (S + D + I) / N
-        # where S=substitutions, D=deletions, I=insertions, N=number of words in reference
-        num_expected_words = len(expected_words)
-        wer = (substitutions + deletions + insertions) / num_expected_words if num_expected_words > 0 else 1.0
-
-        # Calculate overall similarity ratio
-        similarity_ratio = matcher.ratio()
-
-        # Calculate accuracy percentage
-        # Accuracy = 1 - WER (capped at 0-100%)
-        accuracy = max(0.0, min(100.0, (1.0 - wer) * 100))
-
-        details = {
-            "expected_words": expected_words,
-            "spoken_words": spoken_words,
-            "matches": matches,
-            "substitutions": substitutions,
-            "insertions": insertions,
-            "deletions": deletions,
-            "wer": round(wer, 3),
-            "similarity_ratio": round(similarity_ratio, 3),
-            "num_expected_words": num_expected_words,
-            "num_spoken_words": len(spoken_words)
-        }
-
-        logger.info(f"Accuracy calculated: {accuracy:.1f}% (WER: {wer:.3f})")
-
-        return round(accuracy, 1), details
+            results[k] = (0.0, _empty_spoken_details(expected_words))
+        else:
+            to_align.append(k)
 
-    except Exception as e:
-        logger.error(f"Error calculating word accuracy: {e}")
-        raise
+    alignments = align_batch([prepared[k] for k in to_align])
+    for k, alignment in zip(to_align, alignments):
+        results[k] = _score_alignment(*prepared[k], alignment)
+        logger.info(f"Accuracy calculated: {results[k][0]:.1f}% (WER: {results[k][1]['wer']:.3f})")
+
+    return results
 
 
 def get_pronunciation_feedback(
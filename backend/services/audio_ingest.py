@@ -0,0 +1,184 @@
+"""
+Audio Ingest - Validate uploaded audio and hand it to Whisper without copies
+Caps upload size before the body is read, sniffs the container format
+from magic bytes, then passes the upload's own spooled file straight to
+the API client
+"""
+import io
+import logging
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Container formats accepted by Whisper: extension -> content type
+AUDIO_CONTENT_TYPES = {
+    "webm": "audio/webm",
+    "ogg": "audio/ogg",
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "m4a": "audio/mp4",
+    "flac": "audio/flac"
+}
+
+# Bytes needed to recognise every supported format
+SNIFF_BYTES = 12
+
+# Allowance for multipart boundaries, part headers and the other form fields
+MULTIPART_OVERHEAD_BYTES = 256 * 1024
+
+
+class AudioIngestError(Exception):
+    """Uploaded audio was rejected (too large, empty or unsupported format)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def sniff_audio_format(header: bytes) -> Optional[str]:
+    """
+    Detect the audio container from its leading magic bytes
+
+    Returns:
+        str: File extension (webm, ogg, wav, mp3, m4a, flac), or None if unknown
+    """
+    if header.startswith(b"\x1a\x45\xdf\xa3"):
+        return "webm"  # EBML (WebM / Matroska)
+    if header.startswith(b"OggS"):
+        return "ogg"
+    if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+        return "wav"
+    if header.startswith(b"ID3") or (len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return "mp3"  # ID3 tag or MPEG frame sync
+    if header[4:8] == b"ftyp":
+        return "m4a"  # ISO base media (MP4 / M4A)
+    if header.startswith(b"fLaC"):
+        return "flac"
+    return None
+
+
+def _check(size: int, header: bytes, name: str) -> str:
+    """Validate size and format; return the sniffed extension"""
+    if size == 0:
+        raise AudioIngestError("Audio file is empty")
+    if size > settings.max_audio_upload_bytes:
+        raise AudioIngestError(
+            f"Audio file too large ({size} bytes, max {settings.max_audio_upload_bytes})",
+            status_code=413
+        )
+
+    audio_format = sniff_audio_format(header)
+    if not audio_format:
+        raise AudioIngestError(
+            f"Unsupported audio format for {name}. Supported: {', '.join(AUDIO_CONTENT_TYPES)}",
+            status_code=415
+        )
+    return audio_format
+
+
+def prepare_upload(file: UploadFile) -> Tuple[str, BinaryIO, str]:
+    """
+    Validate an UploadFile and return a Whisper file tuple that reuses its spool
+
+    The returned file object is the upload's SpooledTemporaryFile, rewound,
+    so the HTTP client streams it in chunks; nothing is copied.
+
+    Returns:
+        tuple: (filename, file_object, content_type)
+    """
+    spool = file.file
+    size = file.size
+    if size is None:
+        size = spool.seek(0, io.SEEK_END)
+
+    spool.seek(0)
+    header = spool.read(SNIFF_BYTES)
+    spool.seek(0)
+
+    audio_format = _check(size, header, file.filename or "upload")
+    # Name the file after the sniffed format so Whisper never sees a misleading extension
+    filename = f"{Path(file.filename or 'audio').stem}.{audio_format}"
+
+    logger.info(f"Audio upload accepted: {filename} ({size} bytes, declared {file.content_type})")
+    return filename, spool, AUDIO_CONTENT_TYPES[audio_format]
+
+
+def prepare_bytes(data: bytes, name: str = "audio") -> Tuple[str, BinaryIO, str]:
+    """
+    Validate in-memory audio (e.g. a WebSocket frame) and wrap it without copying
+
+    Returns:
+        tuple: (filename, file_object, content_type)
+    """
+    audio_format = _check(len(data), data[:SNIFF_BYTES], name)
+    return f"{name}.{audio_format}", io.BytesIO(data), AUDIO_CONTENT_TYPES[audio_format]
+
+
+class UploadLimitMiddleware:
+    """
+    Rejects multipart uploads over the audio size cap with 413
+
+    Checked before the form is parsed, so an oversized upload is never
+    spooled to disk: a declared Content-Length over the limit is refused
+    without reading the body, and a body that turns out larger (chunked
+    or under-declared) is cut off as soon as it passes the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: Optional[int] = None):
+        self.app = app
+        self.max_body_bytes = max_body_bytes or settings.max_audio_upload_bytes + MULTIPART_OVERHEAD_BYTES
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        declared = self._content_length(scope)
+        if declared is not None and declared > self.max_body_bytes:
+            logger.warning(f"Upload rejected before reading: Content-Length {declared} > {self.max_body_bytes}")
+            response = JSONResponse(status_code=413, content={"detail": self._too_large_detail()})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    logger.warning(f"Upload cut off after {received} bytes (max {self.max_body_bytes})")
+                    # Raised from inside form parsing; FastAPI passes HTTPExceptions through
+                    raise HTTPException(status_code=413, detail=self._too_large_detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    def _is_multipart(scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"content-type":
+                return value.lower().startswith(b"multipart/form-data")
+        return False
+
+    @staticmethod
+    def _content_length(scope: Scope) -> Optional[int]:
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    @staticmethod
+    def _too_large_detail() -> str:
+        return f"Upload too large (max {settings.max_audio_upload_bytes} bytes of audio)"
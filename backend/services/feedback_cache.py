@@ -0,0 +1,266 @@
+"""
+Feedback Cache - Two-tier cache for deterministic model feedback
+In-memory LRU with TTL in front of an optional on-disk SQLite tier that
+survives restarts; keys cover normalized inputs, model and prompt version
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Prune the disk tier once every this many writes
+DISK_PRUNE_EVERY = 200
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Case- and whitespace-insensitive form of a cache key part"""
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+class FeedbackCache:
+    """
+    TTL + LRU cache of feedback strings
+
+    Memory tier: bounded OrderedDict, least recently used evicted first.
+    Disk tier (optional): SQLite table bounded by entry count; hits are
+    promoted into memory. Expired entries are treated as misses.
+
+    Async code must use aget/aset/astats: the memory tier is used on the
+    event loop and only the disk tier runs in the thread pool, so a write
+    held up by another worker (up to the busy timeout) never stalls it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: int,
+        max_entries: int,
+        db_path: Optional[str] = None,
+        disk_max_entries: int = 100000
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid: Optional[int] = None
+        self._db_path = db_path
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ----- Keys -----
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Stable hash of JSON-serializable key parts"""
+        return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode()).hexdigest()
+
+    # ----- Disk tier -----
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """
+        Open the disk tier on first use (None if disabled or unavailable)
+
+        Each worker process gets its own connection (reopened after a
+        fork); WAL lets them share the file.
+        """
+        if self._db_path and (self._db is None or self._db_pid != os.getpid()):
+            try:
+                Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(self._db_path, check_same_thread=False, isolation_level=None)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA busy_timeout=5000")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS feedback_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS ix_feedback_cache_accessed ON feedback_cache (accessed_at)")
+                self._db, self._db_pid = db, os.getpid()
+                logger.info(f"{self.name} cache disk tier: {self._db_path}")
+            except sqlite3.Error as e:
+                logger.warning(f"{self.name} cache disk tier disabled: {e}")
+                self._db_path = None
+        return self._db
+
+    def _prune_disk(self, db: sqlite3.Connection, now: float) -> None:
+        """Drop expired rows, then least recently used rows over the entry budget"""
+        db.execute("DELETE FROM feedback_cache WHERE expires_at <= ?", (now,))
+        db.execute(
+            "DELETE FROM feedback_cache WHERE key IN ("
+            "SELECT key FROM feedback_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.disk_max_entries,)
+        )
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        """(value, expires_at) of a live disk entry, marking it used, or None"""
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT value, expires_at FROM feedback_cache WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+                if row is not None:
+                    db.execute("UPDATE feedback_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                return row
+            except sqlite3.Error as e:
+                logger.warning(f"{self.name} cache disk read failed: {e}")
+                return None
+
+    def _disk_set(self, key: str, value: str, expires_at: float, now: float) -> None:
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO feedback_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now)
+                )
+                self._writes += 1
+                if self._writes % DISK_PRUNE_EVERY == 0:
+                    self._prune_disk(db, now)
+            except sqlite3.Error as e:
+                logger.warning(f"{self.name} cache disk write failed: {e}")
+
+    def _disk_entries(self) -> Optional[int]:
+        """Rows in the disk tier (all workers), or None if it is disabled"""
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return None
+            try:
+                return db.execute("SELECT COUNT(*) FROM feedback_cache").fetchone()[0]
+            except sqlite3.Error:
+                return None
+
+    # ----- Lookup & insert -----
+
+    def _memory_get(self, key: str, now: float) -> Optional[str]:
+        """Live memory-tier value for key (counted as a hit), or None"""
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        self.memory_hits += 1
+        return value
+
+    def _disk_result(self, key: str, row: Optional[Tuple[str, float]]) -> Optional[str]:
+        """Promote a disk hit into memory and count the lookup"""
+        if row is None:
+            self.misses += 1
+            return None
+        self._remember(key, row[0], row[1])
+        self.disk_hits += 1
+        return row[0]
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached value for key, or None (blocking; use aget on the event loop)"""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            return value
+        return self._disk_result(key, self._disk_get(key, now))
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Cached value for key, or None; a memory miss reads disk in the thread pool"""
+        now = time.time()
+        value = self._memory_get(key, now)
+        if value is not None:
+            return value
+        row = await run_in_threadpool(self._disk_get, key, now) if self._db_path else None
+        return self._disk_result(key, row)
+
+    def set(self, key: str, value: str) -> None:
+        """Store value in both tiers (blocking; use aset on the event loop)"""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        self._remember(key, value, expires_at)
+        self._disk_set(key, value, expires_at, now)
+
+    async def aset(self, key: str, value: str) -> None:
+        """Store value in both tiers, writing disk in the thread pool"""
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        self._remember(key, value, expires_at)
+        if self._db_path:
+            await run_in_threadpool(self._disk_set, key, value, expires_at, now)
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        """Insert into the memory tier and evict over budget"""
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def close(self) -> None:
+        """Close the disk tier (a connection inherited from a parent process is left alone)"""
+        with self._db_lock:
+            if self._db is not None and self._db_pid == os.getpid():
+                self._db.close()
+            self._db = None
+
+    # ----- Stats -----
+
+    def stats(self) -> dict:
+        """Tier sizes and hit/miss counters (blocking; use astats on the event loop)"""
+        return self._stats(self._disk_entries())
+
+    async def astats(self) -> dict:
+        """Tier sizes and hit/miss counters, counting disk rows in the thread pool"""
+        disk_entries = await run_in_threadpool(self._disk_entries) if self._db_path else None
+        return self._stats(disk_entries)
+
+    def _stats(self, disk_entries: Optional[int]) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "name": self.name,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "disk_enabled": self._db is not None,
+            "disk_entries": disk_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Global cache for exercise feedback
+exercise_feedback_cache = FeedbackCache(
+    name="exercise_feedback",
+    ttl_seconds=settings.feedback_cache_ttl_seconds,
+    max_entries=settings.feedback_cache_max_entries,
+    db_path=settings.feedback_cache_db_path or None,
+    disk_max_entries=settings.feedback_cache_disk_max_entries
+)
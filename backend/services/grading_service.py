@@ -0,0 +1,86 @@
+"""
+Grading Service - Deterministic exercise grading with partial credit
+Runs locally in microseconds; AI feedback is requested separately
+"""
+import re
+from dataclasses import dataclass
+from typing import List
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " .,!?;:'\"“”‘’"
+
+
+@dataclass
+class Grade:
+    """Outcome of grading one submission"""
+    is_correct: bool
+    score: float  # 0-100
+    emotion_tag: str
+
+
+def normalize_answer(answer: str) -> str:
+    """Ignore case, repeated whitespace and surrounding punctuation"""
+    return _WHITESPACE.sub(" ", answer).strip(_EDGE_PUNCTUATION).lower()
+
+
+def _fill_blank_score(user_answers: List[str], correct_answers: List[str]) -> float:
+    """Share of blanks filled correctly; extra or missing answers count as wrong"""
+    correct = sum(
+        1 for user, expected in zip(user_answers, correct_answers)
+        if normalize_answer(user) == normalize_answer(expected)
+    )
+    return correct / max(len(user_answers), len(correct_answers))
+
+
+def _reorder_score(user_answers: List[str], correct_answers: List[str]) -> float:
+    """
+    Longest run of items in the right relative order, as a share of all items
+
+    Uses the longest common subsequence, so moving one word out of place
+    costs one item rather than everything after it. The share is taken of
+    the longer of the two lists, so extra items cost as much as missing ones.
+    """
+    user = [normalize_answer(a) for a in user_answers]
+    expected = [normalize_answer(a) for a in correct_answers]
+
+    previous = [0] * (len(expected) + 1)
+    for u in user:
+        current = [0]
+        for j, e in enumerate(expected, 1):
+            current.append(previous[j - 1] + 1 if u == e else max(previous[j], current[j - 1]))
+        previous = current
+    return previous[-1] / max(len(user), len(expected))
+
+
+def grade(exercise_type: str, user_answers: List[str], correct_answers: List[str]) -> Grade:
+    """
+    Grade a submission
+
+    - multiple_choice: all or nothing
+    - fill_blank: partial credit per blank
+    - reorder: partial credit for items in the right relative order
+
+    Returns:
+        Grade: is_correct (full marks), score (0-100), emotion_tag
+    """
+    if not correct_answers:
+        fraction = 1.0 if not user_answers else 0.0
+    elif exercise_type == "fill_blank":
+        fraction = _fill_blank_score(user_answers, correct_answers)
+    elif exercise_type == "reorder":
+        fraction = _reorder_score(user_answers, correct_answers)
+    else:
+        same = [normalize_answer(a) for a in user_answers] == [normalize_answer(a) for a in correct_answers]
+        fraction = 1.0 if same else 0.0
+
+    score = round(fraction * 100, 1)
+    is_correct = score == 100.0
+
+    if is_correct:
+        emotion_tag = "praise"
+    elif score >= 50:
+        emotion_tag = "encouraging"
+    else:
+        emotion_tag = "corrective"
+
+    return Grade(is_correct=is_correct, score=score, emotion_tag=emotion_tag)
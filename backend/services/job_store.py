@@ -0,0 +1,130 @@
+"""
+Job Store - In-memory background jobs with fetchable results
+Lets an endpoint answer immediately and deliver slow work (e.g. AI
+feedback) through a follow-up request by job id
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Optional
+
+from services.shared_store import SharedStore
+
+logger = logging.getLogger(__name__)
+
+# How often a worker that does not own a job re-reads its shared status
+SHARED_POLL_SECONDS = 0.25
+
+
+class JobStore:
+    """
+    Runs coroutines as tasks and keeps their results for a while
+
+    Jobs are kept for ttl_seconds after creation (bounded by max_jobs,
+    oldest dropped first). Tasks run in the worker that submitted them;
+    with a shared store their status and (JSON-serializable) result are
+    also published there, so a follow-up request may land on any worker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: int = 600,
+        max_jobs: int = 10000,
+        shared: Optional[SharedStore] = None
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+        self.shared = shared
+        self._jobs: "OrderedDict[str, tuple[float, asyncio.Task]]" = OrderedDict()
+
+    async def submit(self, awaitable: Awaitable[Any]) -> str:
+        """Start a job; returns its id once any worker can look it up"""
+        self._prune()
+        job_id = uuid.uuid4().hex
+        # Published before the job starts, so it can never overwrite the final status
+        await self._publish(job_id, {"status": "pending", "result": None, "error": None})
+        task = asyncio.ensure_future(self._run(job_id, awaitable))
+        task.add_done_callback(lambda t: self._finished(job_id, t))
+        self._jobs[job_id] = (time.monotonic(), task)
+        return job_id
+
+    async def _run(self, job_id: str, awaitable: Awaitable[Any]) -> Any:
+        """Await the job, then publish its final status"""
+        try:
+            result = await awaitable
+        except BaseException:
+            await self._publish(job_id, {"status": "failed", "result": None, "error": "Job failed"})
+            raise
+        await self._publish(job_id, {"status": "ready", "result": result, "error": None})
+        return result
+
+    async def result(self, job_id: str, wait: float = 0.0) -> Optional[dict]:
+        """
+        Job status, optionally waiting up to `wait` seconds for it to finish
+
+        Returns:
+            dict: {"status": pending|ready|failed, "result", "error"}, or None if unknown/expired
+        """
+        self._prune()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return await self._shared_result(job_id, wait) if self.shared else None
+
+        task = job[1]
+        if not task.done() and wait > 0:
+            await asyncio.wait({task}, timeout=wait)
+
+        if not task.done():
+            return {"status": "pending", "result": None, "error": None}
+        return self._status(task)
+
+    async def _shared_result(self, job_id: str, wait: float) -> Optional[dict]:
+        """Status of a job owned by another worker, polling while it is pending"""
+        deadline = time.monotonic() + wait
+        while True:
+            entry = await self.shared.aget(self.name, job_id)
+            if entry is None:
+                return None
+            status = entry[0]
+            remaining = deadline - time.monotonic()
+            if status["status"] != "pending" or remaining <= 0:
+                return status
+            await asyncio.sleep(min(SHARED_POLL_SECONDS, remaining))
+
+    @staticmethod
+    def _status(task: asyncio.Task) -> dict:
+        if task.cancelled() or task.exception() is not None:
+            return {"status": "failed", "result": None, "error": "Job failed"}
+        return {"status": "ready", "result": task.result(), "error": None}
+
+    async def _publish(self, job_id: str, status: dict) -> None:
+        if not self.shared:
+            return
+        try:
+            await self.shared.aput(self.name, job_id, status, self.ttl_seconds)
+        except Exception as e:
+            logger.error(f"{self.name} job {job_id}: could not publish status: {e}")
+
+    def _prune(self) -> None:
+        """Drop expired jobs and the oldest ones over budget"""
+        deadline = time.monotonic() - self.ttl_seconds
+        while self._jobs:
+            job_id, (created, task) = next(iter(self._jobs.items()))
+            if created > deadline and len(self._jobs) <= self.max_jobs:
+                break
+            self._jobs.popitem(last=False)
+            if not task.done():
+                task.cancel()
+
+    def _finished(self, job_id: str, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"{self.name} job {job_id} failed: {task.exception()}")
+
+    def stats(self) -> dict:
+        """Job counts by state"""
+        pending = sum(1 for _, task in self._jobs.values() if not task.done())
+        return {"name": self.name, "jobs": len(self._jobs), "pending": pending}
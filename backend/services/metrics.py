@@ -0,0 +1,170 @@
+"""
+Metrics - Prometheus instrumentation for requests, upstream stages and spend
+Request/stage latency histograms, in-flight gauges, token and estimated
+cost counters per model, and TTS cache hit/miss, exposed at /metrics
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from services.tts_cache import tts_cache
+
+# Buckets (seconds) spanning cache hits to slow multi-stage requests
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0)
+
+# USD per 1M tokens: (input, cached input, output). Unknown models are counted but not priced.
+CHAT_PRICES_PER_MILLION = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4": (30.00, 30.00, 60.00)
+}
+
+# USD per 1M input characters
+TTS_PRICES_PER_MILLION_CHARS = {
+    "tts-1": 15.00,
+    "tts-1-hd": 30.00
+}
+
+REQUEST_LATENCY = Histogram(
+    "teacherai_request_duration_seconds",
+    "HTTP request latency until the response starts, by route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+# In-flight gauges are summed over live workers in multi-process mode
+REQUESTS_IN_FLIGHT = Gauge(
+    "teacherai_requests_in_flight",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum"
+)
+STAGE_LATENCY = Histogram(
+    "teacherai_stage_duration_seconds",
+    "Latency of one upstream or compute stage (stt, chat, chat_stream, tts, accuracy)",
+    ["stage", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+STAGES_IN_FLIGHT = Gauge(
+    "teacherai_stages_in_flight",
+    "Stages currently running",
+    ["stage"],
+    multiprocess_mode="livesum"
+)
+TOKENS = Counter(
+    "teacherai_llm_tokens",
+    "Chat completion tokens from response usage (cached is a subset of prompt)",
+    ["model", "kind"]
+)
+TTS_CHARACTERS = Counter(
+    "teacherai_tts_characters",
+    "Characters sent for speech synthesis",
+    ["model"]
+)
+ESTIMATED_COST = Counter(
+    "teacherai_estimated_cost_usd",
+    "Estimated upstream spend from usage and list prices",
+    ["model"]
+)
+TTS_CACHE_LOOKUPS = Counter(
+    "teacherai_tts_cache_lookups",
+    "TTS cache lookups",
+    ["result"]
+)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    Time a block as a named stage (outcome "ok" or "error")
+
+    Usage:
+        with stage_timer("tts"):
+            await synthesize(...)
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    STAGES_IN_FLIGHT.labels(stage).inc()
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        STAGES_IN_FLIGHT.labels(stage).dec()
+        STAGE_LATENCY.labels(stage, outcome).observe(time.perf_counter() - start)
+
+
+def record_chat_usage(model: Optional[str], usage: Any) -> None:
+    """Count tokens and estimated cost from a chat completion's usage"""
+    if usage is None:
+        return
+    model = model or "unknown"
+    prompt_tokens = usage.prompt_tokens or 0
+    completion_tokens = usage.completion_tokens or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) or 0
+
+    TOKENS.labels(model, "prompt").inc(prompt_tokens)
+    TOKENS.labels(model, "cached").inc(cached_tokens)
+    TOKENS.labels(model, "completion").inc(completion_tokens)
+
+    prices = CHAT_PRICES_PER_MILLION.get(model)
+    if prices:
+        input_price, cached_price, output_price = prices
+        cost = (
+            (prompt_tokens - cached_tokens) * input_price
+            + cached_tokens * cached_price
+            + completion_tokens * output_price
+        ) / 1_000_000
+        ESTIMATED_COST.labels(model).inc(cost)
+
+
+def record_tts_usage(model: str, text: str) -> None:
+    """Count characters and estimated cost of one synthesis"""
+    TTS_CHARACTERS.labels(model).inc(len(text))
+    price = TTS_PRICES_PER_MILLION_CHARS.get(model)
+    if price:
+        ESTIMATED_COST.labels(model).inc(len(text) * price / 1_000_000)
+
+
+def record_tts_cache_lookup(hit: bool) -> None:
+    """Count one TTS cache lookup as a hit or miss"""
+    TTS_CACHE_LOOKUPS.labels("hit" if hit else "miss").inc()
+
+
+class TTSCacheCollector:
+    """Exports the TTS cache's size at scrape time (shared by all workers)"""
+
+    def collect(self):
+        stats = tts_cache.stats()
+        yield GaugeMetricFamily("teacherai_tts_cache_entries", "Files in the TTS cache", value=stats["entries"])
+        yield GaugeMetricFamily("teacherai_tts_cache_bytes", "Bytes in the TTS cache", value=stats["bytes"])
+
+
+REGISTRY.register(TTSCacheCollector())
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Exposition body and content type for /metrics
+
+    Under a multi-worker server (PROMETHEUS_MULTIPROC_DIR set) every
+    worker writes its samples to that directory, and a scrape of any
+    worker aggregates all of them.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(TTSCacheCollector())
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
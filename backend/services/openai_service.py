@@ -3,78 +3,112 @@ OpenAI Service - ChatGPT & TTS Integration
 Coach Ivy: Your personal English companion
 """
 import logging
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from config import settings
+from services.audio_ingest import prepare_bytes, prepare_upload
+from services.feedback_cache import exercise_feedback_cache, normalize
+from services.metrics import record_chat_usage, record_tts_cache_lookup, record_tts_usage, stage_timer
+from services import grading_service
+from services.prompts import coach_chat_messages, get_system_prompt, prompt_cache_stats
+from services.reply_parsing import analyze_emotion, extract_json_object
+from services.single_flight import SingleFlight
+from services.tts_cache import tts_cache
+from services.upstream import CHAT_POLICY, RETRYABLE_ERRORS, STT_POLICY, TTS_POLICY, upstream
 from pathlib import Path
-import hashlib
-import tempfile
+import json
+import uuid
 import os
-from typing import Literal, Optional
+from typing import Any, AsyncIterator, Literal, Optional
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.openai_api_key)
+# Shared async OpenAI client (one connection pool per worker).
+# Retries are done by services.upstream, so the SDK's own are disabled.
+client = AsyncOpenAI(
+    api_key=settings.openai_api_key,
+    base_url=settings.openai_base_url,
+    timeout=settings.openai_timeout_seconds,
+    max_retries=0,
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections
+        )
+    )
+)
 
-# ===== COACH IVY SYSTEM PROMPTS =====
+async def close_client() -> None:
+    """Close the shared OpenAI client and its connection pool"""
+    await client.close()
 
-COACH_IVY_BASE_PROMPT = """You are "Coach Ivy", a personal English tutor for a Vietnamese learner.
 
-**Personality:**
-- Friendly, encouraging, and supportive
-- Patient and understanding
-- Enthusiastic about progress
-- Professional but warm
+async def create_chat_completion(prompt: str = "other", **kwargs: Any):
+    """
+    Create a chat completion through the shared async client
 
-**Communication style:**
-- Use English for teaching and examples
-- Use short Vietnamese explanations when concepts are complex
-- Keep responses concise (2-4 sentences for most cases)
-- Always be positive and motivating
+    All chat calls (services and routers) go through here so they share
+    the connection pool, concurrency limit, retries and circuit breaker.
+    `prompt` names the template for prompt-cache stats.
 
-**Teaching approach:**
-- Focus on practical usage
-- Provide real-world examples
-- Explain "why" not just "what"
-- Encourage practice and repetition
-- Celebrate small wins
-"""
-
-MODE_PROMPTS = {
-    "free_chat": """The user is having a casual conversation to practice English.
-- Answer their questions naturally
-- Gently correct major errors
-- Keep the conversation flowing
-- Use this as a teaching opportunity when appropriate""",
+    Raises:
+        CircuitOpenError: If chat calls are failing and the breaker is open
+    """
+    with stage_timer("chat"):
+        response = await upstream.call(
+            "chat",
+            lambda: client.chat.completions.create(**kwargs),
+            CHAT_POLICY
+        )
+    prompt_cache_stats.record(prompt, response.usage)
+    record_chat_usage(kwargs.get("model"), response.usage)
+    return response
 
-    "explain": """The user needs help understanding an English concept, word, or phrase.
-- Provide a clear explanation
-- Give 2-3 practical examples
-- Include Vietnamese translation for key terms
-- Keep it simple and actionable""",
 
-    "speaking_feedback": """The user just practiced speaking. Provide constructive feedback.
-- Start with encouragement
-- Point out what they did well
-- Suggest ONE main improvement
-- Provide the corrected version
-- Give a similar example to practice"""
-}
+async def stream_chat_completion(prompt: str = "other", **kwargs: Any) -> AsyncIterator[str]:
+    """
+    Stream a chat completion, yielding text deltas as they arrive
 
+    Holds one concurrency slot for the lifetime of the stream. Like
+    every chat call it is not retried; a failure, before or after tokens
+    flow, counts against the chat breaker. Usage arrives on the final
+    chunk and is recorded under `prompt`.
+    """
+    async with upstream.slots:
+        with stage_timer("chat_stream"):
+            stream = await upstream.call(
+                "chat",
+                lambda: client.chat.completions.create(
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **kwargs
+                ),
+                CHAT_POLICY,
+                hold_slot=False
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.usage:
+                        prompt_cache_stats.record(prompt, chunk.usage)
+                        record_chat_usage(kwargs.get("model"), chunk.usage)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except RETRYABLE_ERRORS:
+                upstream.breaker("chat").record_failure()
+                raise
 
-def get_system_prompt(mode: str = "free_chat") -> str:
-    """Get complete system prompt for Coach Ivy"""
-    mode_specific = MODE_PROMPTS.get(mode, MODE_PROMPTS["free_chat"])
-    return f"{COACH_IVY_BASE_PROMPT}\n\n{mode_specific}"
+# ===== CHATGPT FUNCTIONS =====
 
+COACH_CHAT_PARAMS = {"temperature": 0.7, "max_tokens": 300}
 
-# ===== CHATGPT FUNCTIONS =====
 
 async def chat_with_coach(
     message: str,
     mode: str = "free_chat",
-    context: Optional[dict] = None
+    context: Optional[dict] = None,
+    history: Optional[list[dict]] = None
 ) -> tuple[str, str]:
     """
     Chat with Coach Ivy
@@ -83,33 +117,24 @@ async def chat_with_coach(
         message: User's message
         mode: Conversation mode (free_chat, explain, speaking_feedback)
         context: Additional context (lesson_id, level, etc.)
+        history: Earlier conversation messages (summary + recent turns)
 
     Returns:
         tuple: (reply_text, emotion_tag)
     """
     try:
-        system_prompt = get_system_prompt(mode)
-
-        # Add context to system prompt if provided
-        if context:
-            context_str = f"\n\nContext: {context}"
-            system_prompt += context_str
-
         # Call ChatGPT
-        response = client.chat.completions.create(
+        response = await create_chat_completion(
+            prompt="coach_chat",
             model=settings.openai_model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": message}
-            ],
-            temperature=0.7,
-            max_tokens=300
+            messages=coach_chat_messages(message, mode, context, history),
+            **COACH_CHAT_PARAMS
         )
 
         reply = response.choices[0].message.content.strip()
 
         # Determine emotion tag based on response content
-        emotion_tag = _analyze_emotion(reply)
+        emotion_tag = analyze_emotion(reply)
 
         logger.info(f"Coach Ivy replied (mode={mode}, emotion={emotion_tag})")
         return reply, emotion_tag
@@ -119,34 +144,143 @@ async def chat_with_coach(
         raise
 
 
-def _analyze_emotion(text: str) -> str:
+async def stream_chat_with_coach(
+    message: str,
+    mode: str = "free_chat",
+    context: Optional[dict] = None,
+    history: Optional[list[dict]] = None
+) -> AsyncIterator[str]:
     """
-    Analyze text to determine appropriate emotion tag for avatar
+    Chat with Coach Ivy, yielding reply text deltas as the model produces them
 
-    Returns: neutral | praise | corrective | encouraging
+    Same prompt and parameters as chat_with_coach; run analyze_emotion
+    on the joined reply once the stream ends.
     """
-    text_lower = text.lower()
+    async for delta in stream_chat_completion(
+        prompt="coach_chat",
+        model=settings.openai_model_name,
+        messages=coach_chat_messages(message, mode, context, history),
+        **COACH_CHAT_PARAMS
+    ):
+        yield delta
 
-    # Praise indicators
-    praise_words = ["excellent", "perfect", "great", "wonderful", "amazing", "fantastic", "correct", "well done", "good job", "tuyệt vời", "hoàn hảo"]
-    if any(word in text_lower for word in praise_words):
-        return "praise"
 
-    # Corrective indicators
-    corrective_words = ["however", "but", "correction", "should be", "mistake", "error", "incorrect", "sửa", "sai"]
-    if any(word in text_lower for word in corrective_words):
-        return "corrective"
+# ===== CONVERSATION SUMMARY =====
+
+async def summarize_conversation(
+    previous_summary: str,
+    messages: list[dict]
+) -> str:
+    """
+    Fold older conversation turns into a short rolling summary
+
+    Args:
+        previous_summary: Summary of turns before `messages` (may be empty)
+        messages: Turns to fold in [{"role": "user", "content": "..."}]
+
+    Returns:
+        str: Updated summary
+    """
+    try:
+        conversation_text = "\n".join(
+            f"{msg['role'].upper()}: {msg['content']}" for msg in messages
+        )
+
+        prompt = f"""Update the summary of an English practice conversation between a learner (USER) and their coach (ASSISTANT).
+
+Previous summary: {previous_summary or "(none)"}
+
+New turns:
+{conversation_text}
+
+Write 2-4 sentences covering topics discussed, facts the learner shared, and mistakes the coach corrected. Output only the summary."""
+
+        response = await create_chat_completion(
+            prompt="conversation_summary",
+            model=settings.openai_model_name,
+            messages=[
+                {"role": "system", "content": "You summarize tutoring conversations concisely."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=200
+        )
 
-    # Encouraging indicators
-    encouraging_words = ["keep", "practice", "try", "don't worry", "no problem", "keep going", "tiếp tục", "cố lên"]
-    if any(word in text_lower for word in encouraging_words):
-        return "encouraging"
+        summary = response.choices[0].message.content.strip()
+        logger.info(f"Conversation summarized ({len(messages)} messages -> {len(summary)} chars)")
+        return summary
 
-    return "neutral"
+    except Exception as e:
+        logger.error(f"Error in summarize_conversation: {e}")
+        raise
 
 
 # ===== EXERCISE FEEDBACK =====
 
+# Bump when the exercise feedback prompt changes, so cached feedback is not reused
+EXERCISE_FEEDBACK_PROMPT_VERSION = "2"
+
+# Deduplicates concurrent feedback requests for identical submissions
+_exercise_flight = SingleFlight("exercise_feedback")
+
+
+def _exercise_feedback_key(
+    question: str,
+    user_answers: list[str],
+    correct_answers: list[str],
+    exercise_type: str
+) -> str:
+    """Feedback cache key: normalized inputs + model + prompt version"""
+    return exercise_feedback_cache.make_key(
+        settings.openai_model_name,
+        EXERCISE_FEEDBACK_PROMPT_VERSION,
+        exercise_type,
+        normalize(question),
+        [normalize(a) for a in user_answers],
+        [normalize(a) for a in correct_answers]
+    )
+
+
+async def lookup_exercise_feedback(
+    question: str,
+    user_answers: list[str],
+    correct_answers: list[str],
+    exercise_type: str = "multiple_choice"
+) -> Optional[str]:
+    """Cached feedback for this submission, or None (never calls the model)"""
+    return await exercise_feedback_cache.aget(
+        _exercise_feedback_key(question, user_answers, correct_answers, exercise_type)
+    )
+
+
+async def get_exercise_feedback(
+    question: str,
+    user_answers: list[str],
+    correct_answers: list[str],
+    exercise_type: str = "multiple_choice",
+    score: Optional[float] = None,
+    check_cache: bool = True
+) -> str:
+    """
+    AI feedback for an exercise submission
+
+    Repeat submissions are served from the feedback cache; concurrent
+    identical misses share one model call. Pass check_cache=False if the
+    caller already missed via lookup_exercise_feedback.
+    """
+    cache_key = _exercise_feedback_key(question, user_answers, correct_answers, exercise_type)
+    if check_cache:
+        feedback = await exercise_feedback_cache.aget(cache_key)
+        if feedback is not None:
+            logger.info("Exercise feedback cache hit")
+            return feedback
+
+    return await _exercise_flight.do(
+        cache_key,
+        lambda: _generate_cached_exercise_feedback(cache_key, question, user_answers, correct_answers, score)
+    )
+
+
 async def check_exercise_with_feedback(
     question: str,
     user_answers: list[str],
@@ -160,52 +294,79 @@ async def check_exercise_with_feedback(
         tuple: (is_correct, score, feedback_text, emotion_tag)
     """
     try:
-        # Calculate correctness
-        is_correct = user_answers == correct_answers
-        score = 100.0 if is_correct else 0.0
+        # Grade locally (partial credit for fill_blank / reorder)
+        result = grading_service.grade(exercise_type, user_answers, correct_answers)
+
+        feedback = await get_exercise_feedback(
+            question, user_answers, correct_answers, exercise_type, result.score
+        )
+
+        logger.info(f"Exercise checked: correct={result.is_correct}, score={result.score}")
+        return result.is_correct, result.score, feedback, result.emotion_tag
+
+    except Exception as e:
+        logger.error(f"Error in check_exercise_with_feedback: {e}")
+        raise
+
+
+async def _generate_cached_exercise_feedback(
+    cache_key: str,
+    question: str,
+    user_answers: list[str],
+    correct_answers: list[str],
+    score: Optional[float] = None
+) -> str:
+    """Generate exercise feedback and store it in the feedback cache"""
+    feedback = await _generate_exercise_feedback(question, user_answers, correct_answers, score)
+    await exercise_feedback_cache.aset(cache_key, feedback)
+    return feedback
+
 
-        # Generate AI feedback
-        prompt = f"""The student answered this question:
+async def _generate_exercise_feedback(
+    question: str,
+    user_answers: list[str],
+    correct_answers: list[str],
+    score: Optional[float] = None
+) -> str:
+    """Ask Coach Ivy to explain an exercise answer"""
+    score_line = f"\nScore: {score:.0f}%" if score is not None else ""
+    prompt = f"""The student answered this question:
 Question: {question}
 Their answer: {' '.join(user_answers)}
-Correct answer: {' '.join(correct_answers)}
+Correct answer: {' '.join(correct_answers)}{score_line}
 
 Provide brief feedback (2-3 sentences):
 - If correct: praise and explain why it's right
+- If partly correct: acknowledge what's right, then fix the rest
 - If incorrect: gently explain the mistake and provide the correct answer with reasoning"""
 
-        response = client.chat.completions.create(
-            model=settings.openai_model_name,
-            messages=[
-                {"role": "system", "content": get_system_prompt("explain")},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=200
-        )
-
-        feedback = response.choices[0].message.content.strip()
-        emotion_tag = "praise" if is_correct else "corrective"
-
-        logger.info(f"Exercise checked: correct={is_correct}, score={score}")
-        return is_correct, score, feedback, emotion_tag
+    response = await create_chat_completion(
+        prompt="exercise_feedback",
+        model=settings.openai_model_name,
+        messages=[
+            {"role": "system", "content": get_system_prompt("explain")},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+        max_tokens=200
+    )
 
-    except Exception as e:
-        logger.error(f"Error in check_exercise_with_feedback: {e}")
-        raise
+    return response.choices[0].message.content.strip()
 
 
 # ===== TTS FUNCTIONS =====
 
-# Directory for storing TTS audio files
-MEDIA_DIR = Path("media/tts")
-MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+# Audio format requested from the TTS API (part of the cache key)
+TTS_FORMAT = tts_cache.audio_format
 
+# Deduplicates concurrent syntheses of the same cache key
+_tts_flight = SingleFlight("tts")
 
-def _get_audio_hash(text: str, voice: str) -> str:
-    """Generate unique hash for text + voice combination"""
-    content = f"{text}_{voice}"
-    return hashlib.md5(content.encode()).hexdigest()
+
+def is_speech_cached(text: str, voice: Optional[str] = None) -> bool:
+    """Whether generate_speech would be served from cache for this text + voice"""
+    voice = voice or settings.openai_tts_voice
+    return tts_cache.contains(tts_cache.make_key(text, voice, settings.openai_tts_model))
 
 
 async def generate_speech(
@@ -226,28 +387,20 @@ async def generate_speech(
         if not voice:
             voice = settings.openai_tts_voice
 
-        # Check cache
-        audio_hash = _get_audio_hash(text, voice)
-        audio_path = MEDIA_DIR / f"{audio_hash}.mp3"
-
-        # Return cached file if exists
-        if audio_path.exists():
+        # Check cache (SQLite index shared by workers, queried off the event loop)
+        model = settings.openai_tts_model
+        cache_key = tts_cache.make_key(text, voice, model)
+        cached_path = await run_in_threadpool(tts_cache.lookup, cache_key)
+        record_tts_cache_lookup(cached_path is not None)
+        if cached_path:
             logger.info(f"TTS cache hit for: {text[:50]}...")
-            return str(audio_path)
+            return str(cached_path)
 
-        # Generate new audio
-        logger.info(f"Generating TTS for: {text[:50]}...")
-        response = client.audio.speech.create(
-            model=settings.openai_tts_model,
-            voice=voice,
-            input=text,
-            response_format="mp3"
+        # Generate new audio (concurrent identical requests share one synthesis)
+        audio_path = await _tts_flight.do(
+            cache_key,
+            lambda: _synthesize_to_cache(cache_key, text, voice, model)
         )
-
-        # Save to file
-        response.stream_to_file(audio_path)
-        logger.info(f"TTS saved to: {audio_path}")
-
         return str(audio_path)
 
     except Exception as e:
@@ -255,6 +408,57 @@ async def generate_speech(
         raise
 
 
+async def _synthesize_to_cache(cache_key: str, text: str, voice: str, model: str) -> Path:
+    """
+    Synthesize speech into the TTS cache
+
+    Audio is streamed to a temp file in the cache directory and renamed
+    into place, so readers never see a partially written file.
+    """
+    # Another flight may have filled the cache while we waited to start
+    if await run_in_threadpool(tts_cache.contains, cache_key):
+        return tts_cache.path_for(cache_key)
+
+    audio_path = tts_cache.path_for(cache_key)
+    logger.info(f"Generating TTS for: {text[:50]}...")
+
+    # Each attempt (retry or hedge) writes its own temp file; the winner is published
+    with stage_timer("tts"):
+        temp_path = await upstream.call(
+            "tts",
+            lambda: _download_speech(audio_path, text, voice, model),
+            TTS_POLICY,
+            discard=lambda path: path.unlink(missing_ok=True)
+        )
+    record_tts_usage(model, text)
+    try:
+        os.replace(temp_path, audio_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+    await run_in_threadpool(tts_cache.add, cache_key, text=text, voice=voice, model=model)
+    logger.info(f"TTS saved to: {audio_path}")
+    return audio_path
+
+
+async def _download_speech(audio_path: Path, text: str, voice: str, model: str) -> Path:
+    """One TTS attempt: stream the audio to a fresh temp file next to audio_path"""
+    temp_path = audio_path.with_name(f".{audio_path.stem}.{uuid.uuid4().hex}.tmp")
+    try:
+        async with client.audio.speech.with_streaming_response.create(
+            model=model,
+            voice=voice,
+            input=text,
+            response_format=TTS_FORMAT
+        ) as response:
+            await response.stream_to_file(temp_path)
+        return temp_path
+    except BaseException:
+        # Failed, timed out or lost a hedge: don't leave partial audio behind
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
 # ===== WHISPER (SPEECH-TO-TEXT) FUNCTIONS =====
 
 async def transcribe_audio(
@@ -264,66 +468,112 @@ async def transcribe_audio(
     """
     Transcribe audio file to text using OpenAI Whisper
 
+    The upload's spooled file is validated (size cap, format sniffing)
+    and streamed straight to the API; no temp files or full in-memory copies.
+
     Args:
         file: Audio file (webm, mp3, wav, etc.)
         language: Language code (default: "en" for English)
 
     Returns:
         str: Transcribed text
+
+    Raises:
+        AudioIngestError: If the upload is empty, too large or not audio
     """
-    temp_file_path = None
     try:
-        # Create temp file with appropriate extension
-        file_extension = Path(file.filename).suffix or ".webm"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-            temp_file_path = temp_file.name
-
-            # Write uploaded file to temp location
-            content = await file.read()
-            temp_file.write(content)
-            temp_file.flush()
-
-        logger.info(f"Transcribing audio file: {file.filename} ({len(content)} bytes)")
-
-        # Call Whisper API
-        with open(temp_file_path, "rb") as audio_file:
-            response = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                language=language,
-                response_format="text"
-            )
+        return await _transcribe(prepare_upload(file), language)
+
+    except Exception as e:
+        logger.error(f"Error in transcribe_audio: {e}")
+        raise
+
+
+async def transcribe_audio_bytes(
+    data: bytes,
+    filename: str = "audio",
+    language: str = "en"
+) -> str:
+    """
+    Transcribe in-memory audio (e.g. a WebSocket frame) using OpenAI Whisper
+
+    Args:
+        data: Raw audio bytes
+        filename: Base name for the upload (extension comes from format sniffing)
+        language: Language code (default: "en" for English)
 
-        transcript = response.strip() if isinstance(response, str) else response.text.strip()
-        logger.info(f"Transcription complete: {transcript[:100]}...")
+    Returns:
+        str: Transcribed text
 
-        return transcript
+    Raises:
+        AudioIngestError: If the audio is empty, too large or not audio
+    """
+    try:
+        return await _transcribe(prepare_bytes(data, Path(filename).stem), language)
 
     except Exception as e:
-        logger.error(f"Error in transcribe_audio: {e}")
+        logger.error(f"Error in transcribe_audio_bytes: {e}")
         raise
 
-    finally:
-        # Cleanup temp file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-                logger.debug(f"Cleaned up temp file: {temp_file_path}")
-            except Exception as e:
-                logger.warning(f"Failed to delete temp file: {e}")
+
+async def _transcribe(audio_file: tuple, language: str) -> str:
+    """Send a validated (filename, file_object, content_type) tuple to Whisper"""
+    logger.info(f"Transcribing audio file: {audio_file[0]}")
+
+    async def attempt():
+        # Rewind so a retry re-sends the whole file
+        audio_file[1].seek(0)
+        return await client.audio.transcriptions.create(
+            model="whisper-1",
+            file=audio_file,
+            language=language,
+            response_format="text"
+        )
+
+    with stage_timer("stt"):
+        response = await upstream.call("stt", attempt, STT_POLICY)
+
+    transcript = response.strip() if isinstance(response, str) else response.text.strip()
+    logger.info(f"Transcription complete: {transcript[:100]}...")
+
+    return transcript
 
 
 # ===== BILINGUAL FEEDBACK FUNCTIONS =====
 
+def fallback_bilingual_feedback(word_accuracy: float) -> tuple[str, str]:
+    """
+    Canned bilingual feedback used when the model is unavailable or too slow
+
+    Returns:
+        tuple: (feedback_en, feedback_vi)
+    """
+    if word_accuracy >= 85:
+        feedback_en = "Excellent pronunciation! Keep up the great work."
+        feedback_vi = "Phát âm rất tốt! Tiếp tục như vậy nhé."
+    elif word_accuracy >= 70:
+        feedback_en = "Good job! Practice a bit more to improve your clarity."
+        feedback_vi = "Khá tốt! Luyện thêm một chút để rõ ràng hơn."
+    else:
+        feedback_en = "Keep practicing! Focus on speaking slowly and clearly."
+        feedback_vi = "Tiếp tục luyện tập! Hãy nói chậm và rõ ràng hơn."
+
+    return feedback_en, feedback_vi
+
+
 async def generate_bilingual_feedback(
     expected_text: str,
     spoken_text: str,
     word_accuracy: float,
     accuracy_details: dict
-) -> tuple[str, str, list[str]]:
+) -> tuple[str, str]:
     """
     Generate bilingual feedback (English + Vietnamese) for pronunciation practice
 
+    Tricky words are not requested from the model: they come from the
+    accuracy alignment (accuracy_details["weak_words"]) and are passed in
+    so the feedback can point at them.
+
     Args:
         expected_text: The correct text
         spoken_text: What the user actually said
@@ -331,13 +581,14 @@ async def generate_bilingual_feedback(
         accuracy_details: Detailed accuracy metrics
 
     Returns:
-        tuple: (feedback_en, feedback_vi, tricky_words)
+        tuple: (feedback_en, feedback_vi)
     """
     try:
         matches = accuracy_details.get('matches', 0)
         substitutions = accuracy_details.get('substitutions', 0)
         deletions = accuracy_details.get('deletions', 0)
         insertions = accuracy_details.get('insertions', 0)
+        missed_words = ", ".join(w["word"] for w in accuracy_details.get("weak_words", [])) or "none"
 
         # Build prompt for bilingual feedback
         prompt = f"""The student practiced reading aloud in English.
@@ -350,6 +601,7 @@ Accuracy: {word_accuracy:.1f}%
 - Wrong words: {substitutions}
 - Missing words: {deletions}
 - Extra words: {insertions}
+- Words misread or skipped: {missed_words}
 
 Generate TWO short feedback messages in JSON format:
 
@@ -363,16 +615,14 @@ Generate TWO short feedback messages in JSON format:
    - Nếu có lỗi, chỉ ra cụ thể
    - Động viên học viên
 
-3. "tricky_words": Array of 2-3 difficult words the student struggled with (English only)
-
 Output ONLY valid JSON in this exact format:
 {{
   "feedback_en": "...",
-  "feedback_vi": "...",
-  "tricky_words": ["word1", "word2"]
+  "feedback_vi": "..."
 }}"""
 
-        response = client.chat.completions.create(
+        response = await create_chat_completion(
+            prompt="bilingual_feedback",
             model=settings.openai_model_name,
             messages=[
                 {"role": "system", "content": get_system_prompt("speaking_feedback")},
@@ -384,40 +634,22 @@ Output ONLY valid JSON in this exact format:
 
         response_text = response.choices[0].message.content.strip()
 
-        # Parse JSON response
-        import json
+        # Parse JSON response (the model sometimes wraps it in markdown)
         try:
-            # Try to extract JSON from response (handle cases where GPT adds markdown)
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-
-            data = json.loads(response_text)
+            data = extract_json_object(response_text)
             feedback_en = data.get("feedback_en", "Great job practicing!")
             feedback_vi = data.get("feedback_vi", "Tốt lắm! Tiếp tục luyện tập nhé.")
-            tricky_words = data.get("tricky_words", [])
 
             logger.info(f"Bilingual feedback generated - EN: {len(feedback_en)} chars, VI: {len(feedback_vi)} chars")
-            return feedback_en, feedback_vi, tricky_words
+            return feedback_en, feedback_vi
 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON from GPT: {e}")
             logger.error(f"Response was: {response_text}")
             # Fallback to simple feedback
-            if word_accuracy >= 85:
-                feedback_en = "Excellent pronunciation! Keep up the great work."
-                feedback_vi = "Phát âm rất tốt! Tiếp tục như vậy nhé."
-            elif word_accuracy >= 70:
-                feedback_en = "Good job! Practice a bit more to improve your clarity."
-                feedback_vi = "Khá tốt! Luyện thêm một chút để rõ ràng hơn."
-            else:
-                feedback_en = "Keep practicing! Focus on speaking slowly and clearly."
-                feedback_vi = "Tiếp tục luyện tập! Hãy nói chậm và rõ ràng hơn."
-
-            return feedback_en, feedback_vi, []
+            return fallback_bilingual_feedback(word_accuracy)
 
     except Exception as e:
         logger.error(f"Error in generate_bilingual_feedback: {e}")
-        # Return safe defaults
-        return "Great effort! Keep practicing.", "Cố gắng tốt! Tiếp tục luyện tập nhé.", []
+        # Model unavailable (or its breaker is open): canned feedback for this score
+        return fallback_bilingual_feedback(word_accuracy)
@@ -0,0 +1,101 @@
+"""
+Pipeline Service - Run request stages with deadlines and per-stage timings
+Used by endpoints that chain several upstream calls (STT, LLM, TTS)
+"""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sentinel: re-raise stage failures instead of returning a fallback
+_RAISE = object()
+
+
+class StageTimings:
+    """
+    Collects wall-clock timings for the stages of one request
+
+    Usage:
+        timings = StageTimings()
+        text = await timings.run("stt", transcribe(...), timeout=20)
+        with timings.measure("accuracy"):
+            score = compute(...)
+        en, vi = await asyncio.gather(
+            timings.run("tts_en", tts(...), timeout=10, fallback=None),
+            timings.run("tts_vi", tts(...), timeout=10, fallback=None)
+        )
+        response.headers["Server-Timing"] = timings.server_timing()
+    """
+
+    def __init__(self):
+        self.durations_ms: Dict[str, float] = {}
+        self.failed: Dict[str, str] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def measure(self, name: str):
+        """Time a synchronous block as a named stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations_ms[name] = (time.perf_counter() - start) * 1000
+
+    async def run(
+        self,
+        name: str,
+        awaitable: Awaitable[Any],
+        timeout: Optional[float] = None,
+        fallback: Any = _RAISE
+    ) -> Any:
+        """
+        Await one stage with an optional deadline
+
+        Args:
+            name: Stage name (used in logs and Server-Timing)
+            awaitable: Coroutine producing the stage result
+            timeout: Deadline in seconds (None = no deadline)
+            fallback: Value returned if the stage fails or times out.
+                      If omitted, the error is re-raised.
+
+        Returns:
+            Stage result, or fallback on failure
+        """
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(awaitable, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.failed[name] = "timeout"
+            logger.warning(f"Stage '{name}' exceeded deadline of {timeout}s")
+            if fallback is _RAISE:
+                raise
+            return fallback
+        except Exception as e:
+            self.failed[name] = "error"
+            if fallback is _RAISE:
+                raise
+            logger.error(f"Stage '{name}' failed, using fallback: {e}")
+            return fallback
+        finally:
+            self.durations_ms[name] = (time.perf_counter() - start) * 1000
+
+    @property
+    def total_ms(self) -> float:
+        """Elapsed time since the timings object was created"""
+        return (time.perf_counter() - self._started) * 1000
+
+    def server_timing(self) -> str:
+        """Format timings as a Server-Timing header value"""
+        parts = [f"{name};dur={ms:.1f}" for name, ms in self.durations_ms.items()]
+        parts.append(f"total;dur={self.total_ms:.1f}")
+        return ", ".join(parts)
+
+    def summary(self) -> str:
+        """Human-readable one-line summary for logs"""
+        parts = [f"{name}={ms:.0f}ms" for name, ms in self.durations_ms.items()]
+        if self.failed:
+            parts.append(f"failed={self.failed}")
+        return f"{' '.join(parts)} total={self.total_ms:.0f}ms"
@@ -0,0 +1,277 @@
+"""
+Progress Rollups - Incremental per-user daily activity totals
+Every ingested event bumps one (user, local day) row, so weekly stats and
+insights are a 7-row read instead of a recomputation over raw records
+"""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import upsert_insert
+from models.db_models import DailyRollup
+from models.schemas import (
+    DailyActivity,
+    GoalProgress,
+    ProgressInsight,
+    WeeklyProgressResponse,
+    WeeklyStats
+)
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TZ = ZoneInfo(settings.progress_timezone)
+
+# Estimated practice minutes for activities that don't report a duration
+# (same weights the frontend used for its estimate)
+ESTIMATED_MINUTES = {
+    "phrase_saved": 3.0,
+    "phrase_practice": 3.0,
+    "word_mastered": 2.0,
+    "review": 1.0
+}
+
+# Daily minutes are capped for display, like the old client-side chart
+MAX_DISPLAY_MINUTES_PER_DAY = 60
+
+# How far back the practice streak is counted
+STREAK_LOOKBACK_DAYS = 60
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+_COUNTERS = (
+    "speaking_minutes",
+    "sessions",
+    "practice_count",
+    "score_sum",
+    "score_count",
+    "words_mastered",
+    "phrases_saved",
+    "errors_recorded"
+)
+
+
+def local_day(at: Optional[datetime] = None) -> date:
+    """Calendar day of a naive-UTC timestamp in the progress timezone"""
+    at = at or datetime.utcnow()
+    return at.replace(tzinfo=timezone.utc).astimezone(PROGRESS_TZ).date()
+
+
+def bump(db: Session, user_id: str, at: Optional[datetime] = None, **increments: float) -> None:
+    """
+    Add to a user's counters for the day of `at`. Does not commit.
+
+    Args:
+        increments: Column name -> amount (see DailyRollup), e.g. sessions=1
+    """
+    increments = {name: amount for name, amount in increments.items() if amount}
+    if not increments:
+        return
+    unknown = set(increments) - set(_COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown rollup counters: {sorted(unknown)}")
+
+    day = local_day(at)
+    insert = upsert_insert(db)
+    if insert is not None:
+        values = {name: increments.get(name, 0) for name in _COUNTERS}
+        stmt = insert(DailyRollup).values(user_id=user_id, day=day, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "day"],
+            set_={name: getattr(DailyRollup, name) + stmt.excluded[name] for name in increments}
+        )
+        db.execute(stmt)
+        return
+
+    rollup = db.get(DailyRollup, (user_id, day))
+    if rollup is None:
+        rollup = DailyRollup(user_id=user_id, day=day, **{name: 0 for name in _COUNTERS})
+        db.add(rollup)
+    for name, amount in increments.items():
+        setattr(rollup, name, getattr(rollup, name) + amount)
+
+
+def week_range(week_offset: int = 0, today: Optional[date] = None) -> tuple[date, date]:
+    """Monday and Sunday of the week `week_offset` weeks from this one"""
+    today = today or local_day()
+    monday = today - timedelta(days=today.weekday()) + timedelta(weeks=week_offset)
+    return monday, monday + timedelta(days=6)
+
+
+def _rollups_between(db: Session, user_id: str, start: date, end: date) -> Dict[date, DailyRollup]:
+    rows = db.scalars(
+        select(DailyRollup).where(
+            DailyRollup.user_id == user_id,
+            DailyRollup.day >= start,
+            DailyRollup.day <= end
+        )
+    )
+    return {row.day: row for row in rows}
+
+
+def get_streak(db: Session, user_id: str, today: Optional[date] = None) -> int:
+    """Consecutive active days ending today (an inactive today doesn't break it)"""
+    today = today or local_day()
+    active = _rollups_between(db, user_id, today - timedelta(days=STREAK_LOOKBACK_DAYS), today)
+
+    streak = 0
+    day = today if today in active else today - timedelta(days=1)
+    while day in active:
+        streak += 1
+        day -= timedelta(days=1)
+    return streak
+
+
+def get_weekly_stats(
+    db: Session,
+    user_id: str,
+    week_offset: int = 0,
+    today: Optional[date] = None
+) -> WeeklyStats:
+    """Weekly totals and per-day breakdown, read from at most 7 rollup rows"""
+    today = today or local_day()
+    monday, sunday = week_range(week_offset, today)
+    rollups = _rollups_between(db, user_id, monday, sunday)
+
+    daily: List[DailyActivity] = []
+    for offset in range(7):
+        day = monday + timedelta(days=offset)
+        row = rollups.get(day)
+        daily.append(DailyActivity(
+            date=day.isoformat(),
+            day_name=DAY_NAMES[offset],
+            speaking_minutes=round(min(row.speaking_minutes, MAX_DISPLAY_MINUTES_PER_DAY), 1) if row else 0.0,
+            sessions=row.sessions if row else 0,
+            words_count=row.words_mastered if row else 0,
+            phrases_count=row.phrases_saved if row else 0,
+            practice_count=row.practice_count if row else 0,
+            avg_score=round(row.score_sum / row.score_count, 1) if row and row.score_count else 0.0
+        ))
+
+    score_sum = sum(row.score_sum for row in rollups.values())
+    score_count = sum(row.score_count for row in rollups.values())
+
+    return WeeklyStats(
+        week_offset=week_offset,
+        start_date=monday.isoformat(),
+        end_date=sunday.isoformat(),
+        speaking_minutes=round(sum(d.speaking_minutes for d in daily), 1),
+        sessions=sum(d.sessions for d in daily),
+        words_mastered=sum(d.words_count for d in daily),
+        phrases_saved=sum(d.phrases_count for d in daily),
+        practice_count=sum(d.practice_count for d in daily),
+        avg_score=round(score_sum / score_count, 1) if score_count else 0.0,
+        active_days=len(rollups),
+        streak=get_streak(db, user_id, today) if week_offset == 0 else 0,
+        daily_activity=daily
+    )
+
+
+def build_insights(
+    this_week: WeeklyStats,
+    last_week: WeeklyStats,
+    daily_goal_minutes: int
+) -> tuple[List[ProgressInsight], GoalProgress]:
+    """Week-over-week insights and goal progress (same rules as the old client-side version)"""
+    insights = []
+    goal_minutes = daily_goal_minutes * 7
+
+    speaking_change = round(this_week.speaking_minutes - last_week.speaking_minutes)
+    if speaking_change > 0:
+        insights.append(ProgressInsight(
+            type="improvement", icon="trendingUp",
+            message=f"You practiced {speaking_change} more minutes this week!",
+            value=f"+{speaking_change} min"
+        ))
+    elif speaking_change < 0:
+        insights.append(ProgressInsight(
+            type="warning", icon="trendingDown",
+            message=f"Practice time decreased by {abs(speaking_change)} minutes this week.",
+            value=f"{speaking_change} min"
+        ))
+
+    percentage = round(this_week.speaking_minutes / goal_minutes * 100) if goal_minutes else 0
+    if goal_minutes and this_week.speaking_minutes >= goal_minutes:
+        insights.append(ProgressInsight(
+            type="success", icon="trophy",
+            message=f"Amazing! You hit your weekly goal of {goal_minutes} minutes!",
+            value=f"{percentage}%"
+        ))
+    elif percentage >= 80:
+        insights.append(ProgressInsight(
+            type="progress", icon="target",
+            message=f"Almost there! {round(goal_minutes - this_week.speaking_minutes)} more minutes to reach your goal.",
+            value=f"{percentage}%"
+        ))
+
+    if this_week.active_days >= 5:
+        insights.append(ProgressInsight(
+            type="consistency", icon="calendar",
+            message=f"Excellent consistency! You practiced {this_week.active_days} days this week.",
+            value=f"{this_week.active_days}/7 days"
+        ))
+
+    if this_week.streak >= 7:
+        insights.append(ProgressInsight(
+            type="streak", icon="fire",
+            message=f"You're on fire! {this_week.streak}-day practice streak!",
+            value=f"{this_week.streak} days"
+        ))
+    elif this_week.streak >= 3:
+        insights.append(ProgressInsight(
+            type="streak", icon="zap",
+            message=f"Keep it up! {this_week.streak}-day streak going strong.",
+            value=f"{this_week.streak} days"
+        ))
+
+    if this_week.avg_score > 0 and last_week.avg_score > 0:
+        score_change = round(this_week.avg_score - last_week.avg_score)
+        if score_change >= 5:
+            insights.append(ProgressInsight(
+                type="improvement", icon="sparkles",
+                message=f"Your pronunciation improved by {score_change}% this week!",
+                value=f"+{score_change}%"
+            ))
+
+    if this_week.words_mastered > 0:
+        noun = "word" if this_week.words_mastered == 1 else "words"
+        insights.append(ProgressInsight(
+            type="achievement", icon="award",
+            message=f"You mastered {this_week.words_mastered} {noun} this week!",
+            value=str(this_week.words_mastered)
+        ))
+
+    goal = GoalProgress(current=this_week.speaking_minutes, target=goal_minutes, percentage=percentage)
+    return insights, goal
+
+
+def get_weekly_progress(
+    db: Session,
+    user_id: str,
+    week_offset: int = 0,
+    daily_goal_minutes: int = 15
+) -> WeeklyProgressResponse:
+    """The requested week, the one before it, insights and goal progress"""
+    today = local_day()
+    this_week = get_weekly_stats(db, user_id, week_offset, today)
+    last_week = get_weekly_stats(db, user_id, week_offset - 1, today)
+    insights, goal = build_insights(this_week, last_week, daily_goal_minutes)
+
+    return WeeklyProgressResponse(
+        user_id=user_id,
+        this_week=this_week,
+        last_week=last_week,
+        insights=insights,
+        goal_progress=goal
+    )
+
+
+def get_session_count(db: Session, user_id: str) -> int:
+    """Total sessions across all days"""
+    return db.scalar(
+        select(func.coalesce(func.sum(DailyRollup.sessions), 0)).where(DailyRollup.user_id == user_id)
+    )
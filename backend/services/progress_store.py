@@ -0,0 +1,517 @@
+"""
+Progress Store - Persisted weak words and saved phrases
+Indexed queries and upserts over the user-progress tables, plus the
+spaced-repetition review queue
+"""
+import heapq
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Union
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import upsert_insert
+from models.db_models import ProcessedEvent, SavedPhraseRecord, WeakWordRecord
+from models.schemas import (
+    DueItem,
+    PhrasePracticeEvent,
+    PhraseSavedEvent,
+    SavedPhrase,
+    SessionEvent,
+    UserEventBatch,
+    UserProgress,
+    WeakWord,
+    WeakWordEvent
+)
+from services import progress_rollups, srs_scheduler
+from services.srs_scheduler import ReviewState
+
+logger = logging.getLogger(__name__)
+
+# Phrase mastery rules (same defaults as updatePhraseStats in the frontend)
+MASTERY_THRESHOLD = 85
+REQUIRED_STREAK_FOR_MASTERY = 3
+
+def parse_timestamp(value: Optional[str]) -> datetime:
+    """
+    Parse an ISO timestamp (e.g. from JS toISOString) to naive UTC
+
+    Missing values default to now; raises ValueError if unparseable.
+    """
+    if not value:
+        return datetime.utcnow()
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def format_timestamp(value: datetime) -> str:
+    """Naive UTC datetime -> ISO string with Z suffix"""
+    return value.isoformat(timespec="milliseconds") + "Z"
+
+
+def _review_state(record: Union[WeakWordRecord, SavedPhraseRecord]) -> ReviewState:
+    return ReviewState(
+        ease=record.srs_ease,
+        interval_days=record.srs_interval_days,
+        repetitions=record.srs_repetitions,
+        due_at=record.due_at
+    )
+
+
+def _apply_review_state(record: Union[WeakWordRecord, SavedPhraseRecord], state: ReviewState) -> None:
+    record.srs_ease = state.ease
+    record.srs_interval_days = state.interval_days
+    record.srs_repetitions = state.repetitions
+    record.due_at = state.due_at
+
+
+# ===== WEAK WORDS =====
+
+def upsert_weak_word(
+    db: Session,
+    user_id: str,
+    word: str,
+    error_type: str,
+    error_count: int = 1,
+    last_practiced: Optional[datetime] = None
+) -> None:
+    """
+    Record errors on a word: insert it, or add to its error_count
+
+    A new error is a lapse: the word's review schedule restarts and it is
+    due immediately. Does not commit, so callers can batch several writes
+    in one transaction.
+    """
+    last_practiced = last_practiced or datetime.utcnow()
+    values = {
+        "user_id": user_id,
+        "word": word.strip().lower(),
+        "error_type": error_type,
+        "error_count": error_count,
+        "last_practiced": last_practiced,
+        "created_at": datetime.utcnow(),
+        "srs_ease": srs_scheduler.DEFAULT_EASE,
+        "srs_interval_days": 0.0,
+        "srs_repetitions": 0,
+        "due_at": last_practiced
+    }
+
+    progress_rollups.bump(db, user_id, last_practiced, errors_recorded=error_count)
+
+    insert = upsert_insert(db)
+    if insert is not None:
+        stmt = insert(WeakWordRecord).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "word"],
+            set_={
+                "error_count": WeakWordRecord.error_count + stmt.excluded.error_count,
+                "error_type": stmt.excluded.error_type,
+                "last_practiced": stmt.excluded.last_practiced,
+                # Same as srs_scheduler.lapse()
+                "srs_interval_days": 0.0,
+                "srs_repetitions": 0,
+                "due_at": stmt.excluded.due_at
+            }
+        )
+        db.execute(stmt)
+        return
+
+    # Portable fallback: read-modify-write on the unique (user_id, word) row
+    record = db.scalar(
+        select(WeakWordRecord).where(
+            WeakWordRecord.user_id == user_id,
+            WeakWordRecord.word == values["word"]
+        )
+    )
+    if record is None:
+        db.add(WeakWordRecord(**values))
+    else:
+        record.error_count += error_count
+        record.error_type = error_type
+        record.last_practiced = last_practiced
+        _apply_review_state(record, srs_scheduler.lapse(_review_state(record), last_practiced))
+
+
+def record_weak_words(
+    db: Session,
+    user_id: str,
+    weak_words: List[Dict[str, str]],
+    practiced_at: Optional[datetime] = None
+) -> None:
+    """Upsert one error for each {"word", "error_type"} (e.g. from accuracy details). Does not commit."""
+    practiced_at = practiced_at or datetime.utcnow()
+    for weak_word in weak_words:
+        upsert_weak_word(db, user_id, weak_word["word"], weak_word["error_type"], 1, practiced_at)
+
+
+def record_read_aloud(
+    db: Session,
+    user_id: str,
+    weak_words: List[Dict[str, str]],
+    score: float,
+    practiced_at: Optional[datetime] = None
+) -> None:
+    """Store a read-aloud attempt: its weak words plus a scored practice. Does not commit."""
+    practiced_at = practiced_at or datetime.utcnow()
+    record_weak_words(db, user_id, weak_words, practiced_at)
+    progress_rollups.bump(db, user_id, practiced_at, practice_count=1, score_sum=score, score_count=1)
+
+
+def get_weak_words(db: Session, user_id: str, limit: Optional[int] = None) -> List[WeakWord]:
+    """Weak words by error count (descending), served from the (user_id, error_count) index"""
+    query = (
+        select(WeakWordRecord)
+        .where(WeakWordRecord.user_id == user_id)
+        .order_by(WeakWordRecord.error_count.desc(), WeakWordRecord.id.desc())
+    )
+    if limit:
+        query = query.limit(limit)
+
+    return [
+        WeakWord(
+            word=record.word,
+            error_type=record.error_type,
+            error_count=record.error_count,
+            last_practiced=format_timestamp(record.last_practiced)
+        )
+        for record in db.scalars(query)
+    ]
+
+
+# ===== SAVED PHRASES =====
+
+def save_phrase(
+    db: Session,
+    user_id: str,
+    phrase: str,
+    source: str,
+    topic: str,
+    saved_at: Optional[datetime] = None
+) -> bool:
+    """
+    Add a phrase to the user's bank
+
+    Safe against a concurrent save of the same phrase: the unique
+    (user_id, phrase_key) row decides, and the loser returns False
+    instead of failing the request with an IntegrityError.
+
+    Returns:
+        bool: False if the phrase (case-insensitive) was already saved
+    """
+    phrase = phrase.strip()
+    saved_at = saved_at or datetime.utcnow()
+    values = {
+        "user_id": user_id,
+        "phrase": phrase,
+        "phrase_key": phrase.lower(),
+        "source": source,
+        "topic": topic,
+        "saved_at": saved_at,
+        "due_at": saved_at
+    }
+
+    insert = upsert_insert(db)
+    if insert is not None:
+        stmt = insert(SavedPhraseRecord).values(**values).on_conflict_do_nothing(
+            index_elements=["user_id", "phrase_key"]
+        )
+        if db.execute(stmt).rowcount == 0:
+            return False
+    else:
+        # Portable fallback: insert in a savepoint, so a duplicate only rolls back this row
+        exists = db.scalar(
+            select(SavedPhraseRecord.id).where(
+                SavedPhraseRecord.user_id == user_id,
+                SavedPhraseRecord.phrase_key == values["phrase_key"]
+            )
+        )
+        if exists is not None:
+            return False
+        try:
+            with db.begin_nested():
+                db.add(SavedPhraseRecord(**values))
+        except IntegrityError:
+            return False
+
+    progress_rollups.bump(
+        db, user_id, saved_at,
+        phrases_saved=1,
+        speaking_minutes=progress_rollups.ESTIMATED_MINUTES["phrase_saved"]
+    )
+    return True
+
+
+def get_phrases(db: Session, user_id: str, topic: Optional[str] = None) -> List[SavedPhrase]:
+    """Saved phrases, newest first, optionally filtered by topic via the (user_id, topic) index"""
+    query = select(SavedPhraseRecord).where(SavedPhraseRecord.user_id == user_id)
+    if topic:
+        query = query.where(SavedPhraseRecord.topic == topic)
+    query = query.order_by(SavedPhraseRecord.saved_at.desc())
+
+    return [
+        SavedPhrase(
+            phrase=record.phrase,
+            source=record.source,
+            topic=record.topic,
+            saved_at=format_timestamp(record.saved_at)
+        )
+        for record in db.scalars(query)
+    ]
+
+
+def record_phrase_practice(
+    db: Session,
+    user_id: str,
+    phrase: str,
+    score: float,
+    practiced_at: Optional[datetime] = None
+) -> Optional[SavedPhraseRecord]:
+    """
+    Update a saved phrase's practice count, running average, streak and
+    status, and reschedule its next review
+
+    Returns:
+        SavedPhraseRecord: The updated phrase, or None if the user has no such phrase
+    """
+    record = db.scalar(
+        select(SavedPhraseRecord).where(
+            SavedPhraseRecord.user_id == user_id,
+            SavedPhraseRecord.phrase_key == phrase.strip().lower()
+        )
+    )
+    if record is None:
+        return None
+
+    practiced_at = practiced_at or datetime.utcnow()
+    practice_count = (record.practice_count or 0) + 1
+    record.avg_score = ((record.avg_score or 0.0) * (practice_count - 1) + score) / practice_count
+    record.practice_count = practice_count
+    record.success_streak = (record.success_streak or 0) + 1 if score >= MASTERY_THRESHOLD else 0
+    record.last_practiced_at = practiced_at
+    _apply_review_state(record, srs_scheduler.review(_review_state(record), score, practiced_at))
+
+    if record.success_streak >= REQUIRED_STREAK_FOR_MASTERY:
+        record.status = "mastered"
+    elif record.success_streak >= 1 or practice_count >= 2:
+        record.status = "learning"
+    else:
+        record.status = "weak"
+
+    progress_rollups.bump(
+        db, user_id, practiced_at,
+        practice_count=1,
+        score_sum=score,
+        score_count=1,
+        speaking_minutes=progress_rollups.ESTIMATED_MINUTES["phrase_practice"]
+    )
+    return record
+
+
+# ===== SPACED REPETITION =====
+
+def _due_item(record: Union[WeakWordRecord, SavedPhraseRecord]) -> DueItem:
+    state = _review_state(record)
+    if isinstance(record, WeakWordRecord):
+        return DueItem(
+            kind="weak_word",
+            text=record.word,
+            due_at=format_timestamp(record.due_at),
+            status=state.status,
+            interval_days=state.interval_days,
+            repetitions=state.repetitions,
+            error_count=record.error_count
+        )
+    return DueItem(
+        kind="phrase",
+        text=record.phrase,
+        due_at=format_timestamp(record.due_at),
+        status=state.status,
+        interval_days=state.interval_days,
+        repetitions=state.repetitions,
+        topic=record.topic
+    )
+
+
+def get_due_items(
+    db: Session,
+    user_id: str,
+    limit: int = 20,
+    kind: Optional[str] = None,
+    now: Optional[datetime] = None
+) -> List[DueItem]:
+    """
+    Items due for review, most overdue first
+
+    Each table is read with a range scan on its (user_id, due_at) index,
+    which yields rows already ordered by due date, so only the `limit`
+    earliest rows per table are touched. The two sorted streams are then
+    merged (heap merge) into one queue.
+
+    Args:
+        kind: "weak_word", "phrase" or None for both
+    """
+    now = now or datetime.utcnow()
+    streams = []
+    for model, model_kind in ((WeakWordRecord, "weak_word"), (SavedPhraseRecord, "phrase")):
+        if kind and kind != model_kind:
+            continue
+        streams.append(db.scalars(
+            select(model)
+            .where(model.user_id == user_id, model.due_at <= now)
+            .order_by(model.due_at)
+            .limit(limit)
+        ).all())
+
+    merged = heapq.merge(*streams, key=lambda record: record.due_at)
+    return [_due_item(record) for _, record in zip(range(limit), merged)]
+
+
+def review_item(
+    db: Session,
+    user_id: str,
+    kind: str,
+    text: str,
+    score: float,
+    reviewed_at: Optional[datetime] = None
+) -> Optional[DueItem]:
+    """
+    Record a review and reschedule the item. Does not commit.
+
+    Returns:
+        DueItem: The item with its next due date, or None if not found
+    """
+    reviewed_at = reviewed_at or datetime.utcnow()
+
+    if kind == "phrase":
+        record = record_phrase_practice(db, user_id, text, score, reviewed_at)
+    else:
+        record = db.scalar(
+            select(WeakWordRecord).where(
+                WeakWordRecord.user_id == user_id,
+                WeakWordRecord.word == text.strip().lower()
+            )
+        )
+        if record is not None:
+            was_mastered = _review_state(record).status == "mastered"
+            record.last_practiced = reviewed_at
+            state = srs_scheduler.review(_review_state(record), score, reviewed_at)
+            _apply_review_state(record, state)
+
+            newly_mastered = state.status == "mastered" and not was_mastered
+            progress_rollups.bump(
+                db, user_id, reviewed_at,
+                practice_count=1,
+                score_sum=score,
+                score_count=1,
+                words_mastered=1 if newly_mastered else 0,
+                speaking_minutes=progress_rollups.ESTIMATED_MINUTES["review"]
+                + (progress_rollups.ESTIMATED_MINUTES["word_mastered"] if newly_mastered else 0)
+            )
+
+    return _due_item(record) if record is not None else None
+
+
+# ===== EVENT INGESTION =====
+
+def ingest_events(db: Session, batch: UserEventBatch) -> Dict[str, int]:
+    """
+    Apply a batch of events in one transaction, skipping already-seen idempotency keys
+
+    Keys are recorded in the same transaction as the writes, so a retried
+    batch (or one that overlaps an earlier one) never double-counts.
+    Does not commit.
+
+    Raises:
+        ValueError: If an event timestamp is not ISO formatted
+
+    Returns:
+        dict: Counts of applied, duplicate and skipped events
+    """
+    keys = {event.idempotency_key for event in batch.events}
+    seen = set(db.scalars(
+        select(ProcessedEvent.idempotency_key).where(
+            ProcessedEvent.user_id == batch.user_id,
+            ProcessedEvent.idempotency_key.in_(keys)
+        )
+    )) if keys else set()
+
+    counts = {"applied": 0, "duplicates": 0, "skipped": 0}
+    now = datetime.utcnow()
+
+    for event in batch.events:
+        if event.idempotency_key in seen:
+            counts["duplicates"] += 1
+            continue
+        seen.add(event.idempotency_key)
+        db.add(ProcessedEvent(user_id=batch.user_id, idempotency_key=event.idempotency_key, processed_at=now))
+
+        applied = True
+        if isinstance(event, WeakWordEvent):
+            weak_word = event.weak_word
+            upsert_weak_word(
+                db, batch.user_id, weak_word.word, weak_word.error_type,
+                weak_word.error_count, parse_timestamp(weak_word.last_practiced)
+            )
+        elif isinstance(event, PhraseSavedEvent):
+            phrase = event.phrase
+            applied = save_phrase(
+                db, batch.user_id, phrase.phrase, phrase.source,
+                phrase.topic, parse_timestamp(phrase.saved_at)
+            )
+        elif isinstance(event, PhrasePracticeEvent):
+            applied = record_phrase_practice(
+                db, batch.user_id, event.phrase, event.score, parse_timestamp(event.practiced_at)
+            )
+        elif isinstance(event, SessionEvent):
+            progress_rollups.bump(
+                db, batch.user_id, parse_timestamp(event.ended_at),
+                sessions=1,
+                speaking_minutes=event.minutes,
+                score_sum=event.score or 0,
+                score_count=1 if event.score is not None else 0
+            )
+
+        counts["applied" if applied else "skipped"] += 1
+
+    return counts
+
+
+# ===== AGGREGATE =====
+
+def get_progress(db: Session, user_id: str) -> Dict:
+    """
+    Full progress snapshot plus summary stats
+
+    Returns:
+        dict: UserProgress fields plus "stats" (totals and phrases per topic)
+    """
+    progress = UserProgress(
+        user_id=user_id,
+        weak_words=get_weak_words(db, user_id),
+        saved_phrases=get_phrases(db, user_id),
+        session_count=progress_rollups.get_session_count(db, user_id)
+    )
+
+    total_errors = db.scalar(
+        select(func.coalesce(func.sum(WeakWordRecord.error_count), 0))
+        .where(WeakWordRecord.user_id == user_id)
+    )
+    topic_counts = db.execute(
+        select(SavedPhraseRecord.topic, func.count())
+        .where(SavedPhraseRecord.user_id == user_id)
+        .group_by(SavedPhraseRecord.topic)
+    ).all()
+
+    return {
+        **progress.model_dump(),
+        "stats": {
+            "total_weak_words": len(progress.weak_words),
+            "total_errors": total_errors,
+            "total_saved_phrases": len(progress.saved_phrases),
+            "phrases_by_topic": {topic: count for topic, count in topic_counts}
+        }
+    }
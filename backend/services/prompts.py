@@ -0,0 +1,172 @@
+"""
+Prompts - Versioned prompt templates laid out for provider prompt caching
+Static persona/mode text is assembled once at import time and always leads
+the message list; per-request context goes after it, so requests share the
+longest possible cacheable prefix
+"""
+import json
+import sys
+from typing import Any, Optional
+
+# Bump when any template below changes; cache stats are kept per version
+PROMPT_VERSION = "2"
+
+# ===== COACH IVY SYSTEM PROMPTS =====
+
+COACH_IVY_BASE_PROMPT = """You are "Coach Ivy", a personal English tutor for a Vietnamese learner.
+
+**Personality:**
+- Friendly, encouraging, and supportive
+- Patient and understanding
+- Enthusiastic about progress
+- Professional but warm
+
+**Communication style:**
+- Use English for teaching and examples
+- Use short Vietnamese explanations when concepts are complex
+- Keep responses concise (2-4 sentences for most cases)
+- Always be positive and motivating
+
+**Teaching approach:**
+- Focus on practical usage
+- Provide real-world examples
+- Explain "why" not just "what"
+- Encourage practice and repetition
+- Celebrate small wins
+"""
+
+MODE_PROMPTS = {
+    "free_chat": """The user is having a casual conversation to practice English.
+- Answer their questions naturally
+- Gently correct major errors
+- Keep the conversation flowing
+- Use this as a teaching opportunity when appropriate""",
+
+    "explain": """The user needs help understanding an English concept, word, or phrase.
+- Provide a clear explanation
+- Give 2-3 practical examples
+- Include Vietnamese translation for key terms
+- Keep it simple and actionable""",
+
+    "speaking_feedback": """The user just practiced speaking. Provide constructive feedback.
+- Start with encouragement
+- Point out what they did well
+- Suggest ONE main improvement
+- Provide the corrected version
+- Give a similar example to practice"""
+}
+
+
+# Full Coach Ivy system prompts per mode, built once and interned
+COACH_SYSTEM_PROMPTS = {
+    mode: sys.intern(f"{COACH_IVY_BASE_PROMPT}\n\n{mode_prompt}")
+    for mode, mode_prompt in MODE_PROMPTS.items()
+}
+
+
+def get_system_prompt(mode: str = "free_chat") -> str:
+    """Get complete system prompt for Coach Ivy"""
+    return COACH_SYSTEM_PROMPTS.get(mode, COACH_SYSTEM_PROMPTS["free_chat"])
+
+
+# ===== MESSAGE ASSEMBLY =====
+
+def context_message(label: str, context: Any) -> dict:
+    """
+    System message carrying per-request context
+
+    Dicts are serialized with sorted keys so the same context always
+    renders to the same text.
+    """
+    if isinstance(context, dict):
+        context = json.dumps(context, ensure_ascii=False, sort_keys=True)
+    return {"role": "system", "content": f"{label}: {context}"}
+
+
+def coach_chat_messages(
+    message: str,
+    mode: str,
+    context: Optional[dict] = None,
+    history: Optional[list[dict]] = None
+) -> list[dict]:
+    """
+    Messages for one Coach Ivy chat request
+
+    Layout: static mode prompt, conversation history (summary + recent
+    turns), request context, new message. Only the tail changes between
+    turns of a conversation.
+    """
+    messages = [{"role": "system", "content": get_system_prompt(mode)}]
+    messages.extend(history or [])
+    if context:
+        messages.append(context_message("Context", context))
+    messages.append({"role": "user", "content": message})
+    return messages
+
+
+def persona_chat_messages(
+    persona_prompt: str,
+    user_text: str,
+    topic_context: Optional[str] = None,
+    history: Optional[list[dict]] = None
+) -> list[dict]:
+    """
+    Messages for one Live Talk turn
+
+    Layout: static persona prompt, topic context (fixed for a session),
+    conversation history, new message.
+    """
+    messages = [{"role": "system", "content": persona_prompt}]
+    if topic_context:
+        messages.append(context_message("Current topic context", topic_context))
+    messages.extend(history or [])
+    messages.append({"role": "user", "content": user_text})
+    return messages
+
+
+# ===== PREFIX CACHE STATS =====
+
+class PromptCacheStats:
+    """
+    Provider prompt-cache hit counters per prompt template
+
+    Fed from response usage (prompt_tokens_details.cached_tokens), keyed
+    by template name and PROMPT_VERSION.
+    """
+
+    def __init__(self):
+        self._counters: dict[str, dict] = {}
+
+    def record(self, prompt: str, usage: Any) -> None:
+        """Add one response's usage to the template's counters"""
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) or 0
+
+        counters = self._counters.setdefault(f"{prompt}@v{PROMPT_VERSION}", {
+            "requests": 0,
+            "cache_hits": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0
+        })
+        counters["requests"] += 1
+        counters["cache_hits"] += 1 if cached_tokens else 0
+        counters["prompt_tokens"] += usage.prompt_tokens or 0
+        counters["cached_tokens"] += cached_tokens
+
+    def stats(self) -> dict:
+        """Counters plus request hit rate and cached share of prompt tokens"""
+        return {
+            prompt: {
+                **counters,
+                "hit_rate": round(counters["cache_hits"] / counters["requests"], 3),
+                "cached_token_rate": round(counters["cached_tokens"] / counters["prompt_tokens"], 3)
+                if counters["prompt_tokens"] else 0.0
+            }
+            for prompt, counters in self._counters.items()
+        }
+
+
+# Global prompt-cache stats for every chat completion
+prompt_cache_stats = PromptCacheStats()
@@ -0,0 +1,57 @@
+"""
+Reply Parsing - Pure helpers that interpret model replies
+JSON extraction for structured replies and emotion tagging for the avatar;
+no I/O, so they can be benchmarked and reused without an API client
+"""
+import json
+import re
+
+# A ```json ... ``` or ``` ... ``` fenced block
+_FENCED_BLOCK = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+# Emotion indicators, checked in order: praise, corrective, encouraging
+PRAISE_WORDS = ("excellent", "perfect", "great", "wonderful", "amazing", "fantastic", "correct", "well done", "good job", "tuyệt vời", "hoàn hảo")
+CORRECTIVE_WORDS = ("however", "but", "correction", "should be", "mistake", "error", "incorrect", "sửa", "sai")
+ENCOURAGING_WORDS = ("keep", "practice", "try", "don't worry", "no problem", "keep going", "tiếp tục", "cố lên")
+
+
+def extract_json_object(text: str) -> dict:
+    """
+    Parse the JSON object in a model reply
+
+    Accepts bare JSON, a fenced (```json) block, or an object wrapped in
+    prose (the outermost braces are used).
+
+    Raises:
+        json.JSONDecodeError: If no JSON object can be parsed
+    """
+    text = text.strip()
+    if not text.startswith("{"):
+        fenced = _FENCED_BLOCK.search(text)
+        if fenced:
+            text = fenced.group(1).strip()
+        start, end = text.find("{"), text.rfind("}")
+        if start != -1 and end > start:
+            text = text[start:end + 1]
+
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise json.JSONDecodeError("Expected a JSON object", text, 0)
+    return data
+
+
+def analyze_emotion(text: str) -> str:
+    """
+    Analyze text to determine appropriate emotion tag for avatar
+
+    Returns: neutral | praise | corrective | encouraging
+    """
+    text_lower = text.lower()
+
+    if any(word in text_lower for word in PRAISE_WORDS):
+        return "praise"
+    if any(word in text_lower for word in CORRECTIVE_WORDS):
+        return "corrective"
+    if any(word in text_lower for word in ENCOURAGING_WORDS):
+        return "encouraging"
+    return "neutral"
@@ -0,0 +1,338 @@
+"""
+Session Store - Server-side conversation sessions for Live Talk and chat
+Keeps append-only turns, running stats and a bounded context window
+so clients don't resend (and the model doesn't re-read) the full history
+"""
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from typing import List, Optional
+
+from config import settings
+from services import openai_service
+from services.shared_store import SharedStore, shared_store
+
+logger = logging.getLogger(__name__)
+
+# Token estimate for English text (no tokenizer dependency): ~4 characters per token
+CHARS_PER_TOKEN = 4
+# Per-message framing tokens (role, separators) added by the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate prompt tokens for one message's content"""
+    return len(text) // CHARS_PER_TOKEN + 1 + MESSAGE_OVERHEAD_TOKENS
+
+
+@dataclass
+class ConversationSession:
+    """One learner's conversation with a coach"""
+    session_id: str
+    user_id: str
+    coach_id: str = "ivy"
+    topic: Optional[str] = None
+    turns: List[dict] = field(default_factory=list)  # Append-only {"role", "content"} messages
+    turn_tokens: List[int] = field(default_factory=list)  # Estimated tokens per turn (parallel to turns)
+    summary: str = ""  # Rolling summary of the messages before summarized_upto
+    summarized_upto: int = 0
+    first_turn: int = 0  # Message index of turns[0]; earlier (summarized) turns were not kept
+    turn_count: int = 0  # User turns
+    word_count: int = 0  # Words spoken by the user
+    created_at: float = field(default_factory=time.time)
+    last_active: float = field(default_factory=time.time)
+    summarizing: bool = False
+    version: int = 0  # Shared-store version this copy was saved as / loaded from
+
+    def to_dict(self) -> dict:
+        """
+        Persistent fields (for the shared store)
+
+        Turns already folded into the summary are left out, so a save
+        costs the unsummarized tail rather than the whole history.
+        """
+        data = {f.name: getattr(self, f.name) for f in fields(self) if f.name not in ("summarizing", "version")}
+        dropped = self.summarized_upto - self.first_turn
+        data["turns"] = self.turns[dropped:]
+        data["turn_tokens"] = self.turn_tokens[dropped:]
+        data["first_turn"] = self.summarized_upto
+        return data
+
+    def add_message(self, role: str, content: str) -> None:
+        """Append one message and update running stats"""
+        self.turns.append({"role": role, "content": content})
+        self.turn_tokens.append(estimate_tokens(content))
+        if role == "user":
+            self.turn_count += 1
+            self.word_count += len(content.split())
+
+    def context_messages(self, start: int = 0) -> List[dict]:
+        """
+        Messages to send to the model: rolling summary + unsummarized turns
+
+        Pass the window start to drop turns that left the window but
+        are still waiting to be summarized (see needs_summary); without
+        it, every unsummarized turn is included.
+        """
+        messages = []
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": f"Summary of the earlier conversation: {self.summary}"
+            })
+        messages.extend(self.turns[max(start, self.summarized_upto) - self.first_turn:])
+        return messages
+
+    def messages_between(self, start: int, end: int) -> List[dict]:
+        """Turns with message indices start..end-1 (all at or after first_turn)"""
+        return self.turns[start - self.first_turn:end - self.first_turn]
+
+    def transcript(self) -> List[dict]:
+        """
+        The conversation for an end-of-session review: every turn, or if
+        summarized turns were dropped, the summary plus the turns since
+        """
+        if not self.first_turn:
+            return list(self.turns)
+        return self.context_messages(self.first_turn)
+
+    def window_start(self, window_messages: int, window_tokens: Optional[int] = None) -> int:
+        """
+        Index of the oldest turn inside the verbatim context window
+
+        The window holds at most window_messages turns and, with a token
+        budget, only as many of the newest turns as fit in window_tokens.
+        """
+        end = self.first_turn + len(self.turns)
+        start = max(self.summarized_upto, end - window_messages)
+        if window_tokens:
+            used = 0
+            for index in range(end - 1, start - 1, -1):
+                used += self.turn_tokens[index - self.first_turn]
+                if used > window_tokens:
+                    return index + 1
+        return start
+
+    def needs_summary(self, window_start: int, batch_messages: int) -> bool:
+        """Whether enough turns have left the window to be worth summarizing"""
+        overflow = window_start - self.summarized_upto
+        return overflow >= batch_messages and not self.summarizing
+
+
+class SessionStore:
+    """
+    In-memory session store with TTL and capacity eviction
+
+    Sessions are kept in last-activity order, so expired sessions are
+    always at the front and eviction is O(1) per session.
+
+    context_messages never exceeds the window (window_messages turns,
+    and with window_tokens set, that token budget): turns that left the
+    window are dropped from the prompt even before they are summarized.
+
+    With a shared store, sessions are also saved there on every change,
+    so any worker process can continue a session; the in-memory copy is
+    reused while its version matches the shared one. The store's SQLite
+    calls run in the thread pool, which is why get/create/touch/delete
+    are coroutines.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_sessions: int,
+        window_messages: int,
+        summary_batch_messages: int,
+        window_tokens: Optional[int] = None,
+        shared: Optional[SharedStore] = None,
+        namespace: str = "sessions"
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.window_messages = window_messages
+        self.summary_batch_messages = summary_batch_messages
+        self.window_tokens = window_tokens
+        self.shared = shared
+        self.namespace = namespace
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def create(
+        self,
+        user_id: str,
+        coach_id: str = "ivy",
+        topic: Optional[str] = None,
+        history: Optional[List[dict]] = None
+    ) -> ConversationSession:
+        """
+        Create a new session, optionally seeded from a client-side history
+
+        Args:
+            user_id: User identifier
+            coach_id: Coach persona (ivy or leo)
+            topic: Optional topic context
+            history: Legacy client history [{"role": "user", "content": "..."}]
+
+        Returns:
+            ConversationSession
+        """
+        self._evict(reserve=1)
+
+        session = ConversationSession(
+            session_id=uuid.uuid4().hex,
+            user_id=user_id,
+            coach_id=coach_id,
+            topic=topic
+        )
+        for message in history or []:
+            if message.get("role") in ("user", "assistant") and message.get("content"):
+                session.add_message(message["role"], message["content"])
+
+        self._sessions[session.session_id] = session
+        await self._save(session)
+        logger.info(f"Session created: {session.session_id} (user: {user_id}, seeded turns: {len(session.turns)})")
+        return session
+
+    async def get(self, session_id: Optional[str]) -> Optional[ConversationSession]:
+        """Return a live session and mark it active, or None if unknown/expired"""
+        self._evict()
+        if not session_id:
+            return None
+
+        session = self._sessions.get(session_id)
+        if self.shared:
+            session = await self._sync(session_id, session)
+        if session:
+            session.last_active = time.time()
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+        return session
+
+    async def touch(self, session: ConversationSession) -> None:
+        """
+        Mark a session active after a change (re-adding it if evicted)
+
+        Call after recording turns: this is what saves the session to
+        the shared store.
+        """
+        session.last_active = time.time()
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        await self._save(session)
+
+    async def _save(self, session: ConversationSession) -> None:
+        if self.shared:
+            session.version = await self.shared.aput(self.namespace, session.session_id, session.to_dict(), self.ttl_seconds)
+
+    async def _sync(self, session_id: str, local: Optional[ConversationSession]) -> Optional[ConversationSession]:
+        """The shared copy of a session, reusing the local one if it is current"""
+        version = await self.shared.aversion(self.namespace, session_id)
+        if version is None:
+            # Expired, or ended by another worker
+            self._sessions.pop(session_id, None)
+            return None
+        if local is not None and local.version == version:
+            return local
+
+        entry = await self.shared.aget(self.namespace, session_id)
+        if entry is None:
+            return None
+        data, version = entry
+        session = ConversationSession(**data)
+        session.version = version
+        if local is not None:
+            session.summarizing = local.summarizing
+        return session
+
+    def window_start(self, session: ConversationSession) -> int:
+        """Oldest turn of the session's verbatim context window"""
+        return session.window_start(self.window_messages, self.window_tokens)
+
+    def context_messages(self, session: ConversationSession) -> List[dict]:
+        """
+        Summary + the turns inside the context window
+
+        Always bounded by the window, whether or not older turns have
+        been summarized yet (e.g. while summarization keeps failing).
+        """
+        return session.context_messages(self.window_start(session))
+
+    async def delete(self, session_id: str) -> None:
+        """Drop a session (e.g. after the end-of-session summary)"""
+        self._sessions.pop(session_id, None)
+        if self.shared:
+            await self.shared.adelete(self.namespace, session_id)
+
+    def _evict(self, reserve: int = 0) -> None:
+        """Drop expired sessions, then the least recently active ones over capacity"""
+        cutoff = time.time() - self.ttl_seconds
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.last_active >= cutoff and len(self._sessions) + reserve <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+            logger.info(f"Session evicted: {oldest.session_id}")
+
+    async def compact(self, session: ConversationSession) -> None:
+        """
+        Fold turns that left the context window into the rolling summary
+
+        Safe to run as a background task; a failed summary just leaves
+        the turns in the context until the next attempt. The summary is
+        applied to the latest shared copy and also to the session passed
+        in, even when that copy was stale, so a later touch of it keeps
+        the summary.
+        """
+        upto = self.window_start(session)
+        if not session.needs_summary(upto, self.summary_batch_messages):
+            return
+
+        session.summarizing = True
+        try:
+            start = session.summarized_upto
+            summary = await openai_service.summarize_conversation(
+                previous_summary=session.summary,
+                messages=session.messages_between(start, upto)
+            )
+            # Another worker may have added turns meanwhile: apply to the latest copy
+            latest = await self._sync(session.session_id, session) if self.shared else session
+            if latest is None or latest.summarized_upto != start:
+                return
+            latest.summary = summary
+            latest.summarized_upto = upto
+            await self.touch(latest)
+            if latest is not session:
+                session.summary = summary
+                session.summarized_upto = upto
+            logger.info(f"Session {session.session_id} summarized up to message {upto}")
+        except Exception as e:
+            logger.error(f"Error summarizing session {session.session_id}: {e}")
+        finally:
+            session.summarizing = False
+
+
+# Global Live Talk session store
+live_talk_sessions = SessionStore(
+    ttl_seconds=settings.live_talk_session_ttl_seconds,
+    max_sessions=settings.live_talk_max_sessions,
+    window_messages=settings.live_talk_context_messages,
+    summary_batch_messages=settings.live_talk_summary_batch_messages,
+    window_tokens=settings.live_talk_context_tokens,
+    shared=shared_store,
+    namespace="live_talk_sessions"
+)
+
+# Global chat-teacher conversation store (token-budgeted window)
+chat_conversations = SessionStore(
+    ttl_seconds=settings.chat_conversation_ttl_seconds,
+    max_sessions=settings.chat_max_conversations,
+    window_messages=settings.chat_context_messages,
+    summary_batch_messages=settings.chat_summary_batch_messages,
+    window_tokens=settings.chat_context_tokens,
+    shared=shared_store,
+    namespace="chat_conversations"
+)
@@ -0,0 +1,133 @@
+"""
+Shared Store - SQLite key/value store shared by all worker processes
+Holds JSON state that must survive a request landing on another worker
+(conversation sessions, background job results), with per-entry TTLs.
+Only used when gunicorn runs several workers (see gunicorn.conf.py)
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Prune expired rows once every this many writes
+PRUNE_EVERY = 500
+
+# Set by gunicorn.conf.py, before the app is imported, when it runs more than one worker
+MULTI_WORKER_ENV = "TEACHERAI_MULTI_WORKER"
+
+
+class SharedStore:
+    """
+    Namespaced JSON values in one SQLite file (WAL mode)
+
+    Every process opens its own connection on first use, and reopens it
+    after a fork, so the store is safe to create before workers start.
+    Each value carries a version that increases on every put, so callers
+    can tell whether their in-memory copy is stale.
+
+    Async code must use the a-prefixed methods: they run the SQLite call
+    in the thread pool, so a write held up by another worker (up to the
+    busy timeout) never stalls the event loop.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None or self._pid != os.getpid():
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA busy_timeout=5000")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS shared_values ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "version INTEGER NOT NULL, expires_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS ix_shared_values_expires ON shared_values (expires_at)")
+            self._db, self._pid = db, os.getpid()
+        return self._db
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, int]]:
+        """(value, version) for a live entry, or None"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, version FROM shared_values WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time())
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def version(self, namespace: str, key: str) -> Optional[int]:
+        """Current version of a live entry without decoding it, or None"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT version FROM shared_values WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, namespace: str, key: str, value: Any, ttl_seconds: float) -> int:
+        """Store a JSON-serializable value; returns its new version"""
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            row = db.execute(
+                "INSERT INTO shared_values (namespace, key, value, version, expires_at) VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET "
+                "value = excluded.value, version = shared_values.version + 1, expires_at = excluded.expires_at "
+                "RETURNING version",
+                (namespace, key, json.dumps(value, ensure_ascii=False), now + ttl_seconds)
+            ).fetchone()
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                db.execute("DELETE FROM shared_values WHERE expires_at <= ?", (now,))
+        return row[0]
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._connection().execute(
+                "DELETE FROM shared_values WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+
+    async def aget(self, namespace: str, key: str) -> Optional[Tuple[Any, int]]:
+        return await run_in_threadpool(self.get, namespace, key)
+
+    async def aversion(self, namespace: str, key: str) -> Optional[int]:
+        return await run_in_threadpool(self.version, namespace, key)
+
+    async def aput(self, namespace: str, key: str, value: Any, ttl_seconds: float) -> int:
+        return await run_in_threadpool(self.put, namespace, key, value, ttl_seconds)
+
+    async def adelete(self, namespace: str, key: str) -> None:
+        await run_in_threadpool(self.delete, namespace, key)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = None
+
+
+# Global shared store, only when several gunicorn workers need it; a single
+# process (uvicorn --reload, one worker) keeps its state in memory
+shared_store = (
+    SharedStore(settings.shared_state_db_path)
+    if settings.shared_state_db_path and os.getenv(MULTI_WORKER_ENV)
+    else None
+)
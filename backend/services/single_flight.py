@@ -0,0 +1,65 @@
+"""
+Single-Flight - Deduplicate concurrent identical upstream calls
+Callers asking for the same key while a call is in flight share its result
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution
+
+    The shared call runs as its own task, so a caller that is cancelled
+    (e.g. the client disconnects) doesn't cancel it for the others.
+    Errors are propagated to every waiter; nothing is cached once the
+    call completes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() for this key, or join the call already in flight
+
+        Args:
+            key: Deduplication key (e.g. a cache hash)
+            fn: Zero-argument coroutine function performing the call
+
+        Returns:
+            The (shared) result of fn()
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+            logger.info(f"{self.name}: joined in-flight call {key}")
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Forget a completed call (and mark its error as retrieved if every waiter left)"""
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        """Executed vs. shared call counters"""
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "shared": self.shared
+        }
@@ -0,0 +1,94 @@
+"""
+SRS Scheduler - SM-2 spaced repetition for weak words and saved phrases
+Pure scheduling math; persistence and the due-date index live in progress_store
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+# SM-2 constants
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+FIRST_INTERVAL_DAYS = 1.0
+SECOND_INTERVAL_DAYS = 6.0
+
+# An item reviewed successfully at this interval or longer counts as mastered
+MASTERED_INTERVAL_DAYS = 21.0
+
+# Practice score (0-100) thresholds for SM-2 quality 5..1 (below the last one = 0)
+QUALITY_THRESHOLDS = [(95, 5), (85, 4), (70, 3), (50, 2), (25, 1)]
+
+
+@dataclass
+class ReviewState:
+    """Scheduling state of one item"""
+    ease: float = DEFAULT_EASE
+    interval_days: float = 0.0
+    repetitions: int = 0  # Successful reviews in a row
+    due_at: Optional[datetime] = None
+
+    @property
+    def status(self) -> str:
+        """weak (never recalled), learning or mastered"""
+        if self.repetitions == 0:
+            return "weak"
+        if self.interval_days >= MASTERED_INTERVAL_DAYS:
+            return "mastered"
+        return "learning"
+
+
+def score_to_quality(score: float) -> int:
+    """Map a 0-100 practice score to SM-2 quality (0-5; 3+ is a successful recall)"""
+    for threshold, quality in QUALITY_THRESHOLDS:
+        if score >= threshold:
+            return quality
+    return 0
+
+
+def review(state: ReviewState, score: float, now: Optional[datetime] = None) -> ReviewState:
+    """
+    Apply one review to a scheduling state (SM-2)
+
+    Args:
+        state: Current state
+        score: Practice score (0-100)
+        now: Review time (naive UTC; defaults to now)
+
+    Returns:
+        ReviewState: New state with the next due date
+    """
+    now = now or datetime.utcnow()
+    quality = score_to_quality(score)
+
+    if quality >= 3:
+        if state.repetitions == 0:
+            interval = FIRST_INTERVAL_DAYS
+        elif state.repetitions == 1:
+            interval = SECOND_INTERVAL_DAYS
+        else:
+            interval = round(state.interval_days * state.ease, 1)
+        repetitions = state.repetitions + 1
+    else:
+        # Lapse: start over, see it again tomorrow
+        interval = FIRST_INTERVAL_DAYS
+        repetitions = 0
+
+    ease = state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+
+    return ReviewState(
+        ease=max(MIN_EASE, round(ease, 3)),
+        interval_days=interval,
+        repetitions=repetitions,
+        due_at=now + timedelta(days=interval)
+    )
+
+
+def lapse(state: ReviewState, now: Optional[datetime] = None) -> ReviewState:
+    """A fresh mistake outside review (e.g. in a read-aloud): due again right away, ease kept"""
+    now = now or datetime.utcnow()
+    return ReviewState(
+        ease=state.ease,
+        interval_days=0.0,
+        repetitions=0,
+        due_at=now
+    )
@@ -0,0 +1,298 @@
+"""
+TTS Cache - Bounded, indexed cache of synthesized audio files
+LRU index over media/tts with byte/entry budgets, kept in a SQLite file
+next to the audio so every worker process shares one index and one set
+of budgets
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = ".index.db"
+LEGACY_INDEX_FILENAME = ".index.json"
+
+# PRAGMA user_version of the index. Version 1 dropped files adopted from
+# the old md5(text_voice) key scheme, which no lookup can ever hit
+INDEX_VERSION = 1
+
+# Recency only matters at eviction time, so a hit refreshes last_access
+# at most this often instead of writing on every lookup
+ACCESS_UPDATE_SECONDS = 60.0
+
+
+class TTSCache:
+    """
+    LRU cache of audio files keyed by (model, voice, format, text)
+
+    The index lives in SQLite (WAL mode); each process opens its own
+    connection, reopened after a fork. Least recently used files are
+    deleted when either budget is exceeded, in a write transaction so
+    concurrent workers never evict on stale totals. Hit/miss/eviction
+    counters are per process.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int,
+        max_entries: int,
+        audio_format: str = "mp3"
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.audio_format = audio_format
+        self._db: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ----- Keys & paths -----
+
+    def make_key(self, text: str, voice: str, model: str) -> str:
+        """Cache key covering every input that changes the audio"""
+        content = f"{model}|{voice}|{self.audio_format}|{text}"
+        return hashlib.md5(content.encode()).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """File path for a cache key"""
+        return self.directory / f"{key}.{self.audio_format}"
+
+    # ----- Lookup & insert -----
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """
+        Return the cached file path and mark it recently used, or None
+
+        A row whose file has gone missing (deleted outside the cache) is
+        dropped and counts as a miss, so the audio is synthesized again.
+        """
+        now = time.time()
+        path = self.path_for(key)
+        with self._lock:
+            db = self._connection()
+            row = db.execute("SELECT last_access FROM tts_entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if not path.exists():
+                db.execute("DELETE FROM tts_entries WHERE key = ?", (key,))
+                self.misses += 1
+                logger.warning(f"TTS cache file missing, dropped from index: {key}")
+                return None
+
+            if now - row[0] >= ACCESS_UPDATE_SECONDS:
+                db.execute("UPDATE tts_entries SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return path
+
+    def contains(self, key: str) -> bool:
+        """Check membership without touching LRU order or hit/miss counters"""
+        with self._lock:
+            row = self._connection().execute("SELECT 1 FROM tts_entries WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def add(self, key: str, text: str, voice: str, model: str) -> None:
+        """
+        Register a freshly written file and evict over budget
+
+        A file larger than max_bytes on its own is left unindexed (it is
+        still served this once) rather than evicting everything, itself
+        included.
+        """
+        size = self.path_for(key).stat().st_size
+        if size > self.max_bytes:
+            logger.warning(f"TTS file {key} ({size} bytes) exceeds the cache budget, not cached")
+            return
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO tts_entries (key, size, last_access, model, voice, text) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, size, time.time(), model, voice, text[:80])
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used files until within both budgets"""
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            count, total_bytes = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tts_entries").fetchone()
+            victims = []
+            if count > self.max_entries or total_bytes > self.max_bytes:
+                oldest = db.execute("SELECT key, size FROM tts_entries ORDER BY last_access")
+                for key, size in oldest:
+                    if count <= self.max_entries and total_bytes <= self.max_bytes:
+                        break
+                    victims.append((key, size))
+                    count -= 1
+                    total_bytes -= size
+                oldest.close()
+                db.executemany("DELETE FROM tts_entries WHERE key = ?", [(key,) for key, _ in victims])
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+        for key, size in victims:
+            self.evictions += 1
+            try:
+                self.path_for(key).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Failed to delete evicted TTS file {key}: {e}")
+            logger.info(f"TTS cache evicted: {key} ({size} bytes)")
+
+    # ----- Index persistence -----
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process's index connection, loading the index on first use"""
+        if self._db is None or self._pid != os.getpid():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.directory / INDEX_FILENAME, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA busy_timeout=5000")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS tts_entries ("
+                "key TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL, "
+                "model TEXT NOT NULL DEFAULT '', voice TEXT NOT NULL DEFAULT '', text TEXT NOT NULL DEFAULT '')"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS ix_tts_entries_last_access ON tts_entries (last_access)")
+            self._db, self._pid = db, os.getpid()
+            self._loaded = False
+        if not self._loaded:
+            self._loaded = True
+            self._reconcile()
+        return self._db
+
+    def load(self) -> None:
+        """
+        Open the index (once per process)
+
+        Reconciles it with the files on disk: rows for missing files are
+        dropped, untracked files are adopted using their mtime as last
+        access, files larger than max_bytes are deleted, and a legacy
+        JSON index is migrated. The first load of an older index deletes
+        files from the old key scheme instead of adopting them.
+        """
+        with self._lock:
+            self._connection()
+
+    def _reconcile(self) -> None:
+        db = self._db
+        legacy = self._read_legacy_index()
+        on_disk = {}
+        for path in self.directory.glob(f"*.{self.audio_format}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # Evicted by another worker mid-scan
+            on_disk[path.stem] = (stat.st_size, legacy.get(path.stem, {}).get("last_access", stat.st_mtime))
+
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            indexed = dict(db.execute("SELECT key, model FROM tts_entries").fetchall())
+            for key in indexed:
+                if key not in on_disk and not self.path_for(key).exists():
+                    db.execute("DELETE FROM tts_entries WHERE key = ?", (key,))
+
+            # Files that are never indexed: too big for the budget, and (on
+            # the first load of an older index) anything not written under
+            # the current key scheme. Indexed rows and legacy entries record
+            # their model; files adopted from before the key change did not.
+            doomed = {key for key, (size, _) in on_disk.items() if size > self.max_bytes}
+            migrating = db.execute("PRAGMA user_version").fetchone()[0] < INDEX_VERSION
+            if migrating:
+                current = {key for key, model in indexed.items() if model}
+                current |= {key for key, entry in legacy.items() if entry.get("model")}
+                doomed |= on_disk.keys() - current
+                db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            db.executemany("DELETE FROM tts_entries WHERE key = ?", [(key,) for key in doomed])
+
+            db.executemany(
+                "INSERT OR IGNORE INTO tts_entries (key, size, last_access, model, voice, text) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (key, size, last_access, legacy.get(key, {}).get("model", ""),
+                     legacy.get(key, {}).get("voice", ""), legacy.get(key, {}).get("text", ""))
+                    for key, (size, last_access) in on_disk.items() if key not in doomed
+                ]
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+        for key in doomed:
+            try:
+                self.path_for(key).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Failed to delete TTS file {key}: {e}")
+        if doomed:
+            logger.info(f"TTS cache deleted {len(doomed)} stale or oversized files")
+
+        if legacy:
+            (self.directory / LEGACY_INDEX_FILENAME).unlink(missing_ok=True)
+            logger.info(f"TTS cache migrated {len(legacy)} entries from {LEGACY_INDEX_FILENAME}")
+
+        count, total_bytes = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tts_entries").fetchone()
+        logger.info(f"TTS cache loaded: {count} files, {total_bytes} bytes")
+        self._evict()
+
+    def _read_legacy_index(self) -> dict:
+        """Entries from the JSON index used before the SQLite one, if present"""
+        index_path = self.directory / LEGACY_INDEX_FILENAME
+        if not index_path.exists():
+            return {}
+        try:
+            return json.loads(index_path.read_text())
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable legacy TTS cache index: {e}")
+            return {}
+
+    def close(self) -> None:
+        """Close this process's index connection"""
+        with self._lock:
+            if self._db is not None and self._pid == os.getpid():
+                self._db.close()
+            self._db = None
+
+    # ----- Stats -----
+
+    def stats(self) -> dict:
+        """Cache size (all workers) and this process's hit/miss counters"""
+        with self._lock:
+            entries, total_bytes = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM tts_entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+# Global TTS cache over media/tts
+tts_cache = TTSCache(
+    directory=Path(settings.tts_cache_dir),
+    max_bytes=settings.tts_cache_max_bytes,
+    max_entries=settings.tts_cache_max_entries
+)
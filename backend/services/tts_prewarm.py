@@ -0,0 +1,139 @@
+"""
+TTS Pre-warm - Batch-synthesize lesson audio into the TTS cache
+Walks the lesson corpus and fills the generate_speech cache for each
+coach voice, so the first learner of a lesson doesn't pay TTS latency.
+
+Usage (from backend/):
+    python -m services.tts_prewarm
+    python -m services.tts_prewarm --voices alloy,onyx --concurrency 4
+    python -m services.tts_prewarm --dry-run
+
+Resumable: items already in the cache are skipped, so an interrupted
+run can simply be started again.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Iterable, List
+
+from services import openai_service
+from services.tts_cache import tts_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LESSONS_PATH = (
+    Path(__file__).resolve().parents[2] / "frontend" / "src" / "sampleData" / "lessons_seed.json"
+)
+
+# English lesson voices per coach (mirrors VOICE_MAP in frontend/src/utils/ttsHelper.js)
+DEFAULT_VOICES = ["alloy", "onyx"]
+
+
+def collect_lesson_texts(lessons: List[dict]) -> List[str]:
+    """
+    Collect every spoken text in the lesson corpus (deduplicated, in order)
+
+    Covers step `text`, dialogue `lines[].text` and key phrases
+    (`english` and `example`).
+    """
+    texts = []
+
+    def add(text):
+        if isinstance(text, str) and text.strip():
+            texts.append(text.strip())
+
+    for lesson in lessons:
+        for step in lesson.get("steps", []):
+            add(step.get("text"))
+            for line in step.get("lines", []):
+                add(line.get("text"))
+            for phrase in step.get("key_phrases", []):
+                add(phrase.get("english"))
+                add(phrase.get("example"))
+
+    return list(dict.fromkeys(texts))
+
+
+async def prewarm(
+    texts: Iterable[str],
+    voices: List[str],
+    concurrency: int = 4,
+    dry_run: bool = False
+) -> dict:
+    """
+    Synthesize every (text, voice) pair that isn't cached yet
+
+    Args:
+        texts: Texts to synthesize
+        voices: TTS voices to synthesize each text with
+        concurrency: Max syntheses in flight
+        dry_run: Only report what would be synthesized
+
+    Returns:
+        dict: Counts of total, cached, synthesized and failed items
+    """
+    items = [(text, voice) for text in texts for voice in voices]
+    pending = [(t, v) for t, v in items if not openai_service.is_speech_cached(t, v)]
+    report = {
+        "total": len(items),
+        "cached": len(items) - len(pending),
+        "synthesized": 0,
+        "failed": 0
+    }
+    logger.info(f"Pre-warm: {report['total']} items, {report['cached']} already cached, {len(pending)} to synthesize")
+
+    if dry_run:
+        for text, voice in pending:
+            logger.info(f"Would synthesize [{voice}]: {text[:60]}")
+        return report
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def synthesize(text: str, voice: str):
+        async with slots:
+            try:
+                await openai_service.generate_speech(text=text, voice=voice)
+                report["synthesized"] += 1
+            except Exception as e:
+                report["failed"] += 1
+                logger.error(f"Pre-warm failed [{voice}] '{text[:60]}': {e}")
+
+            done = report["synthesized"] + report["failed"]
+            if done % 10 == 0 or done == len(pending):
+                logger.info(f"Pre-warm progress: {done}/{len(pending)}")
+
+    await asyncio.gather(*(synthesize(text, voice) for text, voice in pending))
+    return report
+
+
+async def _main(args: argparse.Namespace) -> int:
+    lessons = json.loads(Path(args.lessons).read_text(encoding="utf-8"))["lessons"]
+    texts = collect_lesson_texts(lessons)
+    voices = [v.strip() for v in args.voices.split(",") if v.strip()]
+
+    try:
+        report = await prewarm(texts, voices, concurrency=args.concurrency, dry_run=args.dry_run)
+    finally:
+        tts_cache.close()
+        await openai_service.close_client()
+
+    logger.info(f"Pre-warm finished: {report} | cache: {tts_cache.stats()}")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    parser = argparse.ArgumentParser(description="Pre-synthesize lesson audio into the TTS cache")
+    parser.add_argument("--lessons", default=str(DEFAULT_LESSONS_PATH), help="Path to lessons_seed.json")
+    parser.add_argument("--voices", default=",".join(DEFAULT_VOICES), help="Comma-separated TTS voices")
+    parser.add_argument("--concurrency", type=int, default=4, help="Max syntheses in flight")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what is missing from the cache")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,297 @@
+"""
+Upstream - Resilient calls to the OpenAI API
+Per-operation timeouts, jittered retries for idempotent calls (TTS and
+STT; chat is never retried), a circuit breaker per operation so a
+brown-out fails fast, and hedged requests
+"""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import openai
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upstream errors worth another attempt (everything else, e.g. a 400, is final)
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    openai.APIConnectionError,  # Includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError
+)
+
+
+class CircuitOpenError(Exception):
+    """The operation's circuit breaker is open; no upstream call was made"""
+
+    def __init__(self, operation: str, retry_after: float):
+        super().__init__(f"Upstream '{operation}' unavailable (circuit open, retry in {retry_after:.0f}s)")
+        self.operation = operation
+        self.retry_after = retry_after
+
+
+@dataclass
+class CallPolicy:
+    """How one kind of upstream call is made"""
+    timeout: float  # Per-attempt deadline (seconds)
+    retries: int = 0  # Extra attempts after a retryable failure
+    hedge_after: Optional[float] = None  # Start a second attempt if the first is this slow
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    closed: calls go through. After failure_threshold consecutive failed
+    calls it opens and rejects calls for reset_seconds; then it is
+    half-open and lets one trial call through, which closes it again on
+    success or re-opens it on failure.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go upstream now"""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            logger.info(f"Circuit '{self.name}' half-open, sending trial call")
+            return
+
+        self.rejected += 1
+        retry_after = max(self.reset_seconds - (time.monotonic() - self.opened_at), 0)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info(f"Circuit '{self.name}' closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            if self.state == "closed" or self._trial_in_flight:
+                logger.warning(f"Circuit '{self.name}' opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give up a half-open trial that ended without an upstream verdict"""
+        self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected
+        }
+
+
+class Upstream:
+    """
+    Runs upstream calls under a shared concurrency limit with per-operation
+    breakers, timeouts, retries (jittered exponential backoff) and hedging
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        failure_threshold: int,
+        reset_seconds: float,
+        retry_base_seconds: float,
+        retry_max_seconds: float
+    ):
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.retries = 0
+        self.hedges = 0
+
+    def breaker(self, operation: str) -> CircuitBreaker:
+        """The circuit breaker for an operation (created on first use)"""
+        breaker = self._breakers.get(operation)
+        if breaker is None:
+            breaker = CircuitBreaker(operation, self.failure_threshold, self.reset_seconds)
+            self._breakers[operation] = breaker
+        return breaker
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (1-based)"""
+        ceiling = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    async def call(
+        self,
+        operation: str,
+        fn: Callable[[], Awaitable[T]],
+        policy: CallPolicy,
+        hold_slot: bool = True,
+        discard: Optional[Callable[[T], None]] = None
+    ) -> T:
+        """
+        Call upstream with the operation's breaker, deadline and retry policy
+
+        Args:
+            operation: Breaker / stats name (e.g. "chat", "tts", "stt")
+            fn: Zero-argument coroutine function making one attempt
+            policy: Timeout, retries and hedging for this call
+            hold_slot: Take a concurrency slot per attempt (False if the
+                       caller already holds upstream.slots, e.g. for a stream)
+            discard: Releases the result of a hedged attempt that succeeded
+                     but lost (e.g. deletes its temp file)
+
+        Returns:
+            The first successful attempt's result
+
+        Raises:
+            CircuitOpenError: If the breaker is open (fails fast)
+            Exception: The last upstream error once retries are exhausted
+        """
+        breaker = self.breaker(operation)
+        breaker.before_call()
+
+        attempt = 0
+        try:
+            while True:
+                try:
+                    if policy.hedge_after:
+                        result = await self._hedged(operation, fn, policy, hold_slot, discard)
+                    else:
+                        result = await self._attempt(fn, policy.timeout, hold_slot)
+                    breaker.record_success()
+                    return result
+
+                except RETRYABLE_ERRORS as e:
+                    attempt += 1
+                    if attempt > policy.retries:
+                        breaker.record_failure()
+                        logger.error(f"Upstream '{operation}' failed after {attempt} attempt(s): {type(e).__name__}: {e}")
+                        raise
+                    delay = self.backoff(attempt)
+                    self.retries += 1
+                    logger.warning(f"Upstream '{operation}' attempt {attempt} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+
+        except BaseException:
+            # Caller errors (4xx) and cancellation say nothing about upstream health
+            breaker.release_trial()
+            raise
+
+    async def _attempt(self, fn: Callable[[], Awaitable[T]], timeout: float, hold_slot: bool) -> T:
+        if not hold_slot:
+            return await asyncio.wait_for(fn(), timeout=timeout)
+        async with self.slots:
+            return await asyncio.wait_for(fn(), timeout=timeout)
+
+    async def _hedged(
+        self,
+        operation: str,
+        fn: Callable[[], Awaitable[T]],
+        policy: CallPolicy,
+        hold_slot: bool,
+        discard: Optional[Callable[[T], None]]
+    ) -> T:
+        """
+        Run one attempt, adding a second if the first is still pending
+        after policy.hedge_after; the first success wins, the other is
+        cancelled. Fails only if every started attempt fails.
+
+        A losing attempt that still succeeds (both finish together, or it
+        completes before its cancellation lands) is passed to discard.
+        """
+        first = asyncio.ensure_future(self._attempt(fn, policy.timeout, hold_slot))
+        done, _ = await asyncio.wait({first}, timeout=policy.hedge_after)
+        if done:
+            return first.result()
+
+        self.hedges += 1
+        logger.info(f"Upstream '{operation}' slower than {policy.hedge_after}s, sending hedged request")
+        pending = {first, asyncio.ensure_future(self._attempt(fn, policy.timeout, hold_slot))}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if winners:
+                    for loser in winners[1:]:
+                        self._discard(operation, loser, discard)
+                    return winners[0].result()
+                error = next(iter(done)).exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(lambda t: self._discard(operation, t, discard))
+
+    @staticmethod
+    def _discard(operation: str, task: asyncio.Task, discard: Optional[Callable[[Any], None]]) -> None:
+        """Release a losing attempt's result, if it produced one"""
+        if task.cancelled() or task.exception() is not None or discard is None:
+            return
+        try:
+            discard(task.result())
+        except Exception as e:
+            logger.warning(f"Upstream '{operation}': could not discard a losing hedged result: {e}")
+
+    def stats(self) -> dict:
+        """Breaker states plus retry and hedge counters"""
+        return {
+            "breakers": {name: breaker.stats() for name, breaker in self._breakers.items()},
+            "retries": self.retries,
+            "hedges": self.hedges
+        }
+
+
+# Per-operation call policies. Chat completions are not idempotent (a
+# retried one can be billed twice), so they are never retried
+CHAT_POLICY = CallPolicy(
+    timeout=settings.upstream_chat_timeout_seconds,
+    retries=0
+)
+TTS_POLICY = CallPolicy(
+    timeout=settings.upstream_tts_timeout_seconds,
+    retries=settings.upstream_max_retries,
+    hedge_after=settings.tts_hedge_after_seconds or None
+)
+STT_POLICY = CallPolicy(
+    timeout=settings.upstream_stt_timeout_seconds,
+    retries=settings.upstream_max_retries
+)
+
+# Global upstream layer (one per worker, shared by every OpenAI call)
+upstream = Upstream(
+    max_concurrency=settings.openai_max_concurrency,
+    failure_threshold=settings.upstream_breaker_failure_threshold,
+    reset_seconds=settings.upstream_breaker_reset_seconds,
+    retry_base_seconds=settings.upstream_retry_base_seconds,
+    retry_max_seconds=settings.upstream_retry_max_seconds
+)
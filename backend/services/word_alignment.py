@@ -0,0 +1,274 @@
+"""
+Word Alignment - Minimum-edit (Levenshtein) word alignment with a batch API
+Single pairs and small batches use a bit-parallel DP over Python ints;
+large batches fill the DP tables of many pairs at once with NumPy
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Upper bound on DP cells (batch x rows x cols) evaluated in one NumPy pass
+MAX_CELLS_PER_CHUNK = 4_000_000
+
+# The NumPy path only beats the bit-parallel one on large batches of short
+# sentences (its per-row overhead is spread over many pairs, but its
+# O(rows x cols) work loses to O(cols) big-int steps on long passages);
+# see benchmarks/accuracy_benchmark.py
+MIN_NUMPY_BATCH = 256
+MAX_NUMPY_WORDS = 32
+
+# Padding IDs: never equal to a real word or to each other
+_PAD_EXPECTED = -1
+_PAD_SPOKEN = -2
+
+
+class Vocabulary:
+    """Interns words to small integer IDs so the DP compares ints, not strings"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def ids(self, words: Sequence[str]) -> List[int]:
+        """Map words to IDs, assigning new IDs on first sight"""
+        table = self._ids
+        return [table.setdefault(word, len(table)) for word in words]
+
+
+@dataclass(slots=True)
+class WordOp:
+    """One step of an alignment"""
+    op: str  # equal | substitute | delete | insert
+    expected: Optional[str] = None
+    spoken: Optional[str] = None
+
+
+@dataclass
+class AlignmentResult:
+    """Edit counts and per-word alignment for one (expected, spoken) pair"""
+    matches: int = 0
+    substitutions: int = 0
+    deletions: int = 0
+    insertions: int = 0
+    ops: List[WordOp] = field(default_factory=list)
+
+    @property
+    def errors(self) -> int:
+        """Total edit distance (S + D + I)"""
+        return self.substitutions + self.deletions + self.insertions
+
+
+def align(expected_words: Sequence[str], spoken_words: Sequence[str]) -> AlignmentResult:
+    """
+    Minimum-edit word alignment for one (expected, spoken) pair
+
+    Uses the bit-parallel Levenshtein DP (Myers / Hyyrö): each column of
+    the table is two bit vectors of vertical deltas, updated with a few
+    big-int operations, so a pair costs O(len(spoken)) int operations
+    instead of O(len(expected) x len(spoken)) Python steps.
+    """
+    vp_columns, vn_columns = _delta_vectors(expected_words, spoken_words)
+    return _backtrace_bits(vp_columns, vn_columns, expected_words, spoken_words)
+
+
+def align_batch(
+    pairs: Sequence[Tuple[Sequence[str], Sequence[str]]],
+    vocabulary: Optional[Vocabulary] = None
+) -> List[AlignmentResult]:
+    """
+    Minimum-edit word alignment for many (expected, spoken) pairs
+
+    Batches of at least MIN_NUMPY_BATCH pairs, all of at most
+    MAX_NUMPY_WORDS expected words, are sorted by length and packed into
+    chunks so one NumPy pass fills the DP rows of every pair in the chunk
+    at once; anything else is aligned pair by pair with align(). Both
+    paths return the same alignments.
+
+    Args:
+        pairs: Sequence of (expected_words, spoken_words)
+        vocabulary: Word interning table (a fresh one is used if omitted)
+
+    Returns:
+        List of AlignmentResult, in input order
+    """
+    if len(pairs) < MIN_NUMPY_BATCH or any(len(e) > MAX_NUMPY_WORDS for e, _ in pairs):
+        return [align(expected, spoken) for expected, spoken in pairs]
+    return _align_numpy(pairs, vocabulary)
+
+
+def _align_numpy(pairs, vocabulary: Optional[Vocabulary] = None) -> List[AlignmentResult]:
+    """align_batch over NumPy DP tables, regardless of batch size"""
+    vocabulary = vocabulary or Vocabulary()
+    encoded = [(vocabulary.ids(e), vocabulary.ids(s)) for e, s in pairs]
+    results: List[Optional[AlignmentResult]] = [None] * len(pairs)
+
+    order = sorted(range(len(pairs)), key=lambda k: (len(encoded[k][0]), len(encoded[k][1])))
+    chunk: List[int] = []
+    chunk_cols = 0
+    for k in order:
+        rows = len(encoded[k][0]) + 1
+        cols = max(chunk_cols, len(encoded[k][1]) + 1)
+        if chunk and (len(chunk) + 1) * rows * cols > MAX_CELLS_PER_CHUNK:
+            _align_chunk(chunk, pairs, encoded, results)
+            chunk, cols = [], len(encoded[k][1]) + 1
+        chunk.append(k)
+        chunk_cols = cols
+    if chunk:
+        _align_chunk(chunk, pairs, encoded, results)
+
+    return results
+
+
+def _align_chunk(chunk, pairs, encoded, results) -> None:
+    """Fill DP tables for a chunk of pairs and backtrace each one"""
+    n_max = max(len(encoded[k][0]) for k in chunk)
+    m_max = max(len(encoded[k][1]) for k in chunk)
+    batch = len(chunk)
+
+    expected = np.full((batch, n_max), _PAD_EXPECTED, dtype=np.int32)
+    spoken = np.full((batch, m_max), _PAD_SPOKEN, dtype=np.int32)
+    for row, k in enumerate(chunk):
+        e, s = encoded[k]
+        expected[row, :len(e)] = e
+        spoken[row, :len(s)] = s
+
+    dist = np.empty((batch, n_max + 1, m_max + 1), dtype=np.int32)
+    cols = np.arange(m_max + 1, dtype=np.int32)
+    dist[:, 0, :] = cols
+
+    row = np.empty((batch, m_max + 1), dtype=np.int32)
+    for i in range(1, n_max + 1):
+        prev = dist[:, i - 1, :]
+        # Substitution/match (diagonal) and deletion (from above)
+        row[:, 0] = i
+        np.minimum(
+            prev[:, :-1] + (expected[:, i - 1:i] != spoken),
+            prev[:, 1:] + 1,
+            out=row[:, 1:]
+        )
+        # Insertion (from the left): D[i][j] = min_k<=j (row[k] + j - k)
+        row -= cols
+        np.minimum.accumulate(row, axis=1, out=dist[:, i, :])
+        dist[:, i, :] += cols
+
+    for b, k in enumerate(chunk):
+        results[k] = _backtrace(dist[b].item, encoded[k], pairs[k])
+
+
+def _backtrace(cell, encoded, words) -> AlignmentResult:
+    """Recover one minimum-edit alignment from a filled DP table (cell(i, j) -> distance)"""
+    e_ids, s_ids = encoded
+    e_words, s_words = words
+    i, j = len(e_ids), len(s_ids)
+    result = AlignmentResult()
+    ops: List[WordOp] = []
+
+    # Only the n + m cells on the path are read, so the table is never copied out
+    while i > 0 or j > 0:
+        current = cell(i, j)
+        diagonal = cell(i - 1, j - 1) if i > 0 and j > 0 else None
+        if diagonal is not None and e_ids[i - 1] == s_ids[j - 1] and current == diagonal:
+            ops.append(WordOp("equal", e_words[i - 1], s_words[j - 1]))
+            result.matches += 1
+            i, j = i - 1, j - 1
+        elif diagonal is not None and current == diagonal + 1:
+            ops.append(WordOp("substitute", e_words[i - 1], s_words[j - 1]))
+            result.substitutions += 1
+            i, j = i - 1, j - 1
+        elif i > 0 and current == cell(i - 1, j) + 1:
+            ops.append(WordOp("delete", e_words[i - 1], None))
+            result.deletions += 1
+            i -= 1
+        else:
+            ops.append(WordOp("insert", None, s_words[j - 1]))
+            result.insertions += 1
+            j -= 1
+
+    ops.reverse()
+    result.ops = ops
+    return result
+
+
+def _delta_vectors(expected: Sequence[str], spoken: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """
+    Vertical delta bit vectors of every DP column (bit-parallel Levenshtein)
+
+    Bit i-1 of vp_columns[j] / vn_columns[j] is set when
+    D[i][j] - D[i-1][j] is +1 / -1, so D[i][j] = j + popcount(vp & low i
+    bits) - popcount(vn & low i bits).
+    """
+    full = (1 << len(expected)) - 1
+    positions: Dict[str, int] = {}
+    for i, word in enumerate(expected):
+        positions[word] = positions.get(word, 0) | (1 << i)
+
+    vp, vn = full, 0  # Column 0: D[i][0] = i
+    vp_columns, vn_columns = [vp], [vn]
+    for word in spoken:
+        eq = positions.get(word, 0)
+        xv = eq | vn
+        xh = ((((eq & vp) + vp) & full) ^ vp) | eq
+        hp = vn | (full & ~(xh | vp))
+        hn = vp & xh
+        # Row 0 is D[0][j] = j: every horizontal delta entering the column is +1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (full & ~(xv | hp))
+        vn = hp & xv
+        vp_columns.append(vp)
+        vn_columns.append(vn)
+    return vp_columns, vn_columns
+
+
+def _backtrace_bits(vp_columns, vn_columns, e_words, s_words) -> AlignmentResult:
+    """_backtrace over delta bit vectors (same tie-breaking, one popcount pair per step)"""
+    i, j = len(e_words), len(s_words)
+    current = j + vp_columns[j].bit_count() - vn_columns[j].bit_count()
+    result = AlignmentResult()
+    ops: List[WordOp] = []
+
+    while i > 0 and j > 0:
+        low = (1 << (i - 1)) - 1
+        diagonal = (j - 1) + (vp_columns[j - 1] & low).bit_count() - (vn_columns[j - 1] & low).bit_count()
+        if current == diagonal and e_words[i - 1] == s_words[j - 1]:
+            ops.append(WordOp("equal", e_words[i - 1], s_words[j - 1]))
+            result.matches += 1
+            i, j = i - 1, j - 1
+            current = diagonal
+            continue
+        if current == diagonal + 1:
+            ops.append(WordOp("substitute", e_words[i - 1], s_words[j - 1]))
+            result.substitutions += 1
+            i, j = i - 1, j - 1
+            current = diagonal
+            continue
+
+        bit = 1 << (i - 1)
+        up = current - 1 if vp_columns[j] & bit else current + 1 if vn_columns[j] & bit else current
+        if current == up + 1:
+            ops.append(WordOp("delete", e_words[i - 1], None))
+            result.deletions += 1
+            i -= 1
+            current = up
+        else:
+            ops.append(WordOp("insert", None, s_words[j - 1]))
+            result.insertions += 1
+            j -= 1
+            current -= 1  # D[i][j-1] = D[i][j] - 1 on an insertion step
+
+    # Past the first row or column only deletions / insertions remain
+    while i > 0:
+        ops.append(WordOp("delete", e_words[i - 1], None))
+        result.deletions += 1
+        i -= 1
+    while j > 0:
+        ops.append(WordOp("insert", None, s_words[j - 1]))
+        result.insertions += 1
+        j -= 1
+
+    ops.reverse()
+    result.ops = ops
+    return result
@@ -0,0 +1,97 @@
+"""
+Test Fixtures - Isolated settings and an in-process fake OpenAI server
+Settings are read when the app modules are first imported, so the
+environment is pointed at throwaway paths and the fake server here,
+before any test module imports them.
+"""
+import os
+import socket
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+
+import pytest
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+FAKE_PORT = _free_port()
+FAKE_BASE_URL = f"http://127.0.0.1:{FAKE_PORT}/v1"
+_TMP_DIR = tempfile.mkdtemp(prefix="teacherai-tests-")
+
+os.environ.update({
+    "OPENAI_API_KEY": "test",
+    "OPENAI_BASE_URL": FAKE_BASE_URL,
+    "TTS_CACHE_DIR": os.path.join(_TMP_DIR, "tts"),
+    "DATABASE_URL": f"sqlite:///{os.path.join(_TMP_DIR, 'teacherai.db')}",
+    "FEEDBACK_CACHE_DB_PATH": os.path.join(_TMP_DIR, "feedback_cache.db"),
+    "SHARED_STATE_DB_PATH": os.path.join(_TMP_DIR, "shared_state.db")
+})
+# Single-process mode, as under uvicorn: the shared store stays off
+os.environ.pop("TEACHERAI_MULTI_WORKER", None)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def fake_server():
+    """benchmarks.fake_openai served on a background thread; yields its /v1 base URL"""
+    import uvicorn
+
+    from benchmarks import fake_openai
+
+    server = uvicorn.Server(uvicorn.Config(fake_openai.app, host="127.0.0.1", port=FAKE_PORT, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("Fake OpenAI server did not start")
+        time.sleep(0.01)
+
+    yield FAKE_BASE_URL
+
+    server.should_exit = True
+    thread.join(timeout=10)
+
+
+@pytest.fixture
+def fake(fake_server):
+    """
+    The fake server module, reset to fast, fault-free defaults
+
+    Tests inject faults by setting fake.config fields (error_next,
+    hang_next, error_rate, ...) and read request counts from fake.stats.
+    """
+    from benchmarks import fake_openai
+
+    defaults = fake_openai.FakeConfig(
+        chat_latency_ms=5.0,
+        tts_latency_ms=5.0,
+        stt_latency_ms=5.0,
+        latency_sigma=0.0,
+        token_ms=0.0,
+        hang_seconds=3.0
+    )
+    for name, value in asdict(defaults).items():
+        setattr(fake_openai.config, name, value)
+    fake_openai.stats.clear()
+    return fake_openai
+
+
+@pytest.fixture
+async def openai_client(fake_server):
+    """An AsyncOpenAI client for the fake server with SDK retries off (Upstream retries)"""
+    from openai import AsyncOpenAI
+
+    client = AsyncOpenAI(api_key="test", base_url=fake_server, max_retries=0)
+    yield client
+    await client.close()
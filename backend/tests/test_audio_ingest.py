@@ -0,0 +1,91 @@
+"""
+Tests for services.audio_ingest - upload size cap enforced before the
+multipart body is parsed, and format sniffing
+"""
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from services.audio_ingest import UploadLimitMiddleware, sniff_audio_format
+
+LIMIT = 1024
+BOUNDARY = "testboundary"
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, max_body_bytes=LIMIT)
+    app.state.handled = 0
+
+    @app.post("/upload")
+    async def upload(audio: UploadFile = File(...)):
+        app.state.handled += 1
+        return {"size": len(await audio.read())}
+
+    @app.post("/json")
+    async def json_body(body: dict):
+        return {"keys": len(body)}
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def multipart_body(size: int) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="audio"; filename="a.wav"\r\n'
+        "Content-Type: audio/wav\r\n\r\n"
+    ).encode() + b"\0" * size + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def test_upload_within_limit_is_accepted(client):
+    response = client.post("/upload", files={"audio": ("a.wav", b"\0" * 100, "audio/wav")})
+
+    assert response.status_code == 200
+    assert response.json() == {"size": 100}
+
+
+def test_declared_oversized_upload_is_rejected_before_parsing(client):
+    response = client.post("/upload", files={"audio": ("a.wav", b"\0" * (LIMIT * 4), "audio/wav")})
+
+    assert response.status_code == 413
+    assert client.app.state.handled == 0
+
+
+def test_undeclared_oversized_upload_is_cut_off(client):
+    body = multipart_body(LIMIT * 4)
+
+    def chunks():
+        for start in range(0, len(body), 256):
+            yield body[start:start + 256]
+
+    # A generator body is sent chunked, without Content-Length
+    response = client.post(
+        "/upload",
+        content=chunks(),
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+    )
+
+    assert response.status_code == 413
+    assert client.app.state.handled == 0
+
+
+def test_non_multipart_requests_are_not_limited(client):
+    response = client.post("/json", json={f"k{i}": "x" * 50 for i in range(50)})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("header, expected", [
+    (b"\x1a\x45\xdf\xa3\x01\x00\x00\x00\x00\x00\x00\x1f", "webm"),
+    (b"OggS\x00\x02\x00\x00\x00\x00\x00\x00", "ogg"),
+    (b"RIFF\x24\x08\x00\x00WAVE", "wav"),
+    (b"ID3\x04\x00\x00\x00\x00\x00\x00\x00\x00", "mp3"),
+    (b"\xff\xfb\x90\x00\x00\x00\x00\x00\x00\x00\x00\x00", "mp3"),
+    (b"\x00\x00\x00\x20ftypM4A ", "m4a"),
+    (b"fLaC\x00\x00\x00\x22\x00\x00\x00\x00", "flac"),
+    (b"<html><body>", None)
+])
+def test_sniff_audio_format(header, expected):
+    assert sniff_audio_format(header) == expected
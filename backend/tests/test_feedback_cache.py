@@ -0,0 +1,125 @@
+"""
+Tests for services.feedback_cache - memory and disk tiers, TTL expiry
+and the stats endpoint
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services import feedback_cache as feedback_cache_module
+from services.feedback_cache import FeedbackCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the cache module"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(feedback_cache_module.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "feedback.db")
+
+
+def make_cache(db_path=None, ttl_seconds=60, max_entries=10) -> FeedbackCache:
+    return FeedbackCache("test", ttl_seconds=ttl_seconds, max_entries=max_entries, db_path=db_path)
+
+
+async def test_memory_hit_then_miss(db_path):
+    cache = make_cache(db_path)
+
+    await cache.aset("k", "Nice work!")
+
+    assert await cache.aget("k") == "Nice work!"
+    assert await cache.aget("other") is None
+    assert (cache.memory_hits, cache.disk_hits, cache.misses) == (1, 0, 1)
+    cache.close()
+
+
+async def test_disk_hit_is_promoted_to_memory(db_path):
+    writer = make_cache(db_path)
+    await writer.aset("k", "Nice work!")
+    writer.close()
+
+    # A restarted (or other) worker: empty memory tier, same disk tier
+    reader = make_cache(db_path)
+    assert await reader.aget("k") == "Nice work!"
+    assert await reader.aget("k") == "Nice work!"
+
+    assert (reader.memory_hits, reader.disk_hits, reader.misses) == (1, 1, 0)
+    reader.close()
+
+
+async def test_memory_only_cache_without_disk_tier():
+    cache = make_cache()
+
+    await cache.aset("k", "Nice work!")
+
+    assert await cache.aget("k") == "Nice work!"
+    assert await cache.aget("missing") is None
+    assert (await cache.astats())["disk_enabled"] is False
+
+
+async def test_entries_expire_in_both_tiers(db_path, clock):
+    cache = make_cache(db_path, ttl_seconds=60)
+    await cache.aset("k", "Nice work!")
+
+    clock[0] += 59
+    assert await cache.aget("k") == "Nice work!"
+
+    clock[0] += 2
+    assert await cache.aget("k") is None
+    assert await make_cache(db_path).aget("k") is None
+    assert cache.misses == 1
+    cache.close()
+
+
+async def test_memory_tier_evicts_least_recently_used(db_path):
+    cache = make_cache(db_path, max_entries=2)
+    await cache.aset("a", "A")
+    await cache.aset("b", "B")
+    await cache.aget("a")
+    await cache.aset("c", "C")
+
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.evictions == 1
+    # Still served, from disk
+    assert await cache.aget("b") == "B"
+    assert cache.disk_hits == 1
+    cache.close()
+
+
+def test_sync_api_matches_async(db_path):
+    cache = make_cache(db_path)
+    cache.set("k", "Nice work!")
+
+    assert cache.get("k") == "Nice work!"
+    assert make_cache(db_path).get("k") == "Nice work!"
+    assert cache.stats()["disk_entries"] == 1
+    cache.close()
+
+
+def test_stats_endpoint(db_path, monkeypatch):
+    from routers import lesson
+
+    cache = make_cache(db_path)
+    cache.set("k", "Nice work!")
+    cache.get("k")
+    cache.get("missing")
+    monkeypatch.setattr(lesson, "exercise_feedback_cache", cache)
+    app = FastAPI()
+    app.include_router(lesson.router)
+
+    with TestClient(app) as client:
+        stats = client.get("/api/lesson/feedback-cache-stats").json()
+
+    assert stats["disk_enabled"] is True
+    assert stats["disk_entries"] == 1
+    assert stats["memory_entries"] == 1
+    assert (stats["memory_hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+    cache.close()
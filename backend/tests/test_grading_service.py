@@ -0,0 +1,43 @@
+"""
+Tests for services.grading_service - partial credit, including answers
+with more or fewer items than expected
+"""
+import pytest
+
+from services.grading_service import grade
+
+
+@pytest.mark.parametrize("exercise_type, user, expected, score", [
+    ("reorder", ["I", "go", "home"], ["I", "go", "home"], 100.0),
+    ("reorder", ["go", "I", "home"], ["I", "go", "home"], 66.7),
+    ("reorder", ["I", "go", "home", "now"], ["I", "go", "home"], 75.0),
+    ("reorder", ["I", "go", "home", "go", "home"], ["I", "go", "home"], 60.0),
+    ("reorder", ["I", "go"], ["I", "go", "home"], 66.7),
+    ("reorder", [], ["I", "go", "home"], 0.0),
+    ("fill_blank", ["am", "is"], ["am", "is"], 100.0),
+    ("fill_blank", ["am", "are"], ["am", "is"], 50.0),
+    ("fill_blank", ["am", "is", "are"], ["am", "is"], 66.7),
+    ("fill_blank", ["am"], ["am", "is"], 50.0),
+    ("multiple_choice", ["B"], ["b"], 100.0),
+    ("multiple_choice", ["B", "C"], ["B"], 0.0)
+])
+def test_partial_credit(exercise_type, user, expected, score):
+    result = grade(exercise_type, user, expected)
+
+    assert result.score == score
+    assert result.is_correct == (score == 100.0)
+
+
+@pytest.mark.parametrize("exercise_type", ["reorder", "fill_blank"])
+def test_extra_items_are_not_full_marks(exercise_type):
+    result = grade(exercise_type, ["I", "go", "home", "now"], ["I", "go", "home"])
+
+    assert not result.is_correct
+    assert result.emotion_tag == "encouraging"
+
+
+def test_answers_are_normalized():
+    result = grade("fill_blank", ["  Am!", "IS "], ["am", "is."])
+
+    assert result.is_correct
+    assert result.emotion_tag == "praise"
@@ -0,0 +1,89 @@
+"""
+Tests for the pure-Python hot paths - behaviour of reply parsing and text
+normalization, and the benchmarks.hot_paths_benchmark regression budgets
+
+Set HOT_PATHS_THRESHOLD_SCALE to loosen the budgets on slow machines
+(e.g. 2 doubles every threshold).
+"""
+import json
+import logging
+import os
+
+import pytest
+
+from benchmarks.accuracy_benchmark import DEFAULT_LESSONS_PATH, lesson_sentences
+from benchmarks.hot_paths_benchmark import THRESHOLDS_US, build_cases, time_case
+from services.accuracy_service import normalize_text, remove_filler_words
+from services.reply_parsing import analyze_emotion, extract_json_object
+
+THRESHOLD_SCALE = float(os.getenv("HOT_PATHS_THRESHOLD_SCALE", "1"))
+
+FEEDBACK = {"feedback_en": "Nice reading!", "feedback_vi": "Đọc tốt lắm!"}
+
+
+@pytest.mark.parametrize("reply", [
+    json.dumps(FEEDBACK, ensure_ascii=False),
+    f"  {json.dumps(FEEDBACK)}\n",
+    f"```json\n{json.dumps(FEEDBACK)}\n```",
+    f"Here you go:\n```\n{json.dumps(FEEDBACK)}\n```\nGood luck!",
+    f"Sure! {json.dumps(FEEDBACK)} Hope that helps."
+])
+def test_extract_json_object(reply):
+    assert extract_json_object(reply) == FEEDBACK
+
+
+@pytest.mark.parametrize("reply", ["", "no json here", "[1, 2, 3]", "```json\n{\"a\": }\n```"])
+def test_extract_json_object_rejects_non_objects(reply):
+    with pytest.raises(json.JSONDecodeError):
+        extract_json_object(reply)
+
+
+@pytest.mark.parametrize("reply, emotion", [
+    ("Great job! That sounds lovely.", "praise"),
+    ("Tuyệt vời! Bạn đọc rất hay.", "praise"),
+    ("Almost, but it should be 'I went'.", "corrective"),
+    ("Keep practicing the 'th' sound.", "encouraging"),
+    ("Tell me more about your weekend.", "neutral"),
+    ("Perfect, however the last word should be 'home'.", "praise")  # Praise wins over correction
+])
+def test_analyze_emotion(reply, emotion):
+    assert analyze_emotion(reply) == emotion
+
+
+@pytest.mark.parametrize("text, normalized", [
+    ("Hello, World!", "hello world"),
+    ("  I'm   going\thome.  ", "i'm going home"),
+    ("Don't stop -- (really)?", "don't stop really"),
+    ("Tôi ĐI học.", "tôi đi học"),
+    ("", "")
+])
+def test_normalize_text(text, normalized):
+    assert normalize_text(text) == normalized
+
+
+def test_remove_filler_words():
+    words = normalize_text("Um, I basically go home, uh, at like five").split()
+
+    assert remove_filler_words(words) == ["i", "go", "home", "at", "five"]
+
+
+@pytest.fixture(scope="module")
+def benchmark_cases():
+    lessons = json.loads(DEFAULT_LESSONS_PATH.read_text(encoding="utf-8"))["lessons"]
+    return {case.name: case for case in build_cases(lesson_sentences(lessons), seed=42)}
+
+
+@pytest.fixture
+def quiet_logging():
+    # Per-call accuracy logging would dominate the timings
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.mark.parametrize("name", sorted(THRESHOLDS_US))
+def test_hot_path_within_threshold(name, benchmark_cases, quiet_logging):
+    per_call_us = time_case(benchmark_cases[name], repeat=3)
+
+    threshold_us = THRESHOLDS_US[name] * THRESHOLD_SCALE
+    assert per_call_us <= threshold_us, f"{name}: {per_call_us:.1f} us per call, budget {threshold_us:.0f} us"
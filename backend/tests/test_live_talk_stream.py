@@ -0,0 +1,114 @@
+"""
+Tests for the Live Talk /turn/stream WebSocket - turn events against the
+fake OpenAI server, and errors for invalid messages
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from benchmarks.fake_openai import CHAT_REPLY, TRANSCRIPT
+from benchmarks.load_test import silent_wav
+from routers import live_talk
+
+CONFIG = {"user_id": "u1", "coach_id": "ivy", "topic": "daily_life"}
+
+
+@pytest.fixture(scope="module")
+def client(fake_server):
+    app = FastAPI()
+    app.include_router(live_talk.router)
+    # One client (one event loop) for the module: the OpenAI client pools connections per loop
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def receive_turn(ws) -> list:
+    """Events of one turn, up to and including done (or an error)"""
+    events = []
+    while not events or events[-1]["type"] not in ("done", "error"):
+        events.append(ws.receive_json())
+    return events
+
+
+def test_turn_streams_transcript_tokens_audio_and_done(fake, client):
+    with client.websocket_connect("/api/live-talk/turn/stream") as ws:
+        ws.send_json(CONFIG)
+        ws.send_bytes(silent_wav())
+        events = receive_turn(ws)
+
+    types = [event["type"] for event in events]
+    assert types[0] == "transcript" and events[0]["text"] == TRANSCRIPT
+    assert types[-1] == "done"
+    assert "token" in types
+
+    tokens = "".join(event["text"] for event in events if event["type"] == "token")
+    assert tokens.strip() == CHAT_REPLY
+
+    # Audio may trail the last token, but every sentence arrives before done, in order
+    audio = [event for event in events if event["type"] == "audio"]
+    assert [event["index"] for event in audio] == list(range(len(audio)))
+    assert " ".join(event["text"] for event in audio) == CHAT_REPLY
+    assert all(event["audio_url"].startswith("/media/") for event in audio)
+
+    done = events[-1]
+    assert done["assistant_text"] == CHAT_REPLY
+    assert done["user_text"] == TRANSCRIPT
+    assert done["session_stats"]["turn_count"] == 1
+
+
+def test_session_continues_across_connections(fake, client):
+    with client.websocket_connect("/api/live-talk/turn/stream") as ws:
+        ws.send_json(CONFIG)
+        ws.send_bytes(silent_wav())
+        session_id = receive_turn(ws)[-1]["session_id"]
+
+    with client.websocket_connect("/api/live-talk/turn/stream") as ws:
+        ws.send_json({**CONFIG, "session_id": session_id})
+        ws.send_bytes(silent_wav())
+        done = receive_turn(ws)[-1]
+
+    assert done["session_id"] == session_id
+    assert done["session_stats"]["turn_count"] == 2
+
+
+@pytest.mark.parametrize("send", [
+    lambda ws: ws.send_text("not json"),
+    lambda ws: ws.send_text("[1, 2, 3]"),
+    lambda ws: ws.send_json({"user_id": ["not", "a", "string"]}),
+    lambda ws: ws.send_bytes(b"audio before config")
+])
+def test_invalid_config_gets_an_error_and_close(client, send):
+    with client.websocket_connect("/api/live-talk/turn/stream") as ws:
+        send(ws)
+
+        assert ws.receive_json()["type"] == "error"
+        with pytest.raises(WebSocketDisconnect) as excinfo:
+            ws.receive_json()
+
+    assert excinfo.value.code == 1008
+
+
+def test_text_message_mid_session_fails_only_that_turn(fake, client):
+    with client.websocket_connect("/api/live-talk/turn/stream") as ws:
+        ws.send_json(CONFIG)
+        ws.send_text("hello?")
+        assert ws.receive_json()["type"] == "error"
+
+        # The socket stays open for the next turn
+        ws.send_bytes(silent_wav())
+        assert receive_turn(ws)[-1]["type"] == "done"
+
+
+def test_upstream_failure_is_reported_as_a_turn_error(fake, client):
+    with client.websocket_connect("/api/live-talk/turn/stream") as ws:
+        ws.send_json(CONFIG)
+        fake.config.error_rate = 1.0
+        ws.send_bytes(silent_wav())
+        events = receive_turn(ws)
+
+        assert [event["type"] for event in events] == ["error"]
+
+        fake.config.error_rate = 0.0
+        ws.send_bytes(silent_wav())
+        assert receive_turn(ws)[-1]["type"] == "done"
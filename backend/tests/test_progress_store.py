@@ -0,0 +1,69 @@
+"""
+Tests for services.progress_store - saving a phrase twice, including two
+requests racing to save it, and weak-word validation
+"""
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.db_models import SavedPhraseRecord
+from models.schemas import WeakWord
+from services import progress_store
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'progress.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def phrase_count(db) -> int:
+    return db.scalar(select(func.count()).select_from(SavedPhraseRecord))
+
+
+def save(db, phrase: str = "How are you?") -> bool:
+    return progress_store.save_phrase(db, "u1", phrase, source="lesson_1", topic="daily_life")
+
+
+def test_phrase_is_saved_once(db):
+    assert save(db)
+    assert not save(db, "  how ARE you?  ")
+    db.commit()
+
+    assert phrase_count(db) == 1
+
+
+def test_duplicate_in_one_transaction_is_skipped(db):
+    assert save(db)
+    assert not save(db)
+    db.commit()
+
+    assert phrase_count(db) == 1
+
+
+@pytest.mark.parametrize("upsert", [True, False])
+def test_racing_save_returns_false_instead_of_failing(db, monkeypatch, upsert):
+    if not upsert:
+        monkeypatch.setattr(progress_store, "upsert_insert", lambda db: None)
+    assert save(db, "Nice to meet you")
+    db.commit()
+
+    # The other request's existence check ran before this row was committed
+    monkeypatch.setattr(db, "scalar", lambda *args, **kwargs: None)
+    assert not save(db, "Nice to meet you")
+    assert save(db, "See you later")  # The transaction is still usable
+    db.commit()
+    monkeypatch.undo()
+
+    assert phrase_count(db) == 2
+
+
+def test_weak_word_error_count_must_be_positive():
+    with pytest.raises(ValidationError):
+        WeakWord(word="three", error_type="substitution", error_count=0, last_practiced="2026-01-01T00:00:00Z")
@@ -0,0 +1,160 @@
+"""
+Tests for services.session_store - the context window stays bounded
+whether or not older turns have been summarized
+"""
+import pytest
+
+from services import openai_service
+from services.session_store import SessionStore, estimate_tokens
+from services.shared_store import SharedStore
+
+pytestmark = pytest.mark.anyio
+
+
+def make_store(window_tokens=None, shared=None) -> SessionStore:
+    return SessionStore(
+        ttl_seconds=60,
+        max_sessions=10,
+        window_messages=6,
+        summary_batch_messages=4,
+        window_tokens=window_tokens,
+        shared=shared
+    )
+
+
+@pytest.fixture
+def shared(tmp_path):
+    store = SharedStore(str(tmp_path / "shared.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def summarize(monkeypatch):
+    async def summarize(previous_summary, messages):
+        return f"{len(messages)} earlier messages"
+
+    monkeypatch.setattr(openai_service, "summarize_conversation", summarize)
+
+
+async def fill(store: SessionStore, turns: int, content: str = "Hello there, how are you today?"):
+    session = await store.create(user_id="u1")
+    for i in range(turns):
+        session.add_message("user" if i % 2 == 0 else "assistant", f"{content} {i}")
+    await store.touch(session)
+    return session
+
+
+def context_tokens(messages) -> int:
+    return sum(estimate_tokens(m["content"]) for m in messages if m["role"] != "system")
+
+
+async def test_context_is_capped_by_message_count_without_a_summary():
+    store = make_store()
+    session = await fill(store, 50)
+
+    messages = store.context_messages(session)
+
+    assert len(messages) == 6
+    assert messages[-1] == session.turns[-1]
+
+
+async def test_context_is_capped_by_token_budget():
+    store = make_store(window_tokens=200)
+    session = await fill(store, 6, content="word " * 60)  # ~80 tokens per turn
+
+    messages = store.context_messages(session)
+
+    assert 0 < context_tokens(messages) <= 200
+    assert len(messages) == 2
+    assert messages[-1] == session.turns[-1]
+
+
+async def test_context_stays_bounded_when_summarization_fails(monkeypatch):
+    async def unavailable(**kwargs):
+        raise RuntimeError("chat breaker open")
+
+    monkeypatch.setattr(openai_service, "summarize_conversation", unavailable)
+    store = make_store()
+    session = await fill(store, 40)
+
+    await store.compact(session)
+
+    assert session.summarized_upto == 0
+    assert not session.summarizing
+    assert store.context_messages(session) == session.turns[-6:]
+
+
+def test_live_talk_store_has_a_token_budget():
+    from services.session_store import live_talk_sessions
+
+    assert live_talk_sessions.window_tokens
+
+
+async def test_compaction_folds_old_turns_into_the_summary(summarize):
+    store = make_store()
+    session = await fill(store, 12)
+
+    await store.compact(session)
+
+    assert session.summarized_upto == 6
+    messages = store.context_messages(session)
+    assert messages[0] == {"role": "system", "content": "Summary of the earlier conversation: 6 earlier messages"}
+    assert messages[1:] == session.turns[6:]
+
+
+async def test_shared_copy_leaves_out_summarized_turns(summarize, shared):
+    store = make_store(shared=shared)
+    session = await fill(store, 12)
+    await store.compact(session)
+
+    data, _ = await shared.aget(store.namespace, session.session_id)
+    assert data["first_turn"] == 6
+    assert data["turns"] == session.turns[6:]
+    assert len(data["turn_tokens"]) == 6
+
+    # Another worker resumes with the same context, and keeps counting from there
+    other = make_store(shared=shared)
+    resumed = await other.get(session.session_id)
+    assert other.context_messages(resumed) == store.context_messages(session)
+    resumed.add_message("user", "One more thing")
+    assert other.window_start(resumed) == 7
+    assert other.context_messages(resumed)[-1] == {"role": "user", "content": "One more thing"}
+    assert resumed.transcript()[0]["content"] == "Summary of the earlier conversation: 6 earlier messages"
+
+
+async def test_compaction_on_a_resumed_session_summarizes_the_right_turns(summarize, shared):
+    store = make_store(shared=shared)
+    session = await fill(store, 12)
+    await store.compact(session)
+
+    other = make_store(shared=shared)
+    resumed = await other.get(session.session_id)
+    for i in range(12, 18):
+        resumed.add_message("user" if i % 2 == 0 else "assistant", f"Hello there, how are you today? {i}")
+    await other.touch(resumed)
+    await other.compact(resumed)
+
+    assert resumed.summarized_upto == 12
+    assert other.context_messages(resumed)[1:] == resumed.turns[-6:]
+    data, _ = await shared.aget(other.namespace, session.session_id)
+    assert data["first_turn"] == 12 and len(data["turns"]) == 6
+
+
+async def test_compaction_updates_a_stale_caller_copy(summarize, shared):
+    store = make_store(shared=shared)
+    session = await fill(store, 12)
+
+    # Another worker adds a turn, so the shared copy is newer than ours
+    other = make_store(shared=shared)
+    resumed = await other.get(session.session_id)
+    resumed.add_message("user", "Are you there?")
+    await other.touch(resumed)
+
+    await store.compact(session)
+
+    latest = await other.get(session.session_id)
+    assert latest.summarized_upto == 6 and latest.turns[-1]["content"] == "Are you there?"
+    assert session.summarized_upto == 6
+    assert session.summary == latest.summary == "6 earlier messages"
+
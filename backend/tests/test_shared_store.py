@@ -0,0 +1,105 @@
+"""
+Tests for services.shared_store - state shared between worker processes,
+without blocking the event loop on a locked database
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from services import shared_store as shared_store_module
+from services.job_store import JobStore
+from services.session_store import SessionStore
+from services.shared_store import SharedStore
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SharedStore(str(tmp_path / "shared.db"))
+    yield store
+    store.close()
+
+
+def test_single_process_mode_keeps_state_in_memory():
+    # SHARED_STATE_DB_PATH is set, but gunicorn's multi-worker flag is not
+    assert shared_store_module.shared_store is None
+
+
+async def test_locked_database_does_not_stall_the_event_loop(store):
+    await store.aput("ns", "key", {"n": 1}, ttl_seconds=60)
+
+    # Another "worker" holds the write lock for a while
+    other = sqlite3.connect(store.db_path, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.5, other.commit).start()
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.ensure_future(ticker())
+    start = time.perf_counter()
+    version = await store.aput("ns", "key", {"n": 2}, ttl_seconds=60)
+    waited = time.perf_counter() - start
+    ticking.cancel()
+    other.close()
+
+    assert version == 2
+    assert waited >= 0.4
+    assert ticks >= 20  # The loop kept running while the write waited
+
+
+async def test_job_result_is_visible_to_another_worker(store):
+    owner = JobStore("jobs", shared=store)
+    other_worker = JobStore("jobs", shared=store)
+    release = asyncio.Event()
+
+    async def job():
+        await release.wait()
+        return {"feedback": "Nice!"}
+
+    job_id = await owner.submit(job())
+    assert (await other_worker.result(job_id))["status"] == "pending"
+
+    release.set()
+    result = await other_worker.result(job_id, wait=2.0)
+
+    assert result == {"status": "ready", "result": {"feedback": "Nice!"}, "error": None}
+
+
+async def test_failed_job_is_published_as_failed(store):
+    owner = JobStore("jobs", shared=store)
+
+    async def job():
+        raise RuntimeError("model unavailable")
+
+    job_id = await owner.submit(job())
+
+    result = await JobStore("jobs", shared=store).result(job_id, wait=2.0)
+    assert result["status"] == "failed"
+
+
+async def test_session_continues_on_another_worker(store):
+    def make(shared):
+        return SessionStore(
+            ttl_seconds=60, max_sessions=10, window_messages=6, summary_batch_messages=4, shared=shared
+        )
+
+    first, second = make(store), make(store)
+    session = await first.create(user_id="u1")
+    session.add_message("user", "Hello")
+    await first.touch(session)
+
+    resumed = await second.get(session.session_id)
+    assert resumed.turns == session.turns
+
+    await second.delete(session.session_id)
+    assert await first.get(session.session_id) is None
@@ -0,0 +1,84 @@
+"""
+Tests for services.single_flight - concurrent identical upstream calls
+share one request to the fake OpenAI server
+"""
+import asyncio
+
+import openai
+import pytest
+
+from services.single_flight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+def speech(client, text: str):
+    async def call():
+        audio = await client.audio.speech.create(model="tts-1", voice="nova", input=text)
+        return audio.content
+    return call
+
+
+async def test_concurrent_identical_calls_share_one_request(fake, openai_client):
+    flight = SingleFlight("tts")
+    fake.config.tts_latency_ms = 100.0
+
+    results = await asyncio.gather(*(flight.do("hello", speech(openai_client, "Hello")) for _ in range(10)))
+
+    assert fake.stats["tts_requests"] == 1
+    assert len(set(results)) == 1
+    assert flight.stats() == {"in_flight": 0, "calls": 1, "shared": 9}
+
+
+async def test_different_keys_are_not_shared(fake, openai_client):
+    flight = SingleFlight("tts")
+
+    await asyncio.gather(
+        flight.do("hello", speech(openai_client, "Hello")),
+        flight.do("bye", speech(openai_client, "Goodbye"))
+    )
+
+    assert fake.stats["tts_requests"] == 2
+    assert flight.shared == 0
+
+
+async def test_error_reaches_every_waiter_and_is_not_cached(fake, openai_client):
+    flight = SingleFlight("tts")
+    fake.config.tts_latency_ms = 100.0
+    fake.config.error_next = 1
+
+    results = await asyncio.gather(
+        *(flight.do("hello", speech(openai_client, "Hello")) for _ in range(5)),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(r, openai.APIStatusError) for r in results)
+    assert fake.stats["tts_requests"] == 1
+
+    # The failed call is forgotten: the next caller makes a fresh request
+    assert await flight.do("hello", speech(openai_client, "Hello"))
+    assert fake.stats["tts_requests"] == 2
+
+
+async def test_cancelled_caller_does_not_cancel_shared_call(fake, openai_client):
+    flight = SingleFlight("tts")
+    fake.config.tts_latency_ms = 200.0
+
+    leaver = asyncio.ensure_future(flight.do("hello", speech(openai_client, "Hello")))
+    stayer = asyncio.ensure_future(flight.do("hello", speech(openai_client, "Hello")))
+    await asyncio.sleep(0.05)
+    leaver.cancel()
+
+    assert await stayer
+    assert leaver.cancelled()
+    assert fake.stats["tts_requests"] == 1
+
+
+async def test_sequential_calls_are_not_cached(fake, openai_client):
+    flight = SingleFlight("tts")
+
+    await flight.do("hello", speech(openai_client, "Hello"))
+    await flight.do("hello", speech(openai_client, "Hello"))
+
+    assert fake.stats["tts_requests"] == 2
+    assert flight.shared == 0
@@ -0,0 +1,153 @@
+"""
+Tests for services.tts_cache - budgets, files deleted behind the index's
+back, and migration from the old key scheme
+"""
+import hashlib
+import json
+import sqlite3
+
+import pytest
+
+from services.tts_cache import INDEX_FILENAME, LEGACY_INDEX_FILENAME, TTSCache
+
+
+def make_cache(directory, max_bytes: int = 1000, max_entries: int = 10) -> TTSCache:
+    return TTSCache(directory, max_bytes=max_bytes, max_entries=max_entries)
+
+
+def write(cache: TTSCache, text: str, size: int = 100, voice: str = "nova", model: str = "tts-1") -> str:
+    key = cache.make_key(text, voice, model)
+    cache.path_for(key).write_bytes(b"x" * size)
+    cache.add(key, text=text, voice=voice, model=model)
+    return key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = make_cache(tmp_path / "tts")
+    cache.load()  # As at startup, before any audio is written
+    yield cache
+    cache.close()
+
+
+def test_hit_and_miss(cache):
+    key = write(cache, "Hello")
+
+    assert cache.lookup(key) == cache.path_for(key)
+    assert cache.lookup(cache.make_key("Goodbye", "nova", "tts-1")) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_is_evicted(cache):
+    keys = [write(cache, f"Sentence {i}", size=300) for i in range(3)]
+
+    newest = write(cache, "Sentence 3", size=300)
+
+    assert not cache.contains(keys[0]) and not cache.path_for(keys[0]).exists()
+    assert all(cache.contains(key) for key in keys[1:] + [newest])
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert cache.evictions == 1
+
+
+def test_oversized_file_is_not_cached_and_evicts_nothing(cache):
+    kept = write(cache, "Short")
+
+    big = write(cache, "A very long passage", size=cache.max_bytes + 1)
+
+    assert not cache.contains(big)
+    assert cache.path_for(big).exists()  # Still served this once
+    assert cache.contains(kept) and cache.path_for(kept).exists()
+    assert cache.evictions == 0
+
+
+def test_oversized_file_on_disk_is_deleted_at_load(tmp_path):
+    directory = tmp_path / "tts"
+    first = make_cache(directory)
+    first.load()
+    first.close()
+
+    cache = make_cache(directory)
+    key = cache.make_key("A very long passage", "nova", "tts-1")
+    cache.path_for(key).write_bytes(b"x" * (cache.max_bytes + 1))
+    cache.load()
+
+    assert not cache.contains(key) and not cache.path_for(key).exists()
+    cache.close()
+
+
+def test_missing_file_is_a_miss_and_leaves_the_index(cache):
+    key = write(cache, "Hello")
+    cache.path_for(key).unlink()
+
+    assert cache.lookup(key) is None
+    assert not cache.contains(key)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_untracked_current_files_are_adopted_after_migration(tmp_path):
+    directory = tmp_path / "tts"
+    first = make_cache(directory)
+    first.load()  # Creates and migrates an empty index
+    first.close()
+
+    cache = make_cache(directory)
+    key = cache.make_key("Hello", "nova", "tts-1")
+    cache.path_for(key).write_bytes(b"x" * 100)
+    cache.load()
+
+    assert cache.lookup(key) == cache.path_for(key)
+    cache.close()
+
+
+def test_old_key_scheme_files_are_deleted_on_migration(tmp_path):
+    directory = tmp_path / "tts"
+    directory.mkdir()
+    legacy_key = hashlib.md5("Hello_nova".encode()).hexdigest()
+    adopted_key = hashlib.md5("Goodbye_nova".encode()).hexdigest()
+    for key in (legacy_key, adopted_key):
+        (directory / f"{key}.mp3").write_bytes(b"x" * 100)
+
+    # An index from before the migration: one current entry, one adopted old-scheme file
+    current = make_cache(directory)
+    current_key = current.make_key("Thanks", "nova", "tts-1")
+    current.path_for(current_key).write_bytes(b"x" * 100)
+    db = sqlite3.connect(directory / INDEX_FILENAME)
+    db.execute(
+        "CREATE TABLE tts_entries (key TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL, "
+        "model TEXT NOT NULL DEFAULT '', voice TEXT NOT NULL DEFAULT '', text TEXT NOT NULL DEFAULT '')"
+    )
+    db.executemany(
+        "INSERT INTO tts_entries VALUES (?, 100, 0, ?, '', '')",
+        [(current_key, "tts-1"), (adopted_key, "")]
+    )
+    db.commit()
+    db.close()
+
+    current.load()
+
+    assert current.contains(current_key)
+    assert not current.contains(adopted_key) and not current.contains(legacy_key)
+    assert not (directory / f"{adopted_key}.mp3").exists()
+    assert not (directory / f"{legacy_key}.mp3").exists()
+    current.close()
+
+
+def test_legacy_json_index_keeps_only_current_entries(tmp_path):
+    directory = tmp_path / "tts"
+    directory.mkdir()
+    cache = make_cache(directory)
+    current_key = cache.make_key("Hello", "nova", "tts-1")
+    old_key = hashlib.md5("Hello_nova".encode()).hexdigest()
+    for key in (current_key, old_key):
+        cache.path_for(key).write_bytes(b"x" * 100)
+    (directory / LEGACY_INDEX_FILENAME).write_text(json.dumps({
+        current_key: {"size": 100, "last_access": 1.0, "model": "tts-1", "voice": "nova", "text": "Hello"},
+        old_key: {"size": 100, "last_access": 1.0, "model": "", "voice": "", "text": ""}
+    }))
+
+    cache.load()
+
+    assert cache.contains(current_key)
+    assert not cache.contains(old_key) and not cache.path_for(old_key).exists()
+    assert not (directory / LEGACY_INDEX_FILENAME).exists()
+    cache.close()
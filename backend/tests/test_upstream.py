@@ -0,0 +1,257 @@
+"""
+Tests for services.upstream - retries, circuit breaker and hedging
+against the fake OpenAI server with error and hang injection
+"""
+import asyncio
+import time
+
+import openai
+import pytest
+
+from services.upstream import CHAT_POLICY, RETRYABLE_ERRORS, CallPolicy, CircuitOpenError, Upstream
+
+pytestmark = pytest.mark.anyio
+
+MESSAGES = [{"role": "user", "content": "Hello"}]
+
+
+def make_upstream(failure_threshold: int = 5, reset_seconds: float = 30.0) -> Upstream:
+    return Upstream(
+        max_concurrency=8,
+        failure_threshold=failure_threshold,
+        reset_seconds=reset_seconds,
+        retry_base_seconds=0.01,
+        retry_max_seconds=0.02
+    )
+
+
+def chat(client):
+    return lambda: client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES)
+
+
+async def test_retries_recover_from_transient_errors(fake, openai_client):
+    upstream = make_upstream()
+    fake.config.error_next = 2
+
+    response = await upstream.call("chat", chat(openai_client), CallPolicy(timeout=5, retries=2))
+
+    assert response.choices[0].message.content
+    assert fake.stats["chat_requests"] == 3
+    assert upstream.retries == 2
+    assert upstream.breaker("chat").state == "closed"
+
+
+async def test_gives_up_when_retries_are_exhausted(fake, openai_client):
+    upstream = make_upstream()
+    fake.config.error_rate = 1.0
+
+    with pytest.raises(RETRYABLE_ERRORS):
+        await upstream.call("chat", chat(openai_client), CallPolicy(timeout=5, retries=1))
+
+    assert fake.stats["chat_requests"] == 2
+    assert upstream.breaker("chat").failures == 1
+
+
+async def test_hung_attempt_times_out_and_is_retried(fake, openai_client):
+    upstream = make_upstream()
+    fake.config.hang_next = 1
+
+    start = time.perf_counter()
+    response = await upstream.call("chat", chat(openai_client), CallPolicy(timeout=0.3, retries=1))
+
+    assert response.choices[0].message.content
+    assert time.perf_counter() - start < fake.config.hang_seconds
+    assert fake.stats["chat_hangs"] == 1
+    assert fake.stats["chat_requests"] == 2
+
+
+async def test_client_errors_are_not_retried(fake, openai_client):
+    upstream = make_upstream(failure_threshold=1)
+
+    async def bad_request():
+        raise openai.BadRequestError("bad", response=_response(400), body=None)
+
+    with pytest.raises(openai.BadRequestError):
+        await upstream.call("chat", bad_request, CallPolicy(timeout=5, retries=3))
+
+    assert upstream.retries == 0
+    assert upstream.breaker("chat").state == "closed"
+
+
+async def test_breaker_opens_and_fails_fast(fake, openai_client):
+    upstream = make_upstream(failure_threshold=2)
+    fake.config.error_rate = 1.0
+    policy = CallPolicy(timeout=5, retries=0)
+
+    for _ in range(2):
+        with pytest.raises(RETRYABLE_ERRORS):
+            await upstream.call("chat", chat(openai_client), policy)
+    assert upstream.breaker("chat").state == "open"
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        await upstream.call("chat", chat(openai_client), policy)
+
+    assert excinfo.value.retry_after > 0
+    assert fake.stats["chat_requests"] == 2  # The rejected call never reached upstream
+    assert upstream.breaker("chat").rejected == 1
+    assert upstream.breaker("tts").state == "closed"  # Breakers are per operation
+
+
+async def test_half_open_trial_closes_breaker_on_success(fake, openai_client):
+    upstream = make_upstream(failure_threshold=1, reset_seconds=0.2)
+    policy = CallPolicy(timeout=5, retries=0)
+    fake.config.error_next = 1
+
+    with pytest.raises(RETRYABLE_ERRORS):
+        await upstream.call("chat", chat(openai_client), policy)
+    assert upstream.breaker("chat").state == "open"
+
+    await asyncio.sleep(0.25)
+    assert upstream.breaker("chat").state == "half_open"
+    await upstream.call("chat", chat(openai_client), policy)
+
+    assert upstream.breaker("chat").state == "closed"
+
+
+async def test_half_open_trial_failure_reopens_breaker(fake, openai_client):
+    upstream = make_upstream(failure_threshold=1, reset_seconds=0.2)
+    policy = CallPolicy(timeout=5, retries=0)
+    fake.config.error_rate = 1.0
+
+    with pytest.raises(RETRYABLE_ERRORS):
+        await upstream.call("chat", chat(openai_client), policy)
+    await asyncio.sleep(0.25)
+    with pytest.raises(RETRYABLE_ERRORS):
+        await upstream.call("chat", chat(openai_client), policy)
+
+    assert upstream.breaker("chat").state == "open"
+    with pytest.raises(CircuitOpenError):
+        await upstream.call("chat", chat(openai_client), policy)
+
+
+async def test_half_open_allows_a_single_trial(fake, openai_client):
+    upstream = make_upstream(failure_threshold=1, reset_seconds=0.2)
+    policy = CallPolicy(timeout=5, retries=0)
+    fake.config.error_next = 1
+    with pytest.raises(RETRYABLE_ERRORS):
+        await upstream.call("chat", chat(openai_client), policy)
+    await asyncio.sleep(0.25)
+
+    fake.config.chat_latency_ms = 200.0
+    trial = asyncio.ensure_future(upstream.call("chat", chat(openai_client), policy))
+    await asyncio.sleep(0.05)
+    with pytest.raises(CircuitOpenError):
+        await upstream.call("chat", chat(openai_client), policy)
+
+    await trial
+    assert upstream.breaker("chat").state == "closed"
+
+
+async def test_cancelled_trial_is_released(fake, openai_client):
+    upstream = make_upstream(failure_threshold=1, reset_seconds=0.2)
+    policy = CallPolicy(timeout=5, retries=0)
+    fake.config.error_next = 1
+    with pytest.raises(RETRYABLE_ERRORS):
+        await upstream.call("chat", chat(openai_client), policy)
+    await asyncio.sleep(0.25)
+
+    fake.config.hang_next = 1
+    trial = asyncio.ensure_future(upstream.call("chat", chat(openai_client), policy))
+    await asyncio.sleep(0.05)
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    # A new trial may go through instead of the breaker staying stuck
+    await upstream.call("chat", chat(openai_client), policy)
+    assert upstream.breaker("chat").state == "closed"
+
+
+async def test_hedged_request_beats_a_hung_attempt(fake, openai_client):
+    upstream = make_upstream()
+    fake.config.hang_next = 1
+    speech = lambda: openai_client.audio.speech.create(model="tts-1", voice="nova", input="Hello there")
+
+    start = time.perf_counter()
+    audio = await upstream.call("tts", speech, CallPolicy(timeout=10, hedge_after=0.2))
+
+    assert audio.content
+    assert time.perf_counter() - start < 1.0
+    assert upstream.hedges == 1
+    assert fake.stats["tts_requests"] == 2
+
+
+async def test_fast_attempt_is_not_hedged(fake, openai_client):
+    upstream = make_upstream()
+    speech = lambda: openai_client.audio.speech.create(model="tts-1", voice="nova", input="Hello there")
+
+    await upstream.call("tts", speech, CallPolicy(timeout=10, hedge_after=1.0))
+
+    assert upstream.hedges == 0
+    assert fake.stats["tts_requests"] == 1
+
+
+async def test_hedged_attempts_finishing_together_discard_the_loser():
+    upstream = make_upstream()
+    release = asyncio.Event()
+    started, discarded = [], []
+
+    async def attempt():
+        index = len(started)
+        started.append(index)
+        await release.wait()
+        return f"attempt-{index}"
+
+    async def release_after_hedge():
+        while len(started) < 2:
+            await asyncio.sleep(0.01)
+        release.set()  # Both attempts complete in the same loop iteration
+
+    asyncio.ensure_future(release_after_hedge())
+    result = await upstream.call("tts", attempt, CallPolicy(timeout=5, hedge_after=0.05), discard=discarded.append)
+
+    assert upstream.hedges == 1
+    assert sorted([result] + discarded) == ["attempt-0", "attempt-1"]
+
+
+async def test_losing_attempt_that_completes_anyway_is_discarded():
+    upstream = make_upstream()
+    release = asyncio.Event()
+    calls, returned, discarded = [], [], []
+
+    async def attempt():
+        calls.append(None)
+        if len(calls) == 1:
+            await release.wait()
+            # Still finishing when the hedge wins and cancels it
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            returned.append("late")
+            return "late"
+        release.set()
+        returned.append("fast")
+        return "fast"
+
+    result = await upstream.call("tts", attempt, CallPolicy(timeout=5, hedge_after=0.05), discard=discarded.append)
+    await asyncio.sleep(0.01)
+
+    assert result == "fast"
+    # Every attempt that produced a result was either returned or discarded
+    assert sorted(returned) == sorted([result] + discarded)
+
+
+async def test_chat_completions_are_never_retried(fake, openai_client):
+    upstream = make_upstream()
+    fake.config.error_next = 1
+
+    with pytest.raises(RETRYABLE_ERRORS):
+        await upstream.call("chat", chat(openai_client), CHAT_POLICY)
+
+    assert CHAT_POLICY.retries == 0
+    assert fake.stats["chat_requests"] == 1
+
+
+def _response(status: int):
+    import httpx
+
+    return httpx.Response(status, request=httpx.Request("POST", "http://test/v1/chat/completions"))
@@ -0,0 +1,93 @@
+"""
+Tests for services.word_alignment - the bit-parallel and NumPy alignments
+agree with each other and with the minimum edit distance
+"""
+import random
+
+import pytest
+
+from services import word_alignment
+from services.word_alignment import align, align_batch
+
+
+def summary(result):
+    return (
+        result.matches, result.substitutions, result.deletions, result.insertions,
+        [(op.op, op.expected, op.spoken) for op in result.ops]
+    )
+
+
+def edit_distance(expected, spoken) -> int:
+    previous = list(range(len(spoken) + 1))
+    for i, e in enumerate(expected, 1):
+        current = [i]
+        for j, s in enumerate(spoken, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (e != s)))
+        previous = current
+    return previous[-1]
+
+
+def random_pairs(count: int, seed: int, max_words: int = 40):
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(60)]
+    pairs = []
+    for _ in range(count):
+        # Small vocabularies give repeated words and many equal-cost alignments
+        words = vocabulary[:rng.randint(2, len(vocabulary))]
+        expected = rng.choices(words, k=rng.randint(0, max_words))
+        spoken = [w if rng.random() > 0.2 else rng.choice(vocabulary) for w in expected if rng.random() > 0.1]
+        spoken += rng.choices(vocabulary, k=rng.choice([0, 0, 0, 3]))
+        pairs.append((expected, spoken))
+    return pairs
+
+
+@pytest.mark.parametrize("expected, spoken, ops", [
+    ("i go home", "i go home", ["equal", "equal", "equal"]),
+    ("i go home", "i went home", ["equal", "substitute", "equal"]),
+    ("i go home", "i home", ["equal", "delete", "equal"]),
+    ("i go home", "i go now home", ["equal", "equal", "insert", "equal"]),
+    ("i go home", "", ["delete", "delete", "delete"]),
+    ("", "hello", ["insert"])
+])
+def test_known_alignments(expected, spoken, ops):
+    result = align(expected.split(), spoken.split())
+
+    assert [op.op for op in result.ops] == ops
+
+
+def test_bit_parallel_matches_numpy():
+    pairs = random_pairs(2000, seed=1)
+
+    bits = [align(e, s) for e, s in pairs]
+    vectorized = word_alignment._align_numpy(pairs)
+
+    assert [summary(r) for r in bits] == [summary(r) for r in vectorized]
+
+
+def test_alignment_cost_is_the_edit_distance():
+    for expected, spoken in random_pairs(300, seed=2, max_words=20):
+        result = align(expected, spoken)
+        assert result.errors == edit_distance(expected, spoken)
+        assert [op.expected for op in result.ops if op.expected] == expected
+        assert [op.spoken for op in result.ops if op.spoken] == spoken
+
+
+def test_passage_longer_than_a_machine_word():
+    expected = [f"w{i % 97}" for i in range(300)]
+    spoken = expected[:100] + ["x"] + expected[120:]
+
+    result = align(expected, spoken)
+
+    assert result.errors == edit_distance(expected, spoken) == 20
+    assert summary(result) == summary(word_alignment._align_numpy([(expected, spoken)])[0])
+
+
+@pytest.mark.parametrize("count, max_words", [
+    (8, 10),                                          # Small batch: pair by pair
+    (word_alignment.MIN_NUMPY_BATCH, 10),             # Large batch of short sentences: NumPy
+    (word_alignment.MIN_NUMPY_BATCH, 60)              # Large batch with long passages: pair by pair
+])
+def test_align_batch_keeps_input_order(count, max_words):
+    pairs = random_pairs(count, seed=3, max_words=max_words)
+
+    assert [summary(r) for r in align_batch(pairs)] == [summary(align(e, s)) for e, s in pairs]